@@ -8,9 +8,27 @@ FREQ_HIGH = 5000
 SENSITIVITY = 350.0
 COMPRESSION = 0.4
 REAR_THRESHOLD = 1200
+# Полосы для классификатора событий: низкий гул, шаги, треск выстрелов (Гц).
+FEATURE_BANDS = {
+    "low": (40, 250),
+    "step": (250, 2000),
+    "crack": (2500, 8000),
+}
 NOISE_FLOOR = 0.018
+# Нижняя граница idle_fps: самый длинный кадр GUI в тишине (от него зависит размер FrameRing).
+MIN_IDLE_FPS = 2
 CONFIG_FILE = "config.json"
 DIAGNOSTIC_REPORT_FILE = "diagnostic_report.json"
+REPLAY_DIR = "recordings"
+# balance - только разница громкостей, gcc_phat - плюс задержка между каналами (audio_tdoa.py),
+# spectral_pan - панорама по бинам полос шагов и выстрелов (audio_panning.py).
+DIRECTION_METHODS = ("balance", "gcc_phat", "spectral_pan")
+# Раскладка захвата: 5.1/7.1 открываются, только если устройство отдает столько каналов (audio_surround.py).
+CHANNEL_LAYOUTS = ("stereo", "5.1", "7.1")
+# Клавиши, при которых звук считается своим движением (input_state.py); пустой список - никогда.
+MOVE_KEYS = ("w", "a", "s", "d")
+# Запись сессии в REPLAY_DIR (session_log.py): сырой звук int16 или float32 плюс результат анализа каждого блока.
+SESSION_LOG_FORMATS = ("off", "int16", "float32")
 
 TRANS_COLOR = "#000001"
 
@@ -47,6 +65,10 @@ PROFILE_PRESETS = {
         "sensitivity": 420.0,
         "noise_floor": 0.026,
         "sector_spread": 2,
+        "direction_method": "gcc_phat",
+        "track_sources": 1,
+        "denoise": False,
+        "move_keys": ["w", "a", "s", "d", "space"],
         "visual_mode": "minimal",
         "color_profile": "contrast",
         "opacity": 0.82,
@@ -55,6 +77,10 @@ PROFILE_PRESETS = {
         "sensitivity": 520.0,
         "noise_floor": 0.032,
         "sector_spread": 3,
+        "direction_method": "gcc_phat",
+        "track_sources": 3,
+        "denoise": True,
+        "move_keys": ["w", "a", "s", "d", "space"],
         "visual_mode": "radar",
         "color_profile": "orange",
         "opacity": 0.78,
@@ -63,6 +89,10 @@ PROFILE_PRESETS = {
         "sensitivity": 470.0,
         "noise_floor": 0.028,
         "sector_spread": 2,
+        "direction_method": "balance",
+        "track_sources": 1,
+        "denoise": True,
+        "move_keys": ["w", "a", "s", "d", "space", "ctrl"],
         "visual_mode": "minimal",
         "color_profile": "blue",
         "opacity": 0.84,
@@ -71,6 +101,10 @@ PROFILE_PRESETS = {
         "sensitivity": 260.0,
         "noise_floor": 0.018,
         "sector_spread": 1,
+        "direction_method": "balance",
+        "track_sources": 1,
+        "denoise": False,
+        "move_keys": [],
         "visual_mode": "radar",
         "color_profile": "orange",
         "opacity": 0.9,
@@ -87,9 +121,18 @@ DEFAULT_SETTINGS = {
     "swap_channels": False,
     "sector_spread": 2,
     "noise_floor": NOISE_FLOOR,
+    "adaptive_noise_floor": True,
+    "denoise": False,
+    "move_keys": list(MOVE_KEYS),
+    "session_log": "off",
     "visual_mode": "radar",
     "edge_indicators": True,
     "direction_smoothing": 0.35,
+    "direction_method": "balance",
+    "track_sources": 1,
+    "channel_layout": "stereo",
+    "max_fps": 60,
+    "idle_fps": 10,
     "overlay_x": 100,
     "overlay_y": 100,
 }
@@ -107,6 +150,20 @@ def clamp(value, min_value, max_value):
     return max(min_value, min(max_value, value))
 
 
+def parse_move_keys(value, default=MOVE_KEYS):
+    # Список имен клавиш или строка "w a s d" / "w,a,s,d"; мусор заменяется клавишами по умолчанию.
+    if isinstance(value, str):
+        value = value.replace(",", " ").split()
+    if not isinstance(value, (list, tuple)):
+        return list(default)
+    keys = []
+    for key in value:
+        key = str(key).strip().lower()
+        if key and key not in keys:
+            keys.append(key)
+    return keys[:8]
+
+
 def load_config():
     if not os.path.exists(CONFIG_FILE):
         return {}
@@ -136,9 +193,18 @@ def apply_saved_settings(settings, saved_config):
     settings["swap_channels"] = bool(saved_config.get("swap_channels", settings["swap_channels"]))
     settings["sector_spread"] = int(saved_config.get("sector_spread", settings["sector_spread"]))
     settings["noise_floor"] = float(saved_config.get("noise_floor", settings["noise_floor"]))
+    settings["adaptive_noise_floor"] = bool(saved_config.get("adaptive_noise_floor", settings["adaptive_noise_floor"]))
+    settings["denoise"] = bool(saved_config.get("denoise", settings["denoise"]))
+    settings["move_keys"] = parse_move_keys(saved_config.get("move_keys", settings["move_keys"]))
+    settings["session_log"] = saved_config.get("session_log", settings["session_log"])
     settings["visual_mode"] = saved_config.get("visual_mode", settings["visual_mode"])
     settings["edge_indicators"] = bool(saved_config.get("edge_indicators", settings["edge_indicators"]))
     settings["direction_smoothing"] = float(saved_config.get("direction_smoothing", settings["direction_smoothing"]))
+    settings["direction_method"] = saved_config.get("direction_method", settings["direction_method"])
+    settings["track_sources"] = int(saved_config.get("track_sources", settings["track_sources"]))
+    settings["channel_layout"] = saved_config.get("channel_layout", settings["channel_layout"])
+    settings["max_fps"] = int(saved_config.get("max_fps", settings["max_fps"]))
+    settings["idle_fps"] = int(saved_config.get("idle_fps", settings["idle_fps"]))
     settings["overlay_x"] = int(saved_config.get("overlay_x", settings["overlay_x"]))
     settings["overlay_y"] = int(saved_config.get("overlay_y", settings["overlay_y"]))
 
@@ -148,17 +214,31 @@ def apply_saved_settings(settings, saved_config):
     settings["sector_spread"] = int(clamp(settings["sector_spread"], 1, 3))
     settings["noise_floor"] = clamp(settings["noise_floor"], 0.002, 0.25)
     settings["direction_smoothing"] = clamp(settings["direction_smoothing"], 0.05, 1.0)
+    settings["track_sources"] = int(clamp(settings["track_sources"], 1, 4))
+    settings["max_fps"] = int(clamp(settings["max_fps"], 20, 240))
+    settings["idle_fps"] = int(clamp(settings["idle_fps"], MIN_IDLE_FPS, 30))
     settings["overlay_x"] = int(clamp(settings["overlay_x"], -4000, 4000))
     settings["overlay_y"] = int(clamp(settings["overlay_y"], -4000, 4000))
 
     if settings["visual_mode"] not in ("radar", "minimal"):
         settings["visual_mode"] = "radar"
+    if settings["direction_method"] not in DIRECTION_METHODS:
+        settings["direction_method"] = "balance"
+    if settings["channel_layout"] not in CHANNEL_LAYOUTS:
+        settings["channel_layout"] = "stereo"
+    if settings["session_log"] not in SESSION_LOG_FORMATS:
+        settings["session_log"] = "off"
     if settings["color_profile"] not in COLOR_PROFILES:
         settings["color_profile"] = "orange"
     if settings["profile_name"] not in PROFILE_PRESETS:
         settings["profile_name"] = "Custom"
 
 
+def apply_profile_preset(settings, profile_name):
+    settings.update(PROFILE_PRESETS.get(profile_name, {}))
+    settings["profile_name"] = profile_name if profile_name in PROFILE_PRESETS else "Custom"
+
+
 def build_saved_config(settings, window, audio_source, fallback_audio=None):
     return {
         "profile_name": settings["profile_name"],
@@ -173,9 +253,18 @@ def build_saved_config(settings, window, audio_source, fallback_audio=None):
         "swap_channels": settings["swap_channels"],
         "sector_spread": settings["sector_spread"],
         "noise_floor": settings["noise_floor"],
+        "adaptive_noise_floor": settings["adaptive_noise_floor"],
+        "denoise": settings["denoise"],
+        "move_keys": list(settings["move_keys"]),
+        "session_log": settings["session_log"],
         "visual_mode": settings["visual_mode"],
         "edge_indicators": settings["edge_indicators"],
         "direction_smoothing": settings["direction_smoothing"],
+        "direction_method": settings["direction_method"],
+        "track_sources": settings["track_sources"],
+        "channel_layout": settings["channel_layout"],
+        "max_fps": settings["max_fps"],
+        "idle_fps": settings["idle_fps"],
         "overlay_x": settings["overlay_x"],
         "overlay_y": settings["overlay_y"],
     }
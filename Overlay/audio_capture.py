@@ -0,0 +1,179 @@
+import threading
+import time
+
+import numpy as np
+
+from app_config import BLOCK_SIZE, SAMPLE_RATE
+
+# 16 блоков по 512 сэмплов - около 170 мс запаса, если анализ одного блока вдруг затянется.
+CAPTURE_RING_BLOCKS = 16
+
+
+class RecorderBackend:
+    # Любой источник с интерфейсом soundcard: микрофон/loopback или FileAudioSource.
+    def __init__(self, source, channels=2, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE):
+        self.source = source
+        self.channels = channels
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.recorder = None
+
+    def open(self):
+        self.recorder = self.source.recorder(samplerate=self.sample_rate, channels=self.channels, blocksize=self.block_size)
+        self.recorder.__enter__()
+
+    def read_into(self, out):
+        np.copyto(out, self.recorder.record(numframes=self.block_size))
+
+    def close(self):
+        if self.recorder is not None:
+            recorder, self.recorder = self.recorder, None
+            recorder.__exit__(None, None, None)
+
+
+class SyntheticBackend:
+    # Источник без звуковой карты: generate(out, index) заполняет блок на месте.
+    # realtime=True выдает блоки с темпом реального устройства.
+    def __init__(self, generate, channels=2, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE, realtime=False, blocks=None):
+        self.generate = generate
+        self.channels = channels
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.blocks = blocks
+        self.index = 0
+        self.started_at = None
+
+    def open(self):
+        self.index = 0
+        self.started_at = time.perf_counter()
+
+    def read_into(self, out):
+        if self.blocks is not None and self.index >= self.blocks:
+            raise EOFError("Синтетический сигнал закончился")
+        self.generate(out, self.index)
+        self.index += 1
+        if self.realtime:
+            delay = self.started_at + self.index * self.block_size / self.sample_rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def close(self):
+        pass
+
+
+class CaptureStream:
+    # Захват в отдельном потоке в заранее выделенное кольцо блоков. read() отдает view на слот
+    # без копирования; слот остается за читателем до следующего read(), поэтому писатель
+    # его не перезапишет. Если читатель отстал и кольцо полно, новый блок выбрасывается (overrun),
+    # если блока нет дольше timeout - underrun. Задержка - от конца захвата блока до его чтения.
+    def __init__(self, backend, capacity=CAPTURE_RING_BLOCKS, clock=time.perf_counter):
+        self.backend = backend
+        self.capacity = capacity
+        self.clock = clock
+        self.block_size = backend.block_size
+        self.block_duration = backend.block_size / backend.sample_rate
+        self.blocks = np.zeros((capacity, backend.block_size, backend.channels), dtype=np.float32)
+        self.captured_at = np.zeros(capacity)
+        # Сюда читается блок, которому не нашлось места в кольце.
+        self.spare_block = np.zeros((backend.block_size, backend.channels), dtype=np.float32)
+        self.condition = threading.Condition()
+        self.write_seq = 0
+        self.read_seq = 0
+        self.holding = False
+        self.error = None
+        self.running = False
+        self.thread = None
+        self.last_captured_at = None
+        self.overruns = 0
+        self.underruns = 0
+        self.blocks_read = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        self.backend.open()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="audio-capture", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+        self.thread = None
+        self.backend.close()
+
+    def run(self):
+        while self.running:
+            with self.condition:
+                full = self.write_seq - self.read_seq >= self.capacity
+            slot = self.write_seq % self.capacity
+            try:
+                if full:
+                    # Читатель не успевает: блок все равно забирается у устройства, но не сохраняется.
+                    self.backend.read_into(self.spare_block)
+                    self.overruns += 1
+                    continue
+                self.backend.read_into(self.blocks[slot])
+            except Exception as e:
+                with self.condition:
+                    self.error = e
+                    self.running = False
+                    self.condition.notify_all()
+                return
+            self.captured_at[slot] = self.clock()
+            with self.condition:
+                self.write_seq += 1
+                self.condition.notify()
+
+    def read(self, timeout=None):
+        if timeout is None:
+            timeout = self.block_duration * 8
+        with self.condition:
+            if self.holding:
+                # Прошлый view больше не нужен: слот возвращается писателю.
+                self.read_seq += 1
+                self.holding = False
+            if self.write_seq == self.read_seq:
+                self.condition.wait_for(lambda: self.write_seq != self.read_seq or not self.running, timeout)
+            if self.write_seq == self.read_seq:
+                if self.error is not None:
+                    raise self.error
+                if not self.running:
+                    raise EOFError("Захват остановлен")
+                self.underruns += 1
+                return None
+            slot = self.read_seq % self.capacity
+            self.holding = True
+
+        captured_at = float(self.captured_at[slot])
+        latency = self.clock() - captured_at
+        self.last_captured_at = captured_at
+        self.blocks_read += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        return self.blocks[slot]
+
+    def stats(self):
+        queued = self.write_seq - self.read_seq
+        return {
+            "captured": self.write_seq,
+            "read": self.blocks_read,
+            "queued": queued,
+            "overruns": self.overruns,
+            "underruns": self.underruns,
+            "latency_avg_ms": round(self.latency_sum / self.blocks_read * 1000.0, 3) if self.blocks_read else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000.0, 3),
+            "buffer_ms": round(self.capacity * self.block_duration * 1000.0, 1),
+        }
@@ -0,0 +1,90 @@
+import numpy as np
+
+from app_config import BLOCK_SIZE, SAMPLE_RATE
+from audio_features import RFFT_HAS_OUT
+from noise_floor import MinimumStatistics
+
+# Минимум сглаженной мощности бина примерно втрое ниже средней мощности шума, поэтому вычитание с запасом.
+OVERSUBTRACTION = 4.0
+# Нижняя граница усиления (-20 дБ): бин не обнуляется совсем, чтобы не рвать спектр шагов.
+GAIN_FLOOR = 0.1
+
+
+class SpectralDenoiser:
+    # Подавление постоянного фона (ветер, дождь, двигатели) до расчета баланса и центра.
+    # Кадр 2 * block_size с шагом block_size: окно sqrt-Hann на анализе и синтезе дает
+    # точное восстановление overlap-add, задержка - один блок. Профиль шума по бинам учится
+    # скользящим минимумом (как пол шума в noise_floor.py), усиление Винера считается по сумме
+    # мощностей каналов и одинаково для L и R, поэтому баланс и задержка между каналами не сдвигаются.
+    def __init__(self, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE, window_seconds=2.0):
+        self.block_size = block_size
+        frame_size = block_size * 2
+        bins = block_size + 1
+        # Окно сразу на оба канала: умножение одинаковых форм обходится без буфера numpy под broadcast.
+        self.window = np.tile(np.sqrt(np.hanning(frame_size + 1)[:-1]), (2, 1))
+        self.frame = np.zeros((2, frame_size))
+        self.history = np.zeros((2, block_size))
+        self.windowed = np.empty((2, frame_size))
+        self.spectra = np.empty((2, bins), dtype=np.complex128)
+        self.magnitude = np.empty((2, bins))
+        self.power = np.empty(bins)
+        self.gain = np.ones(bins)
+        self.complex_gain = np.ones(bins, dtype=np.complex128)
+        self.synthesis = np.empty((2, frame_size))
+        self.tail = np.zeros((2, block_size))
+        self.output = np.empty((block_size, 2))
+        window_blocks = max(8, int(window_seconds * sample_rate / block_size))
+        self.noise = MinimumStatistics(bins, window_blocks)
+
+    def reset(self):
+        self.flush()
+        self.gain.fill(1.0)
+        self.noise.reset()
+
+    def flush(self):
+        # Только буферы overlap-add: выученный профиль шума остается.
+        self.frame.fill(0.0)
+        self.history.fill(0.0)
+        self.tail.fill(0.0)
+
+    @property
+    def ready(self):
+        return self.noise.ready
+
+    def process(self, data):
+        block = self.block_size
+        # Прошлый блок - первая половина кадра, новый - вторая.
+        np.copyto(self.frame[:, :block], self.history)
+        np.copyto(self.frame[:, block:], data[:, :2].T)
+        np.copyto(self.history, self.frame[:, block:])
+        np.multiply(self.frame, self.window, out=self.windowed)
+        if RFFT_HAS_OUT:
+            np.fft.rfft(self.windowed, axis=1, out=self.spectra)
+        else:
+            self.spectra[:] = np.fft.rfft(self.windowed, axis=1)
+
+        np.abs(self.spectra, out=self.magnitude)
+        np.multiply(self.magnitude, self.magnitude, out=self.magnitude)
+        np.add(self.magnitude[0], self.magnitude[1], out=self.power)
+        noise = self.noise.update(self.power)
+        if self.noise.ready:
+            # Винер по апостериорному SNR: gain = max(1 - k * N / P, GAIN_FLOOR).
+            np.add(self.power, 1e-20, out=self.power)
+            np.divide(noise, self.power, out=self.gain)
+            self.gain *= -OVERSUBTRACTION
+            self.gain += 1.0
+            np.maximum(self.gain, GAIN_FLOOR, out=self.gain)
+            # По строкам и с комплексным усилением - по той же причине.
+            np.copyto(self.complex_gain, self.gain)
+            for channel in self.spectra:
+                np.multiply(channel, self.complex_gain, out=channel)
+
+        if RFFT_HAS_OUT:
+            np.fft.irfft(self.spectra, n=block * 2, axis=1, out=self.synthesis)
+        else:
+            self.synthesis[:] = np.fft.irfft(self.spectra, n=block * 2, axis=1)
+        self.synthesis *= self.window
+        # Готов первый блок кадра: хвост прошлого кадра плюс начало текущего.
+        np.add(self.tail, self.synthesis[:, :block], out=self.output.T)
+        np.copyto(self.tail, self.synthesis[:, block:])
+        return self.output
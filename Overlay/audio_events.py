@@ -18,3 +18,30 @@ def classify_audio_event(level, previous_level, centroid_hz, noise_floor, is_mov
 
     return "SOUND"
 
+
+def classify_audio_event_bands(level, previous_level, centroid_hz, bands, noise_floor, is_moving=False):
+    # bands - доли энергии спектра в FEATURE_BANDS; без спектра работает старая логика по центру.
+    if not bands:
+        return classify_audio_event(level, previous_level, centroid_hz, noise_floor, is_moving=is_moving)
+
+    if level <= noise_floor:
+        return "IDLE"
+
+    attack = level - previous_level
+    low = bands.get("low", 0.0)
+    step = bands.get("step", 0.0)
+    crack = bands.get("crack", 0.0)
+
+    if level >= 0.75 and attack >= 0.12:
+        return "IMPACT"
+
+    if crack >= 0.3 and level >= 0.22 and crack >= step * 0.5:
+        return "SHARP"
+
+    if not is_moving and 0.12 <= level <= 0.72 and attack >= 0.035 and step >= 0.4 and step >= low:
+        return "STEP"
+
+    if low >= 0.5 and level >= noise_floor * 2.0:
+        return "LOW"
+
+    return "SOUND"
@@ -0,0 +1,135 @@
+import functools
+import inspect
+
+import numpy as np
+
+from app_config import BLOCK_SIZE, COMPRESSION, SAMPLE_RATE
+
+# numpy >= 2.0 умеет писать rfft в готовый буфер.
+RFFT_HAS_OUT = "out" in inspect.signature(np.fft.rfft).parameters
+
+
+@functools.lru_cache(maxsize=16)
+def spectrum_plan(block_size, sample_rate=SAMPLE_RATE, window=None):
+    bin_freqs = np.fft.rfftfreq(block_size, 1.0 / sample_rate)
+    bin_freqs.setflags(write=False)
+    window_values = None
+    if window == "hann":
+        window_values = np.hanning(block_size)
+        window_values.setflags(write=False)
+    return bin_freqs, window_values
+
+
+class SpectrumAnalyzer:
+    # Один rfft на блок в заранее выделенные буферы; центр, энергии полос и rolloff читаются из него.
+    def __init__(self, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE, window=None):
+        self.sample_rate = sample_rate
+        self.window_name = window
+        self.band_slice_cache = {}
+        self.resize(block_size)
+
+    def resize(self, block_size):
+        self.block_size = block_size
+        self.bin_freqs, self.window = spectrum_plan(block_size, self.sample_rate, self.window_name)
+        bins = len(self.bin_freqs)
+        self.mono = np.empty(block_size)
+        self.stereo = np.empty((2, block_size))
+        self.spectrum = np.empty(bins, dtype=np.complex128)
+        self.channel_spectra = np.empty((2, bins), dtype=np.complex128)
+        self.mags = np.empty(bins)
+        self.cumulative = np.empty(bins)
+        self.mag_sum = 0.0
+        self.band_slice_cache.clear()
+
+    def analyze(self, data):
+        if len(data) != self.block_size:
+            self.resize(len(data))
+        np.add(data[:, 0], data[:, 1], out=self.mono)
+        if self.window is not None:
+            np.multiply(self.mono, self.window, out=self.mono)
+        if RFFT_HAS_OUT:
+            np.fft.rfft(self.mono, out=self.spectrum)
+        else:
+            self.spectrum[:] = np.fft.rfft(self.mono)
+        np.abs(self.spectrum, out=self.mags)
+        self.mag_sum = float(self.mags.sum())
+        return self.mags
+
+    def analyze_stereo(self, data):
+        # Спектры левого и правого канала одним rfft по двум строкам; моно-спектр L+R
+        # получается их суммой (rfft линеен), поэтому centroid/band_energies работают как после analyze.
+        if len(data) != self.block_size:
+            self.resize(len(data))
+        np.copyto(self.stereo, data.T)
+        if self.window is not None:
+            np.multiply(self.stereo, self.window, out=self.stereo)
+        if RFFT_HAS_OUT:
+            np.fft.rfft(self.stereo, axis=1, out=self.channel_spectra)
+        else:
+            self.channel_spectra[:] = np.fft.rfft(self.stereo, axis=1)
+        np.add(self.channel_spectra[0], self.channel_spectra[1], out=self.spectrum)
+        np.abs(self.spectrum, out=self.mags)
+        self.mag_sum = float(self.mags.sum())
+        return self.mags
+
+    def centroid(self):
+        if self.mag_sum <= 0:
+            return 0.0
+        return float(np.dot(self.mags, self.bin_freqs)) / self.mag_sum
+
+    def energy(self):
+        return float(np.dot(self.mags, self.mags))
+
+    def rolloff(self, fraction=0.85):
+        if self.mag_sum <= 0:
+            return 0.0
+        np.cumsum(self.mags, out=self.cumulative)
+        index = int(np.searchsorted(self.cumulative, fraction * self.mag_sum))
+        return float(self.bin_freqs[min(index, len(self.bin_freqs) - 1)])
+
+    def band_slices(self, bands):
+        key = tuple(bands)
+        slices = self.band_slice_cache.get(key)
+        if slices is None:
+            slices = tuple(
+                slice(int(np.searchsorted(self.bin_freqs, low)), int(np.searchsorted(self.bin_freqs, high, side="right")))
+                for low, high in key
+            )
+            self.band_slice_cache[key] = slices
+        return slices
+
+    def band_energies(self, bands, out=None):
+        slices = self.band_slices(bands)
+        if out is None:
+            out = np.empty(len(slices))
+        for index, band in enumerate(slices):
+            values = self.mags[band]
+            out[index] = np.dot(values, values)
+        return out
+
+
+def analyze_block_batch(blocks, sensitivity, sample_rate=SAMPLE_RATE):
+    # blocks: (N, BLOCK_SIZE, 2). Один batched rfft и редукции по осям вместо цикла по блокам.
+    blocks = np.asarray(blocks, dtype=np.float32)
+    block_size = blocks.shape[1]
+
+    rms = np.sqrt(np.mean(np.square(blocks, dtype=np.float64), axis=1))
+    rms_l = rms[:, 0]
+    rms_r = rms[:, 1]
+    channel_sum = rms_l + rms_r
+    balance = (rms_r - rms_l) / (channel_sum + 0.000001)
+    level = np.power(channel_sum * sensitivity, COMPRESSION)
+
+    mags = np.abs(np.fft.rfft(blocks[:, :, 0] + blocks[:, :, 1], axis=1))
+    mag_sum = np.sum(mags, axis=1)
+    weighted = mags @ spectrum_plan(block_size, sample_rate)[0]
+    centroid = np.divide(weighted, mag_sum, out=np.zeros_like(mag_sum, dtype=np.float64), where=mag_sum > 0)
+
+    return {
+        "rms_l": rms_l,
+        "rms_r": rms_r,
+        "balance": balance,
+        "level": level,
+        "centroid": centroid,
+        "has_spectrum": mag_sum > 0,
+    }
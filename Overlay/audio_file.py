@@ -0,0 +1,136 @@
+import os
+import time
+
+import numpy as np
+from scipy import signal
+from scipy.io import wavfile
+
+from app_config import log_message
+
+AUDIO_FILE_EXTENSIONS = (".wav", ".flac")
+
+
+def load_audio_file(path):
+    if os.path.splitext(path)[1].lower() == ".flac":
+        try:
+            import soundfile
+        except ImportError:
+            raise RuntimeError("Для FLAC нужен пакет soundfile: pip install soundfile")
+        data, rate = soundfile.read(path, dtype="float32", always_2d=True)
+        return rate, data
+
+    # WAV читается через mmap: блоки берутся прямо из файла без загрузки всей записи в память.
+    try:
+        rate, data = wavfile.read(path, mmap=True)
+    except ValueError:
+        rate, data = wavfile.read(path)
+    if data.ndim == 1:
+        data = data[:, np.newaxis]
+    return rate, data
+
+
+def audio_file_channels(path):
+    if os.path.splitext(path)[1].lower() == ".flac":
+        try:
+            import soundfile
+        except ImportError:
+            return 2
+        return soundfile.info(path).channels
+    return load_audio_file(path)[1].shape[1]
+
+
+def pcm_to_float32(block):
+    if block.dtype == np.float32:
+        return block
+    if block.dtype == np.uint8:
+        return (block.astype(np.float32) - 128.0) / 128.0
+    if np.issubdtype(block.dtype, np.integer):
+        return block.astype(np.float32) / float(np.iinfo(block.dtype).max + 1)
+    return block.astype(np.float32)
+
+
+class FileRecorder:
+    # start/end - отрезок записи в секундах; timestamp - время начала последнего выданного блока.
+    def __init__(self, path, samplerate, channels, blocksize=None, realtime=False, loop=False, start=0.0, end=None):
+        rate, data = load_audio_file(path)
+        if rate != samplerate:
+            log_message(f"Replay resample {rate} -> {samplerate}: {path}")
+            gcd = np.gcd(int(rate), int(samplerate))
+            data = signal.resample_poly(pcm_to_float32(np.asarray(data)), samplerate // gcd, rate // gcd, axis=0).astype(np.float32)
+        self.data = data
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.realtime = realtime
+        self.loop = loop
+        self.start = min(max(int(start * samplerate), 0), len(data))
+        self.stop = len(data) if end is None else min(max(int(end * samplerate), self.start), len(data))
+        self.position = self.start
+        self.timestamp = self.start / samplerate
+        self.frames_read = 0
+        self.started_at = None
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.data = None
+        return False
+
+    def record(self, numframes=None):
+        numframes = numframes or self.blocksize
+        total = self.stop
+        if self.position >= total:
+            if not self.loop or total == self.start:
+                raise EOFError("Запись закончилась")
+            self.position = self.start
+
+        self.timestamp = self.position / self.samplerate
+        end = min(self.position + numframes, total)
+        chunk = pcm_to_float32(np.asarray(self.data[self.position:end]))
+        self.position = end
+
+        block = np.zeros((numframes, self.channels), dtype=np.float32)
+        if chunk.shape[1] >= self.channels:
+            block[:len(chunk)] = chunk[:, :self.channels]
+        else:
+            block[:len(chunk)] = np.tile(chunk, (1, self.channels))[:, :self.channels]
+
+        self.frames_read += numframes
+        if self.realtime:
+            delay = self.started_at + self.frames_read / self.samplerate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return block
+
+
+class FileAudioSource:
+    # Повторяет интерфейс soundcard-микрофона: source.recorder(...) -> recorder.record(numframes).
+    def __init__(self, path, realtime=False, loop=False, start=0.0, end=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.start = start
+        self.end = end
+
+    @property
+    def channels(self):
+        # Как у soundcard: сколько каналов отдает источник (для выбора 5.1/7.1).
+        return audio_file_channels(self.path)
+
+    def recorder(self, samplerate, channels=2, blocksize=None):
+        return FileRecorder(
+            self.path, samplerate, channels, blocksize, realtime=self.realtime, loop=self.loop, start=self.start, end=self.end
+        )
+
+
+def find_audio_files(folder):
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        os.path.join(folder, name)
+        for name in os.listdir(folder)
+        if os.path.splitext(name)[1].lower() in AUDIO_FILE_EXTENSIONS
+    )
@@ -0,0 +1,32 @@
+import numpy as np
+from scipy import signal
+
+from app_config import FREQ_HIGH, FREQ_LOW, SAMPLE_RATE
+
+# В тишине состояние фильтра затухает экспоненциально и рано или поздно дошло бы до денормализованных
+# чисел float64 (ниже ~2.2e-308), на которых sosfilt замедляется. Порог выбран с большим запасом
+# над ними и далеко под любым слышимым уровнем: меньшее состояние обнуляется заранее.
+FILTER_STATE_FLOOR = 1e-30
+
+
+class StreamingBandpass:
+    # Butterworth в виде секций второго порядка; состояние zi переносится между блоками,
+    # поэтому поблочный результат совпадает с фильтрацией всего потока целиком.
+    def __init__(self, low=FREQ_LOW, high=FREQ_HIGH, sample_rate=SAMPLE_RATE, order=4):
+        self.sos = signal.butter(order, [low, high], btype="band", fs=sample_rate, output="sos")
+        self.zi = None
+
+    def reset(self):
+        self.zi = None
+
+    def process(self, data):
+        channels = data.shape[1]
+        if self.zi is None or self.zi.shape[2] != channels:
+            self.zi = np.zeros((self.sos.shape[0], 2, channels))
+            self.zi_abs = np.empty_like(self.zi)
+            self.zi_small = np.empty(self.zi.shape, dtype=bool)
+        filtered, self.zi = signal.sosfilt(self.sos, data, axis=0, zi=self.zi)
+        np.abs(self.zi, out=self.zi_abs)
+        np.less(self.zi_abs, FILTER_STATE_FLOOR, out=self.zi_small)
+        np.copyto(self.zi, 0.0, where=self.zi_small)
+        return filtered
@@ -1,5 +1,4 @@
 import json
-import math
 import os
 import time
 
@@ -8,13 +7,17 @@ import soundcard as sc
 
 from app_config import (
     BLOCK_SIZE,
-    COMPRESSION,
     DIAGNOSTIC_REPORT_FILE,
     NOISE_FLOOR,
+    REPLAY_DIR,
     SAMPLE_RATE,
     clamp,
     log_message,
 )
+from audio_capture import CaptureStream, RecorderBackend
+from capture_supervisor import find_audio_source
+from audio_features import analyze_block_batch
+from audio_file import FileAudioSource, find_audio_files
 
 
 def get_audio_sources():
@@ -39,10 +42,22 @@ def get_audio_sources():
     except Exception as e:
         log_message(f"Microphone scan error: {e}")
 
+    for path in find_audio_files(REPLAY_DIR):
+        sources.append({
+            "label": f"FILE REPLAY     | {os.path.basename(path)}",
+            "name": path,
+            "kind": "file",
+            "realtime": True,
+            "loop": True,
+        })
+
     return sources
 
 
 def open_audio_recorder_source(source):
+    if source and source.get("kind") == "file":
+        return FileAudioSource(source["name"], realtime=source.get("realtime", False), loop=source.get("loop", False))
+
     if source and source.get("kind") == "microphone":
         return sc.get_microphone(id=str(source["name"]), include_loopback=False)
 
@@ -52,49 +67,40 @@ def open_audio_recorder_source(source):
     return sc.get_microphone(id=str(sc.default_speaker().name), include_loopback=True)
 
 
-def audio_level_from_block(data, sensitivity):
-    channel_sum = math.sqrt(float(np.mean(data[:, 0] ** 2))) + math.sqrt(float(np.mean(data[:, 1] ** 2)))
-    return float(np.power(channel_sum * sensitivity, COMPRESSION))
+def resolve_audio_source(source):
+    # Перед каждым (пере)подключением устройство ищется заново: после отключения его id мог смениться.
+    if not source or source.get("kind") == "file":
+        return source
+    return find_audio_source(source, get_audio_sources())
 
 
-def measure_noise_floor(source, sensitivity, seconds=3.0):
-    levels = []
+def open_capture_stream(recorder_source, channels=2):
+    # Источник из open_audio_recorder_source, обернутый в поток захвата с кольцом блоков (audio_capture.py).
+    return CaptureStream(RecorderBackend(recorder_source, channels=channels, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE))
+
+
+def record_blocks(source, seconds):
     frames = max(1, int(seconds * SAMPLE_RATE / BLOCK_SIZE))
+    blocks = np.empty((frames, BLOCK_SIZE, 2), dtype=np.float32)
     with open_audio_recorder_source(source).recorder(samplerate=SAMPLE_RATE, channels=2, blocksize=BLOCK_SIZE) as recorder:
-        for _ in range(frames):
-            data = recorder.record(numframes=BLOCK_SIZE)
-            levels.append(audio_level_from_block(data, sensitivity))
+        for index in range(frames):
+            blocks[index] = recorder.record(numframes=BLOCK_SIZE)
+    return blocks
 
-    if not levels:
+
+def measure_noise_floor(source, sensitivity, seconds=3.0):
+    blocks = record_blocks(source, seconds)
+    if not len(blocks):
         return NOISE_FLOOR
 
+    levels = analyze_block_batch(blocks, sensitivity)["level"]
     percentile = float(np.percentile(levels, 90))
     return clamp(percentile * 1.7, 0.006, 0.25)
 
 
 def diagnose_audio_source(source, sensitivity, seconds=1.0):
-    levels = []
-    balances = []
-    centroids = []
-    frames = max(1, int(seconds * SAMPLE_RATE / BLOCK_SIZE))
-    with open_audio_recorder_source(source).recorder(samplerate=SAMPLE_RATE, channels=2, blocksize=BLOCK_SIZE) as recorder:
-        for _ in range(frames):
-            data = recorder.record(numframes=BLOCK_SIZE)
-            rms_l = math.sqrt(float(np.mean(data[:, 0] ** 2)))
-            rms_r = math.sqrt(float(np.mean(data[:, 1] ** 2)))
-            channel_sum = rms_l + rms_r
-            level = float(np.power(channel_sum * sensitivity, COMPRESSION))
-            balance = (rms_r - rms_l) / (channel_sum + 0.000001)
-            levels.append(level)
-            balances.append(balance)
-
-            freqs = np.fft.rfft(data[:, 0] + data[:, 1])
-            mags = np.abs(freqs)
-            mag_sum = np.sum(mags)
-            if mag_sum > 0:
-                centroids.append(float((np.sum(np.arange(len(mags)) * mags) / mag_sum) * (SAMPLE_RATE / BLOCK_SIZE)))
-
-    if not levels:
+    blocks = record_blocks(source, seconds)
+    if not len(blocks):
         return {
             "level": 0.0,
             "peak": 0.0,
@@ -103,12 +109,14 @@ def diagnose_audio_source(source, sensitivity, seconds=1.0):
             "frames": 0,
         }
 
+    features = analyze_block_batch(blocks, sensitivity)
+    centroids = features["centroid"][features["has_spectrum"]]
     return {
-        "level": float(np.mean(levels)),
-        "peak": float(np.max(levels)),
-        "balance": float(np.mean(balances)),
-        "centroid": float(np.mean(centroids)) if centroids else 0.0,
-        "frames": len(levels),
+        "level": float(np.mean(features["level"])),
+        "peak": float(np.max(features["level"])),
+        "balance": float(np.mean(features["balance"])),
+        "centroid": float(np.mean(centroids)) if len(centroids) else 0.0,
+        "frames": len(blocks),
     }
 
 
@@ -128,7 +136,7 @@ def preflight_audio_source(source, sensitivity, noise_floor):
     return True, warnings, report
 
 
-def write_diagnostic_report(window, audio_source, settings, audio_status, audio_error_message, last_report=None):
+def write_diagnostic_report(window, audio_source, settings, audio_status, audio_error_message, last_report=None, runtime_stats=None):
     report = {
         "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
         "selected_window": window,
@@ -137,6 +145,7 @@ def write_diagnostic_report(window, audio_source, settings, audio_status, audio_
         "audio_status": audio_status,
         "audio_error": audio_error_message,
         "last_measurement": last_report,
+        "runtime_stats": runtime_stats,
         "available_audio_sources": get_audio_sources(),
     }
     with open(DIAGNOSTIC_REPORT_FILE, "w", encoding="utf-8") as f:
@@ -0,0 +1,118 @@
+import numpy as np
+
+from app_config import FEATURE_BANDS
+from audio_direction import NUM_SECTORS
+
+# Полосы шагов и выстрелов: музыка и эмбиент вне них не тянут направление на себя.
+PAN_BANDS = ("step", "crack")
+# Наибольшая ширина сектора из настроек (sector_spread 1..3).
+MAX_SPREAD = 3
+
+
+class SpectralPanner:
+    # Панорама по бинам спектра вместо общего RMS: для каждого бина полос PAN_BANDS
+    # pan = (|R| - |L|) / (|R| + |L|), угол как у direction_angle_from_balance, и гистограмма
+    # по 16 секторам с весом по амплитуде бина. Тихий шаг сбоку получает свой пик, даже если
+    # громкий звук по центру перевешивает широкополосный баланс.
+    def __init__(self, spectrum, band_names=PAN_BANDS, num_sectors=NUM_SECTORS):
+        self.spectrum = spectrum
+        self.band_ranges = tuple(FEATURE_BANDS[name] for name in band_names)
+        self.num_sectors = num_sectors
+        self.sector_width = 360.0 / num_sectors
+        self.histogram = np.zeros(num_sectors)
+        # Форма гистограммы, сглаженная во времени, и уровни секторов для отрисовки.
+        self.shape = np.zeros(num_sectors)
+        self.levels = np.zeros(num_sectors)
+        self.shifted = np.zeros(num_sectors)
+        self.has_shape = False
+        sectors = np.arange(num_sectors)
+        self.neighbours = [
+            ((sectors - distance) % num_sectors, (sectors + distance) % num_sectors)
+            for distance in range(1, MAX_SPREAD + 1)
+        ]
+        self.plan_block_size = None
+
+    def plan(self):
+        slices = self.spectrum.band_slices(self.band_ranges)
+        self.bins = np.concatenate([np.arange(band.start, band.stop) for band in slices]).astype(np.intp)
+        count = len(self.bins)
+        self.picked = np.empty(count, dtype=np.complex128)
+        self.left = np.empty(count)
+        self.right = np.empty(count)
+        self.weight = np.empty(count)
+        self.pan = np.empty(count)
+        self.sector_index = np.empty(count, dtype=np.intp)
+        self.plan_block_size = self.spectrum.block_size
+
+    def analyze(self, is_back=False, swap_channels=False):
+        if self.plan_block_size != self.spectrum.block_size:
+            self.plan()
+        spectra = self.spectrum.channel_spectra
+        np.take(spectra[0], self.bins, out=self.picked)
+        np.abs(self.picked, out=self.left)
+        np.take(spectra[1], self.bins, out=self.picked)
+        np.abs(self.picked, out=self.right)
+
+        np.add(self.left, self.right, out=self.weight)
+        np.subtract(self.right, self.left, out=self.pan)
+        np.add(self.weight, 1e-12, out=self.left)
+        np.divide(self.pan, self.left, out=self.pan)
+
+        # pan -1..1 -> угол (как direction_angle_from_balance) -> номер сектора, все на месте в self.pan.
+        scale = 90.0 if not is_back else -90.0
+        if swap_channels:
+            scale = -scale
+        self.pan *= scale
+        if is_back:
+            self.pan += 180.0
+        self.pan += self.sector_width / 2
+        self.pan /= self.sector_width
+        np.floor(self.pan, out=self.pan)
+        np.mod(self.pan, self.num_sectors, out=self.pan)
+        np.copyto(self.sector_index, self.pan, casting="unsafe")
+
+        self.histogram[:] = np.bincount(self.sector_index, weights=self.weight, minlength=self.num_sectors)
+        total = float(self.histogram.sum())
+        if total <= 0:
+            return None
+
+        peak = int(np.argmax(self.histogram))
+        center = self.histogram[peak]
+        left = self.histogram[(peak - 1) % self.num_sectors]
+        right = self.histogram[(peak + 1) % self.num_sectors]
+        offset = 0.0
+        denominator = left - 2.0 * center + right
+        if denominator < 0:
+            offset = max(-0.5, min(0.5, 0.5 * (left - right) / denominator))
+        angle = ((peak + offset) * self.sector_width) % 360
+        focus = center / total
+        self.histogram /= center
+        return {"angle": angle, "focus": float(focus), "histogram": self.histogram}
+
+    def sector_levels(self, level, spread=2, smoothing=1.0):
+        # Гистограмма последнего analyze() для отрисовки, с теми же настройками, что и у одного направления:
+        # форма сглаживается во времени с силой direction_smoothing (яркость берется из level сразу),
+        # а каждый пик разливается на sector_spread соседей со спадом 0.5 на сектор, как в build_sector_levels.
+        if self.has_shape:
+            np.subtract(self.histogram, self.shape, out=self.shifted)
+            self.shifted *= min(max(smoothing, 0.0), 1.0)
+            self.shape += self.shifted
+        else:
+            np.copyto(self.shape, self.histogram)
+            self.has_shape = True
+
+        np.copyto(self.levels, self.shape)
+        for distance, indices in enumerate(self.neighbours[:max(spread, 0)], start=1):
+            falloff = 0.5 ** distance
+            for index in indices:
+                np.take(self.shape, index, out=self.shifted)
+                self.shifted *= falloff
+                np.maximum(self.levels, self.shifted, out=self.levels)
+        top = float(self.levels.max())
+        if top > 0:
+            self.levels *= min(max(level, 0.0), 1.0) / top
+        return self.levels
+
+    def release(self):
+        # Звук ниже порога: следующий начнется со своей формы, без следа от прошлого направления.
+        self.has_shape = False
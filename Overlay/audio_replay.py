@@ -0,0 +1,101 @@
+import argparse
+import json
+import sys
+import time
+
+from app_config import BLOCK_SIZE, CHANNEL_LAYOUTS, DEFAULT_SETTINGS, PROFILE_PRESETS, SAMPLE_RATE, apply_profile_preset
+from audio_direction import angle_to_sector
+from audio_file import FileAudioSource
+from audio_surround import capture_channels
+from radar_engine import RadarEngine
+from session_log import SessionLog, SessionLogSource, is_session_log
+
+
+def replay_audio_file(path, settings=None, realtime=False, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE, start=0.0, end=None):
+    engine = RadarEngine(settings, sample_rate=sample_rate, block_size=block_size)
+    timeline = []
+    blocks = 0
+    started = time.perf_counter()
+    # Запись сессии (.rzlog) открывается с момента start через индекс, WAV/FLAC - сдвигом позиции;
+    # время в таймлайне - время записи.
+    if is_session_log(path):
+        source = SessionLogSource(path, start=start, end=end, realtime=realtime)
+    else:
+        source = FileAudioSource(path, realtime=realtime, start=start, end=end)
+    channels = capture_channels(source, engine.settings.get("channel_layout", "stereo"))
+    with source.recorder(samplerate=sample_rate, channels=channels, blocksize=block_size) as recorder:
+        while True:
+            try:
+                data = recorder.record(numframes=block_size)
+            except EOFError:
+                break
+            frame = engine.process(data)
+            timeline.append({
+                "time": round(getattr(recorder, "timestamp", blocks * block_size / sample_rate), 4),
+                "event": frame["event"],
+                "angle": None if frame["angle"] is None else round(frame["angle"], 1),
+                "sector": None if frame["angle"] is None else angle_to_sector(frame["angle"]),
+                "level": round(frame["level"], 4),
+                "confidence": round(frame["confidence"], 3),
+            })
+            blocks += 1
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    audio_seconds = blocks * block_size / sample_rate
+
+    return {
+        "timeline": timeline,
+        "blocks": blocks,
+        "audio_seconds": audio_seconds,
+        "elapsed": elapsed,
+        "blocks_per_second": blocks / elapsed,
+        "realtime_factor": audio_seconds / elapsed,
+    }
+
+
+def write_timeline(timeline, output=None, events_only=False):
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    try:
+        for row in timeline:
+            if events_only and row["event"] == "IDLE":
+                continue
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    finally:
+        if output:
+            out.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Прогон записи WAV/FLAC или сессии .rzlog через анализ радара.")
+    parser.add_argument("path")
+    parser.add_argument("--profile", default="Custom", choices=list(PROFILE_PRESETS.keys()))
+    parser.add_argument("--channel-layout", default="stereo", choices=CHANNEL_LAYOUTS, help="5.1/7.1 для многоканальных записей")
+    parser.add_argument("--realtime", action="store_true", help="выдавать блоки со скоростью реального времени")
+    parser.add_argument("--output", help="сохранить таймлайн в JSON Lines")
+    parser.add_argument("--events-only", action="store_true", help="печатать только блоки с событием, отличным от IDLE")
+    parser.add_argument("--start", type=float, default=0.0, help="начать с этой секунды записи")
+    parser.add_argument("--end", type=float, help="закончить на этой секунде записи")
+    parser.add_argument("--logged", action="store_true", help="для .rzlog: вывести то, что радар показал во время записи, без нового анализа")
+    args = parser.parse_args(argv)
+
+    if args.logged:
+        with SessionLog(args.path) as log:
+            timeline = log.timeline(args.start, args.end)
+            print(f"{len(timeline)} of {log.blocks} blocks | {log.duration:.1f} s recorded | {log.audio_format}", file=sys.stderr)
+        write_timeline(timeline, args.output, args.events_only)
+        return
+
+    settings = DEFAULT_SETTINGS.copy()
+    apply_profile_preset(settings, args.profile)
+    settings["channel_layout"] = args.channel_layout
+    result = replay_audio_file(args.path, settings, realtime=args.realtime, start=args.start, end=args.end)
+    write_timeline(result["timeline"], args.output, args.events_only)
+
+    print(
+        f"{result['blocks']} blocks | {result['audio_seconds']:.1f} s audio in {result['elapsed']:.2f} s | "
+        f"{result['blocks_per_second']:.0f} blocks/s | x{result['realtime_factor']:.1f} realtime",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
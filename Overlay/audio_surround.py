@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+
+from app_config import BLOCK_SIZE, FEATURE_BANDS, SAMPLE_RATE
+from audio_features import RFFT_HAS_OUT, spectrum_plan
+
+# Углы колонок по часовой стрелке от направления вперед, в порядке каналов WAVE/WASAPI.
+# None - LFE, в направлении не участвует. В 5.1 боковые колонки стоят на +-110 градусов (ITU-R BS.775).
+SPEAKER_LAYOUTS = {
+    "stereo": (330.0, 30.0),
+    "5.1": (330.0, 30.0, 0.0, None, 250.0, 110.0),
+    "7.1": (330.0, 30.0, 0.0, None, 210.0, 150.0, 270.0, 90.0),
+}
+
+
+def layout_channels(layout):
+    return len(SPEAKER_LAYOUTS.get(layout, SPEAKER_LAYOUTS["stereo"]))
+
+
+def layout_for_channels(channels):
+    for layout, angles in SPEAKER_LAYOUTS.items():
+        if len(angles) == channels:
+            return layout
+    return None
+
+
+def capture_channels(source, layout):
+    # Сколько каналов открывать: многоканальный режим только если устройство столько отдает, иначе стерео.
+    wanted = layout_channels(layout)
+    if wanted <= 2:
+        return 2
+    try:
+        available = int(getattr(source, "channels", 2))
+    except Exception:
+        available = 2
+    return wanted if available >= wanted else 2
+
+
+class SurroundDirection:
+    # Направление по многоканальному миксу: один rfft по всем каналам, энергии полос FEATURE_BANDS
+    # для каждого канала через cumsum по бинам, затем сумма векторов колонок с весом по амплитуде.
+    def __init__(self, layout="7.1", block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE):
+        angles = SPEAKER_LAYOUTS[layout]
+        self.layout = layout
+        self.channels = len(angles)
+        self.block_size = block_size
+        radians = [math.radians(angle) if angle is not None else 0.0 for angle in angles]
+        self.mask = np.array([0.0 if angle is None else 1.0 for angle in angles])
+        self.unit_x = np.sin(radians) * self.mask
+        self.unit_y = np.cos(radians) * self.mask
+
+        # Стерео-даунмикс для признаков и классификатора: панорама колонки по закону равной мощности.
+        pan = np.clip(np.sin(radians), -1.0, 1.0)
+        self.downmix_matrix = np.stack([np.sqrt((1.0 - pan) / 2.0), np.sqrt((1.0 + pan) / 2.0)], axis=1) * self.mask[:, np.newaxis]
+
+        bin_freqs = spectrum_plan(block_size, sample_rate)[0]
+        self.band_names = tuple(FEATURE_BANDS.keys())
+        self.band_starts = np.array([int(np.searchsorted(bin_freqs, low)) for low, _ in FEATURE_BANDS.values()])
+        self.band_stops = np.array([int(np.searchsorted(bin_freqs, high, side="right")) for _, high in FEATURE_BANDS.values()])
+        bins = len(bin_freqs)
+        self.planar = np.empty((self.channels, block_size))
+        self.spectra = np.empty((self.channels, bins), dtype=np.complex128)
+        self.power = np.empty((self.channels, bins))
+        self.cumulative = np.empty((self.channels, bins + 1))
+        self.cumulative[:, 0] = 0.0
+        self.band_energy = np.empty((self.channels, len(self.band_starts)))
+        self.scratch = np.empty((self.channels, len(self.band_starts)))
+        self.channel_energy = np.empty(self.channels)
+        self.weights = np.empty(self.channels)
+        self.stereo = np.empty((block_size, 2))
+
+    def band_energies(self, data):
+        np.copyto(self.planar, data.T)
+        if RFFT_HAS_OUT:
+            np.fft.rfft(self.planar, axis=1, out=self.spectra)
+        else:
+            self.spectra[:] = np.fft.rfft(self.planar, axis=1)
+        np.abs(self.spectra, out=self.power)
+        np.multiply(self.power, self.power, out=self.power)
+        np.cumsum(self.power, axis=1, out=self.cumulative[:, 1:])
+        np.take(self.cumulative, self.band_stops, axis=1, out=self.band_energy)
+        np.take(self.cumulative, self.band_starts, axis=1, out=self.scratch)
+        self.band_energy -= self.scratch
+        return self.band_energy
+
+    def analyze(self, data):
+        self.band_energies(data)
+        np.sum(self.band_energy, axis=1, out=self.channel_energy)
+        self.channel_energy *= self.mask
+        # Амплитуда канала (корень из энергии) - тот же масштаб, что у RMS-баланса стерео.
+        np.sqrt(self.channel_energy, out=self.weights)
+        total_weight = float(self.weights.sum())
+        if total_weight <= 0:
+            return {"angle": None, "focus": 0.0, "channel_levels": self.weights}
+
+        x = float(np.dot(self.weights, self.unit_x))
+        y = float(np.dot(self.weights, self.unit_y))
+        # focus: 1 - звук в одной колонке, 0 - равномерно со всех сторон.
+        focus = math.hypot(x, y) / total_weight
+        angle = math.degrees(math.atan2(x, y)) % 360
+        return {"angle": angle, "focus": focus, "channel_levels": self.weights}
+
+    def downmix(self, data):
+        np.dot(data, self.downmix_matrix, out=self.stereo)
+        return self.stereo
@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+from app_config import BLOCK_SIZE, SAMPLE_RATE, clamp
+from audio_features import RFFT_HAS_OUT
+
+# Максимальная межушная задержка: около 0.7 мс для головы, с запасом на HRTF игр.
+MAX_ITD = 0.0008
+GCC_BAND = (150.0, 6000.0)
+# Доля веса задержки в итоговом балансе при полной уверенности GCC-PHAT.
+ITD_WEIGHT = 0.6
+# Запас вокруг порога частотного центра: полусфера меняется, только когда центр уверенно ушел за порог.
+REAR_HYSTERESIS = 0.15
+
+
+class TdoaEstimator:
+    # GCC-PHAT по спектрам левого и правого канала, которые уже посчитаны для блока:
+    # взаимный спектр нормируется по модулю (остается только фаза), обратный rfft дает
+    # взаимную корреляцию, а ее пик в окне +-MAX_ITD - задержку между каналами.
+    def __init__(self, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE, max_delay=MAX_ITD, band=GCC_BAND):
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.max_lag = max(1, min(int(math.ceil(max_delay * sample_rate)), block_size // 2 - 1))
+        bins = block_size // 2 + 1
+        freqs = np.fft.rfftfreq(block_size, 1.0 / sample_rate)
+        self.band_mask = ((freqs >= band[0]) & (freqs <= band[1])).astype(np.float64)
+        self.band_bins = max(float(self.band_mask.sum()), 1.0)
+        self.lags = np.arange(-self.max_lag, self.max_lag + 1)
+        self.lag_index = self.lags % block_size
+        self.cross = np.empty(bins, dtype=np.complex128)
+        self.magnitude = np.empty(bins)
+        self.correlation = np.empty(block_size)
+        self.window = np.empty(len(self.lags))
+
+    def estimate(self, spectrum_l, spectrum_r):
+        # Возвращает (задержка правого канала относительно левого в секундах, сила пика 0-1).
+        # Положительная задержка - звук сначала пришел в левый канал.
+        np.conjugate(spectrum_l, out=self.cross)
+        np.multiply(self.cross, spectrum_r, out=self.cross)
+        np.abs(self.cross, out=self.magnitude)
+        self.magnitude += 1e-12
+        np.divide(self.cross, self.magnitude, out=self.cross)
+        np.multiply(self.cross, self.band_mask, out=self.cross)
+        if RFFT_HAS_OUT:
+            np.fft.irfft(self.cross, n=self.block_size, out=self.correlation)
+        else:
+            self.correlation[:] = np.fft.irfft(self.cross, n=self.block_size)
+        np.take(self.correlation, self.lag_index, out=self.window)
+
+        peak = int(np.argmax(self.window))
+        offset = 0.0
+        if 0 < peak < len(self.window) - 1:
+            # Параболическая интерполяция между отсчетами.
+            left, center, right = self.window[peak - 1], self.window[peak], self.window[peak + 1]
+            denominator = left - 2.0 * center + right
+            if denominator < 0:
+                offset = clamp(0.5 * (left - right) / denominator, -0.5, 0.5)
+        delay = (self.lags[peak] + offset) / self.sample_rate
+        strength = clamp(self.window[peak] * self.block_size / (2.0 * self.band_bins), 0.0, 1.0)
+        return delay, strength
+
+    def delay_balance(self, delay):
+        # Задержка в той же шкале, что и баланс громкости: -1 слева, +1 справа.
+        return clamp(-delay * self.sample_rate / self.max_lag, -1.0, 1.0)
+
+
+def combine_direction(level_balance, delay_balance, strength):
+    # Баланс громкости и задержки смешиваются с весом по силе пика GCC;
+    # уверенность выше, когда пик четкий и оба признака согласны по стороне.
+    weight = ITD_WEIGHT * strength
+    balance = (level_balance * (1.0 - weight)) + (delay_balance * weight)
+    agreement = 1.0 - min(abs(level_balance - delay_balance), 2.0) / 2.0
+    confidence = clamp((strength * 0.6) + (agreement * 0.4), 0.0, 1.0)
+    return balance, confidence
+
+
+def rear_with_hysteresis(centroid, threshold, was_back):
+    if centroid < threshold * (1.0 - REAR_HYSTERESIS):
+        return True
+    if centroid > threshold * (1.0 + REAR_HYSTERESIS):
+        return False
+    return was_back
@@ -0,0 +1,289 @@
+import math
+
+import numpy as np
+
+from app_config import FEATURE_BANDS
+from audio_direction import NUM_SECTORS, build_sector_levels, direction_angle_from_balance, smooth_angle
+from audio_events import classify_audio_event_bands
+
+MAX_TRACKS = 4
+HISTOGRAM_BINS = 33
+# Пик гистограммы считается источником, если в нем не меньше этой доли энергии блока.
+MIN_PEAK_SHARE = 0.12
+PEAK_RADIUS = 2
+TRACK_DTYPE = np.dtype([
+    ("id", np.int64),
+    ("angle", np.float64),
+    ("balance", np.float64),
+    ("level", np.float64),
+    ("event", "U6"),
+    ("age", np.int64),
+])
+
+
+class SourceTracker:
+    # Несколько источников за блок: для каждого бина спектра считается баланс |R| против |L|,
+    # энергии бинов складываются в гистограмму баланса (отдельно по полосам FEATURE_BANDS),
+    # а до max_sources пиков гистограммы привязываются к постоянным трекам с затуханием.
+    # Состояние треков, пики и таблица результата выделены заранее и обновляются на месте;
+    # на блок создается только гистограмма bincount (~1 KB): у bincount нет out, а np.add.at выделяет больше.
+    def __init__(self, spectrum, max_tracks=MAX_TRACKS, histogram_bins=HISTOGRAM_BINS, gate=0.25, decay=0.8, max_age=12):
+        self.spectrum = spectrum
+        self.max_tracks = max_tracks
+        self.histogram_bins = histogram_bins
+        self.gate = gate
+        self.decay = decay
+        self.max_age = max_age
+        self.band_names = tuple(FEATURE_BANDS.keys())
+        self.band_ranges = tuple(FEATURE_BANDS.values())
+        self.bands = dict.fromkeys(self.band_names, 0.0)
+
+        self.active = np.zeros(max_tracks, dtype=bool)
+        self.matched = np.zeros(max_tracks, dtype=bool)
+        self.balance = np.zeros(max_tracks)
+        self.level = np.zeros(max_tracks)
+        self.previous_level = np.zeros(max_tracks)
+        self.age = np.zeros(max_tracks, dtype=np.int64)
+        self.track_ids = np.zeros(max_tracks, dtype=np.int64)
+        # NaN - у трека еще нет направления.
+        self.angle = np.full(max_tracks, np.nan)
+        self.events = ["IDLE"] * max_tracks
+        self.peak_index = np.zeros(max_tracks, dtype=np.intp)
+        self.peak_share = np.zeros(max_tracks)
+        self.order = np.zeros(max_tracks, dtype=np.intp)
+        self.table = np.zeros(max_tracks, dtype=TRACK_DTYPE)
+        self.next_id = 1
+        self.plan_block_size = None
+
+    def plan(self):
+        # Бины между нижней и верхней полосой; бины вне полос попадают в лишнюю строку гистограммы.
+        slices = self.spectrum.band_slices(self.band_ranges)
+        start = min(band.start for band in slices)
+        stop = max(band.stop for band in slices)
+        self.selection = slice(start, stop)
+        count = stop - start
+        bands = len(slices)
+        band_offset = np.full(count, bands * self.histogram_bins, dtype=np.intp)
+        for index, band in enumerate(slices):
+            band_offset[band.start - start:band.stop - start] = index * self.histogram_bins
+        self.band_offset = band_offset
+        self.mag_l = np.empty(count)
+        self.mag_r = np.empty(count)
+        self.weight = np.empty(count)
+        self.bin_balance = np.empty(count)
+        self.indices = np.empty(count, dtype=np.intp)
+        self.histogram = np.zeros((bands + 1) * self.histogram_bins)
+        self.band_histogram = self.histogram.reshape(bands + 1, self.histogram_bins)[:bands]
+        self.combined = np.zeros(self.histogram_bins)
+        self.smoothed = np.zeros(self.histogram_bins)
+        self.neighbour = np.zeros(self.histogram_bins - 1)
+        self.plan_block_size = self.spectrum.block_size
+
+    def reset(self):
+        self.active[:] = False
+        self.matched[:] = False
+        self.balance[:] = 0.0
+        self.level[:] = 0.0
+        self.previous_level[:] = 0.0
+        self.age[:] = 0
+        self.track_ids[:] = 0
+        self.angle[:] = np.nan
+        for index in range(self.max_tracks):
+            self.events[index] = "IDLE"
+
+    def build_histogram(self):
+        if self.plan_block_size != self.spectrum.block_size:
+            self.plan()
+        spectra = self.spectrum.channel_spectra
+        np.abs(spectra[0, self.selection], out=self.mag_l)
+        np.abs(spectra[1, self.selection], out=self.mag_r)
+        np.multiply(self.mag_l, self.mag_l, out=self.weight)
+        np.subtract(self.mag_r, self.mag_l, out=self.bin_balance)
+        np.add(self.mag_l, self.mag_r, out=self.mag_l)
+        self.mag_l += 1e-12
+        np.divide(self.bin_balance, self.mag_l, out=self.bin_balance)
+        np.multiply(self.mag_r, self.mag_r, out=self.mag_r)
+        self.weight += self.mag_r
+
+        # Баланс -1..1 -> номер бина гистограммы 0..histogram_bins-1, плюс смещение строки полосы.
+        self.bin_balance += 1.0
+        self.bin_balance *= (self.histogram_bins - 1) * 0.5
+        np.rint(self.bin_balance, out=self.bin_balance)
+        np.copyto(self.indices, self.bin_balance, casting="unsafe")
+        self.indices += self.band_offset
+        # bincount - единственный новый массив за блок (~1 KB гистограммы); np.add.at медленнее и выделяет больше.
+        self.histogram[:] = np.bincount(self.indices, weights=self.weight, minlength=len(self.histogram))
+
+        np.copyto(self.combined, self.band_histogram[0])
+        for row in self.band_histogram[1:]:
+            self.combined += row
+        np.multiply(self.combined, 0.5, out=self.smoothed)
+        np.multiply(self.combined[:-1], 0.25, out=self.neighbour)
+        self.smoothed[1:] += self.neighbour
+        np.multiply(self.combined[1:], 0.25, out=self.neighbour)
+        self.smoothed[:-1] += self.neighbour
+        return float(self.combined.sum())
+
+    def find_peaks(self, total_mass, max_sources):
+        # До max_sources самых весомых пиков по убыванию доли в peak_index/peak_share; возвращает их число.
+        values = self.smoothed
+        last = self.histogram_bins - 1
+        count = 0
+        for index in range(self.histogram_bins):
+            value = values[index]
+            if value <= 0.0:
+                continue
+            if index > 0 and values[index - 1] >= value:
+                continue
+            if index < last and values[index + 1] > value:
+                continue
+            low = max(index - PEAK_RADIUS, 0)
+            high = min(index + PEAK_RADIUS + 1, self.histogram_bins)
+            share = float(self.combined[low:high].sum()) / total_mass
+            if share < MIN_PEAK_SHARE:
+                continue
+            position = count
+            while position > 0 and self.peak_share[position - 1] <= share:
+                if position < max_sources:
+                    self.peak_share[position] = self.peak_share[position - 1]
+                    self.peak_index[position] = self.peak_index[position - 1]
+                position -= 1
+            if position < max_sources:
+                self.peak_share[position] = share
+                self.peak_index[position] = index
+                count = min(count + 1, max_sources)
+        return count
+
+    def peak_balance(self, index):
+        offset = 0.0
+        if 0 < index < self.histogram_bins - 1:
+            left, center, right = self.smoothed[index - 1], self.smoothed[index], self.smoothed[index + 1]
+            denominator = left - 2.0 * center + right
+            if denominator < 0:
+                offset = max(-0.5, min(0.5, 0.5 * (left - right) / denominator))
+        return ((index + offset) / (self.histogram_bins - 1)) * 2.0 - 1.0
+
+    def peak_bands(self, index, peak_mass):
+        low = max(index - PEAK_RADIUS, 0)
+        high = min(index + PEAK_RADIUS + 1, self.histogram_bins)
+        for band, name in enumerate(self.band_names):
+            self.bands[name] = float(self.band_histogram[band, low:high].sum()) / peak_mass
+        return self.bands
+
+    def update(self, level, centroid, noise_floor, is_back=False, is_moving=False, max_sources=MAX_TRACKS, swap_channels=False, smoothing=0.35):
+        total_mass = self.build_histogram()
+        matched = self.matched
+        matched[:] = False
+        if total_mass > 0:
+            for peak in range(self.find_peaks(total_mass, min(max_sources, self.max_tracks))):
+                share = float(self.peak_share[peak])
+                index = int(self.peak_index[peak])
+                balance = self.peak_balance(index)
+                peak_level = level * share ** 0.5
+                if peak_level <= noise_floor:
+                    # Пик ниже порога шума не открывает и не поддерживает трек, как и общий уровень для одного источника.
+                    continue
+                bands = self.peak_bands(index, share * total_mass)
+                slot = self.associate(balance, matched)
+                if slot is None:
+                    continue
+                matched[slot] = True
+                self.events[slot] = classify_audio_event_bands(
+                    peak_level, self.previous_level[slot], centroid, bands, noise_floor, is_moving=is_moving
+                )
+                self.previous_level[slot] = (self.previous_level[slot] * 0.72) + (peak_level * 0.28)
+                self.level[slot] = max(peak_level, self.level[slot] * self.decay)
+                self.age[slot] = 0
+                angle = direction_angle_from_balance(balance, is_back=is_back, swap_channels=swap_channels)
+                track_smoothing = max(smoothing, 0.75) if self.events[slot] in ("IMPACT", "SHARP") else smoothing
+                previous = None if math.isnan(self.angle[slot]) else float(self.angle[slot])
+                self.angle[slot] = smooth_angle(previous, angle, track_smoothing)
+        self.age_tracks(matched, noise_floor)
+        return self.tracks()
+
+    def associate(self, balance, matched):
+        best = None
+        best_distance = self.gate
+        for slot in range(self.max_tracks):
+            if not self.active[slot] or matched[slot]:
+                continue
+            distance = abs(self.balance[slot] - balance)
+            if distance <= best_distance:
+                best = slot
+                best_distance = distance
+        if best is not None:
+            self.balance[best] += (balance - self.balance[best]) * 0.5
+            return best
+
+        # Новый трек: свободный слот, иначе вытесняется самый тихий из несопоставленных.
+        free = None
+        for slot in range(self.max_tracks):
+            if matched[slot]:
+                continue
+            if not self.active[slot]:
+                free = slot
+                break
+            if free is None or self.level[slot] < self.level[free]:
+                free = slot
+        if free is None:
+            return None
+        self.active[free] = True
+        self.balance[free] = balance
+        self.level[free] = 0.0
+        self.previous_level[free] = 0.0
+        self.age[free] = 0
+        self.angle[free] = np.nan
+        self.track_ids[free] = self.next_id
+        self.next_id += 1
+        return free
+
+    def age_tracks(self, matched, noise_floor):
+        for slot in range(self.max_tracks):
+            if not self.active[slot] or matched[slot]:
+                continue
+            self.age[slot] += 1
+            self.level[slot] *= self.decay
+            self.previous_level[slot] *= 0.72
+            if self.level[slot] < noise_floor or self.age[slot] > self.max_age:
+                self.active[slot] = False
+                self.angle[slot] = np.nan
+                self.events[slot] = "IDLE"
+
+    def decay_tracks(self, noise_floor):
+        self.matched[:] = False
+        self.age_tracks(self.matched, noise_floor)
+        return self.tracks()
+
+    def tracks(self):
+        # Активные треки по убыванию уровня в строках table; возвращается вид на нее,
+        # который перезаписывается следующим блоком.
+        count = 0
+        for slot in range(self.max_tracks):
+            if not self.active[slot] or math.isnan(self.angle[slot]):
+                continue
+            position = count
+            while position > 0 and self.level[self.order[position - 1]] < self.level[slot]:
+                self.order[position] = self.order[position - 1]
+                position -= 1
+            self.order[position] = slot
+            count += 1
+        for row in range(count):
+            slot = self.order[row]
+            self.table[row] = (
+                self.track_ids[slot],
+                self.angle[slot],
+                self.balance[slot],
+                self.level[slot],
+                self.events[slot],
+                self.age[slot],
+            )
+        return self.table[:count]
+
+
+def tracks_to_sectors(tracks, spread=2):
+    sectors = [0.0] * NUM_SECTORS
+    for track in tracks:
+        for index, value in enumerate(build_sector_levels(track["angle"], track["level"], spread=spread)):
+            if value > sectors[index]:
+                sectors[index] = value
+    return sectors
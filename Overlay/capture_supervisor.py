@@ -0,0 +1,140 @@
+import threading
+import time
+
+# Первая повторная попытка почти сразу, дальше интервал удваивается до RECONNECT_MAX_DELAY.
+RECONNECT_START_DELAY = 0.25
+RECONNECT_MAX_DELAY = 8.0
+# Устройство, которое перестало отдавать блоки без ошибки (WASAPI после отключения), считается потерянным.
+STALL_TIMEOUT = 1.0
+
+
+def find_audio_source(wanted, sources):
+    # Тот же источник в свежем списке get_audio_sources(): сначала по имени и типу, потом по имени без регистра.
+    if not wanted or wanted.get("kind") == "file":
+        return wanted
+    name = wanted.get("name")
+    kind = wanted.get("kind")
+    for source in sources:
+        if source.get("name") == name and source.get("kind") == kind:
+            return source
+    lowered = str(name).lower()
+    for source in sources:
+        if str(source.get("name")).lower() == lowered and source.get("kind") == kind:
+            return source
+    raise LookupError(f"Audio device not found: {name}")
+
+
+class DeviceStalled(Exception):
+    pass
+
+
+class CaptureSupervisor:
+    # Сессия захвата с переподключением: open_stream(source) открывает CaptureStream,
+    # resolve_source() заново находит устройство (по имени и типу из get_audio_sources).
+    # При ошибке или зависании устройства поток закрывается, повтор идет с экспоненциальной
+    # паузой, а время от потери до первого нового блока записывается в stats().
+    def __init__(self, open_stream, resolve_source, on_status=None, start_delay=RECONNECT_START_DELAY,
+                 max_delay=RECONNECT_MAX_DELAY, stall_timeout=STALL_TIMEOUT, clock=time.monotonic):
+        self.open_stream = open_stream
+        self.resolve_source = resolve_source
+        self.on_status = on_status
+        self.start_delay = start_delay
+        self.max_delay = max_delay
+        self.stall_timeout = stall_timeout
+        self.clock = clock
+        self.stop_event = threading.Event()
+        self.stream = None
+        self.failure = None
+        self.delay = start_delay
+        self.lost_at = None
+        self.status = "IDLE"
+        self.error_message = ""
+        self.last_error = ""
+        self.disconnects = 0
+        self.attempts = 0
+        self.recoveries = 0
+        self.last_recovery = None
+        self.max_recovery = 0.0
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def fail(self, error):
+        # Ошибка обработки блока у потребителя: сессия закрывается и открывается заново, как при потере устройства.
+        self.failure = error
+
+    def set_status(self, status, message=""):
+        self.status = status
+        self.error_message = message
+        if self.on_status is not None:
+            self.on_status(status, message)
+
+    def blocks(self):
+        # Генератор блоков для цикла анализа; переподключения происходят внутри.
+        while self.running:
+            self.attempts += 1
+            try:
+                stream = self.open_stream(self.resolve_source())
+            except Exception as e:
+                self.lost(e)
+                continue
+
+            try:
+                with stream:
+                    self.stream = stream
+                    last_block = self.clock()
+                    while self.running:
+                        data = stream.read()
+                        now = self.clock()
+                        if data is None:
+                            if now - last_block > self.stall_timeout:
+                                raise DeviceStalled(f"No audio for {now - last_block:.1f} s")
+                            continue
+                        last_block = now
+                        if self.status != "RUNNING":
+                            self.recovered(now)
+                        yield data
+                        if self.failure is not None:
+                            raise self.failure
+            except Exception as e:
+                status = "ERROR" if e is self.failure else "RECONNECTING"
+                self.failure = None
+                self.lost(e, status)
+            finally:
+                self.stream = None
+
+    def recovered(self, now):
+        if self.lost_at is not None:
+            self.last_recovery = now - self.lost_at
+            self.max_recovery = max(self.max_recovery, self.last_recovery)
+            self.recoveries += 1
+            self.lost_at = None
+        self.delay = self.start_delay
+        self.set_status("RUNNING")
+
+    def lost(self, error, status="RECONNECTING"):
+        if self.lost_at is None:
+            self.lost_at = self.clock()
+            self.disconnects += 1
+        self.last_error = str(error)
+        self.set_status(status, str(error))
+        # Пауза прерывается stop(), чтобы выход не ждал до RECONNECT_MAX_DELAY.
+        self.stop_event.wait(self.delay)
+        self.delay = min(self.delay * 2.0, self.max_delay)
+
+    def stats(self):
+        return {
+            "status": self.status,
+            "error": self.error_message,
+            "last_error": self.last_error,
+            "disconnects": self.disconnects,
+            "attempts": self.attempts,
+            "recoveries": self.recoveries,
+            "last_recovery_s": round(self.last_recovery, 3) if self.last_recovery is not None else None,
+            "max_recovery_s": round(self.max_recovery, 3),
+            "next_retry_s": round(self.delay, 3) if self.lost_at is not None else None,
+        }
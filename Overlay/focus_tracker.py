@@ -0,0 +1,119 @@
+import sys
+import time
+
+# Окна самого оверлея и лаунчера не считаются потерей фокуса игры.
+OWN_WINDOW_MARK = "Razgrom"
+FOCUS_REFRESH_INTERVAL = 0.25
+
+
+class NullFocusProvider:
+    # Нет API окон (Linux, тесты без окна): фокус всегда у игры.
+    def foreground(self):
+        return None
+
+    def window_title(self, handle):
+        return ""
+
+
+class Win32FocusProvider:
+    def __init__(self):
+        import ctypes
+
+        self.user32 = ctypes.windll.user32
+        # Буфер заголовка выделяется один раз, а не на каждую проверку.
+        self.buffer = ctypes.create_unicode_buffer(255)
+
+    def foreground(self):
+        return self.user32.GetForegroundWindow()
+
+    def window_title(self, handle):
+        self.user32.GetWindowTextW(handle, self.buffer, 255)
+        return self.buffer.value
+
+
+class FakeFocusProvider:
+    # Для тестов: окна задаются словарем handle -> заголовок, активное - полем active.
+    def __init__(self, windows=None, active=None):
+        self.windows = dict(windows or {})
+        self.active = active
+        self.title_reads = 0
+
+    def foreground(self):
+        return self.active
+
+    def window_title(self, handle):
+        self.title_reads += 1
+        return self.windows.get(handle, "")
+
+
+def default_focus_provider():
+    if sys.platform == "win32":
+        try:
+            return Win32FocusProvider()
+        except Exception:
+            pass
+    return NullFocusProvider()
+
+
+class FocusTracker:
+    # Фокус окна игры для audio_loop: активное окно опрашивается не чаще раза в interval секунд,
+    # заголовок читается только когда сменился handle активного окна, handle игры кэшируется.
+    # changed выставляется на том вызове check(), где фокус потерян или вернулся.
+    def __init__(self, target_title, provider=None, interval=FOCUS_REFRESH_INTERVAL, clock=time.monotonic):
+        self.target_title = target_title
+        self.provider = provider if provider is not None else default_focus_provider()
+        self.interval = interval
+        self.clock = clock
+        self.target_handle = None
+        self.last_handle = None
+        self.focused = True
+        self.changed = False
+        self.next_refresh = 0.0
+        self.refreshes = 0
+        self.title_reads = 0
+        self.focus_changes = 0
+
+    def check(self):
+        self.changed = False
+        if not self.target_title:
+            return True
+        now = self.clock()
+        if now < self.next_refresh:
+            return self.focused
+        self.next_refresh = now + self.interval
+        focused = self.refresh()
+        if focused != self.focused:
+            self.focused = focused
+            self.changed = True
+            self.focus_changes += 1
+        return self.focused
+
+    def refresh(self):
+        self.refreshes += 1
+        try:
+            handle = self.provider.foreground()
+        except Exception:
+            return True
+        if handle is not None and handle == self.target_handle:
+            return True
+        if handle == self.last_handle:
+            return self.focused
+
+        self.last_handle = handle
+        try:
+            title = self.provider.window_title(handle)
+        except Exception:
+            return True
+        self.title_reads += 1
+        if self.target_title in title:
+            self.target_handle = handle
+            return True
+        return title == "" or OWN_WINDOW_MARK in title
+
+    def stats(self):
+        return {
+            "focused": self.focused,
+            "refreshes": self.refreshes,
+            "title_reads": self.title_reads,
+            "focus_changes": self.focus_changes,
+        }
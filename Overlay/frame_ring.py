@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+
+from app_config import BLOCK_SIZE, MIN_IDLE_FPS, SAMPLE_RATE
+from audio_direction import NUM_SECTORS
+
+PEAK, CONFIDENCE, ANGLE, LEVEL, NOISE_FLOOR = range(5)
+# Кольцо вмещает все блоки за самый длинный кадр GUI (idle_fps на минимуме) с запасом 25%:
+# иначе в тишине каждый кадр переполнял бы кольцо, и начало звука сразу после тишины терялось.
+FRAME_RING_CAPACITY = int(math.ceil(SAMPLE_RATE / BLOCK_SIZE / MIN_IDLE_FPS * 1.25))
+
+
+class FrameRing:
+    # Один писатель (аудиопоток) и один читатель (GUI), без блокировок.
+    # Слоты выделены заранее; номер кадра пишется в слот после данных, а читатель
+    # сверяет его до и после копирования, поэтому недописанный кадр никогда не виден.
+    def __init__(self, capacity=FRAME_RING_CAPACITY, num_sectors=NUM_SECTORS):
+        self.capacity = capacity
+        self.sectors = np.zeros((capacity, num_sectors))
+        self.values = np.zeros((capacity, 5))
+        self.flags = np.zeros((capacity, 2), dtype=bool)
+        self.events = ["IDLE"] * capacity
+        self.slot_seq = np.full(capacity, -1, dtype=np.int64)
+        self.scratch = np.zeros(num_sectors)
+        self.write_seq = 0
+        self.read_seq = 0
+        # Номер последнего кадра со звуком или статусом: по нему GUI выходит из редкого режима, не дожидаясь кадра.
+        self.wake_seq = -1
+        self.dropped = 0
+        self.coalesced = 0
+
+    def publish(self, frame):
+        seq = self.write_seq
+        slot = seq % self.capacity
+        self.slot_seq[slot] = -1
+        self.sectors[slot] = frame["sectors"]
+        values = self.values[slot]
+        values[PEAK] = frame["peak"]
+        values[CONFIDENCE] = frame["confidence"]
+        values[ANGLE] = math.nan if frame["angle"] is None else frame["angle"]
+        values[LEVEL] = frame["level"]
+        values[NOISE_FLOOR] = frame["noise_floor"]
+        self.flags[slot, 0] = frame["is_moving"]
+        self.flags[slot, 1] = frame["is_loud"]
+        self.events[slot] = frame["event"]
+        self.slot_seq[slot] = seq
+        if frame["event"] != "IDLE" or self.sectors[slot].any():
+            self.wake_seq = seq
+        self.write_seq = seq + 1
+
+    def wake_pending(self):
+        return self.wake_seq >= self.read_seq
+
+    def consume(self, sectors_out):
+        # Все непрочитанные кадры сливаются в sectors_out по максимуму, скаляры берутся из последнего.
+        end = self.write_seq
+        start = self.read_seq
+        if end == start:
+            return None
+        if end - start > self.capacity:
+            self.dropped += end - start - self.capacity
+            start = end - self.capacity
+
+        latest = None
+        merged = 0
+        for seq in range(start, end):
+            slot = seq % self.capacity
+            if self.slot_seq[slot] != seq:
+                self.dropped += 1
+                continue
+            np.copyto(self.scratch, self.sectors[slot])
+            values = self.values[slot]
+            snapshot = (
+                float(values[PEAK]),
+                float(values[CONFIDENCE]),
+                float(values[ANGLE]),
+                float(values[LEVEL]),
+                float(values[NOISE_FLOOR]),
+                self.events[slot],
+                bool(self.flags[slot, 0]),
+                bool(self.flags[slot, 1]),
+            )
+            if self.slot_seq[slot] != seq:
+                self.dropped += 1
+                continue
+            np.maximum(sectors_out, self.scratch, out=sectors_out)
+            latest = snapshot
+            merged += 1
+
+        self.read_seq = end
+        if merged > 1:
+            self.coalesced += merged - 1
+        if latest is None:
+            return None
+
+        peak, confidence, angle, level, noise_floor, event, is_moving, is_loud = latest
+        return {
+            "peak": peak,
+            "confidence": confidence,
+            "angle": None if math.isnan(angle) else angle,
+            "level": level,
+            "noise_floor": noise_floor,
+            "event": event,
+            "is_moving": is_moving,
+            "is_loud": is_loud,
+            "seq": end - 1,
+        }
+
+    def stats(self):
+        return {
+            "published": self.write_seq,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
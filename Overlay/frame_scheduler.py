@@ -0,0 +1,86 @@
+import time
+
+
+class FrameScheduler:
+    # Частота перерисовки оверлея: высокая, пока есть звук или гаснущие секторы,
+    # и низкая в тишине. Задержка считается от дедлайна кадра, а не от конца отрисовки,
+    # поэтому время рендера не накапливается в интервалах. В тишине между редкими кадрами
+    # GUI каждые active_interval спрашивает wait(), и звук будит его за один быстрый кадр.
+    def __init__(self, active_fps=60, idle_fps=10, idle_after=0.5, clock=time.perf_counter):
+        self.clock = clock
+        self.idle_after = idle_after
+        self.set_rates(active_fps, idle_fps)
+        self.next_deadline = None
+        self.last_active = None
+        self.frame_started = None
+        self.last_frame_started = None
+        self.frame_dt = 0.0
+        self.is_idle = True
+        self.frames = 0
+        self.wakeups = 0
+        self.avg_interval = 0.0
+        self.avg_frame_time = 0.0
+        self.max_frame_time = 0.0
+
+    def set_rates(self, active_fps, idle_fps):
+        self.active_interval = 1.0 / max(active_fps, 1.0)
+        self.idle_interval = 1.0 / max(min(idle_fps, active_fps), 1.0)
+
+    def begin_frame(self):
+        now = self.clock()
+        if self.last_frame_started is None:
+            self.frame_dt = self.active_interval
+        else:
+            self.frame_dt = now - self.last_frame_started
+            self.avg_interval = self.frame_dt if self.frames <= 1 else self.avg_interval * 0.9 + self.frame_dt * 0.1
+        self.last_frame_started = now
+        self.frame_started = now
+        return self.frame_dt
+
+    def end_frame(self, active):
+        now = self.clock()
+        frame_time = now - self.frame_started
+        self.frames += 1
+        self.avg_frame_time = frame_time if self.frames == 1 else self.avg_frame_time * 0.9 + frame_time * 0.1
+        self.max_frame_time = max(self.max_frame_time, frame_time)
+
+        if active:
+            self.last_active = now
+        self.is_idle = self.last_active is None or (now - self.last_active) >= self.idle_after
+        interval = self.idle_interval if self.is_idle else self.active_interval
+
+        if self.next_deadline is None or self.is_idle:
+            self.next_deadline = self.frame_started + interval
+        else:
+            self.next_deadline += interval
+        if self.next_deadline + interval <= now:
+            # Отстали больше чем на кадр: не догоняем пачкой кадров, а начинаем отсчет заново.
+            self.next_deadline = now + interval
+        return self.delay_ms(now)
+
+    def wait(self, wake):
+        # Проверка между кадрами: 0 - рисовать сейчас, иначе через сколько мс спросить снова.
+        now = self.clock()
+        if wake and self.is_idle:
+            self.next_deadline = now
+            self.wakeups += 1
+        if self.next_deadline - now < 0.0005:
+            # after() считает в миллисекундах: меньше половины уже пора.
+            return 0
+        return self.delay_ms(now)
+
+    def delay_ms(self, now):
+        delay = self.next_deadline - now
+        if self.is_idle:
+            delay = min(delay, self.active_interval)
+        return max(1, int(round(delay * 1000)))
+
+    def stats(self):
+        return {
+            "fps": round(1.0 / self.avg_interval, 1) if self.avg_interval > 0 else 0.0,
+            "frame_time_ms": round(self.avg_frame_time * 1000, 2),
+            "max_frame_time_ms": round(self.max_frame_time * 1000, 2),
+            "idle": self.is_idle,
+            "frames": self.frames,
+            "wakeups": self.wakeups,
+        }
@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+
+# Опрос клавиш в своем потоке: 100 раз в секунду хватает, чтобы не пропустить начало движения.
+POLL_INTERVAL = 0.01
+# Нажатие короче PRESS_DEBOUNCE не считается движением; после отпускания движение держится
+# еще RELEASE_DEBOUNCE секунд, пока затихают собственные шаги.
+PRESS_DEBOUNCE = 0.02
+RELEASE_DEBOUNCE = 0.25
+
+VK_CODES = {
+    "space": 0x20,
+    "shift": 0x10,
+    "ctrl": 0x11,
+    "alt": 0x12,
+    "tab": 0x09,
+    "left": 0x25,
+    "up": 0x26,
+    "right": 0x27,
+    "down": 0x28,
+}
+
+
+def virtual_key(name):
+    name = name.lower()
+    if len(name) == 1 and name.isascii() and name.isalnum():
+        return ord(name.upper())
+    return VK_CODES.get(name)
+
+
+class Win32KeyBackend:
+    def __init__(self, keys):
+        import ctypes
+
+        self.get_key_state = ctypes.windll.user32.GetAsyncKeyState
+        self.codes = tuple(code for code in map(virtual_key, keys) if code is not None)
+
+    def pressed(self):
+        return any(self.get_key_state(code) & 0x8000 for code in self.codes)
+
+
+class KeyboardModuleBackend:
+    # Библиотека keyboard (веб-сервер): те же имена клавиш, что в настройке move_keys.
+    def __init__(self, keys, keyboard_module=None):
+        if keyboard_module is None:
+            import keyboard as keyboard_module
+        self.keyboard = keyboard_module
+        self.keys = tuple(keys)
+
+    def pressed(self):
+        return any(self.keyboard.is_pressed(key) for key in self.keys)
+
+
+class StubInputBackend:
+    # Без клавиатуры (тесты, Linux без прав на ввод): состояние задается полем held.
+    def __init__(self, held=False):
+        self.held = held
+
+    def pressed(self):
+        return self.held
+
+
+def default_input_backend(keys):
+    try:
+        if sys.platform == "win32":
+            return Win32KeyBackend(keys)
+        return KeyboardModuleBackend(keys)
+    except Exception:
+        return StubInputBackend()
+
+
+class MovementState:
+    # Состояние «двигаюсь с момента t» для аудиопотока. Клавиши опрашивает отдельный поток,
+    # а результат публикуется одним присваиванием кортежа (moving, since), поэтому
+    # чтение из audio_loop атомарно и обходится без системных вызовов.
+    def __init__(self, backend, interval=POLL_INTERVAL, press_debounce=PRESS_DEBOUNCE,
+                 release_debounce=RELEASE_DEBOUNCE, clock=time.monotonic):
+        self.backend = backend
+        self.interval = interval
+        self.press_debounce = press_debounce
+        self.release_debounce = release_debounce
+        self.clock = clock
+        self.state = (False, clock())
+        self.press_started = None
+        self.release_started = None
+        self.polls = 0
+        self.errors = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def moving(self):
+        return self.state[0]
+
+    def snapshot(self):
+        return self.state
+
+    def poll(self):
+        now = self.clock()
+        self.polls += 1
+        try:
+            pressed = bool(self.backend.pressed())
+        except Exception:
+            self.errors += 1
+            pressed = False
+
+        moving = self.state[0]
+        if pressed:
+            self.release_started = None
+            if not moving:
+                if self.press_started is None:
+                    self.press_started = now
+                if now - self.press_started >= self.press_debounce:
+                    self.state = (True, self.press_started)
+        else:
+            self.press_started = None
+            if moving:
+                if self.release_started is None:
+                    self.release_started = now
+                if now - self.release_started >= self.release_debounce:
+                    self.state = (False, self.release_started)
+        return self.state
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name="movement-state", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def stats(self):
+        moving, since = self.state
+        return {"moving": moving, "since": since, "polls": self.polls, "errors": self.errors}
@@ -6,35 +6,41 @@ import ctypes
 from ctypes import wintypes
 
 from app_config import (
-    BLOCK_SIZE,
-    COMPRESSION,
+    CHANNEL_LAYOUTS,
     COLOR_PROFILES,
     DEFAULT_SETTINGS,
-    FREQ_HIGH,
-    FREQ_LOW,
-    NOISE_FLOOR,
+    DIRECTION_METHODS,
     PROFILE_PRESETS,
-    REAR_THRESHOLD,
-    SAMPLE_RATE,
-    SENSITIVITY,
+    SESSION_LOG_FORMATS,
     TRANS_COLOR,
     apply_saved_settings,
     build_saved_config,
     clamp,
     load_config,
     log_message,
+    parse_move_keys,
     save_config,
 )
-from audio_direction import build_sector_levels, direction_angle_from_balance, smooth_angle
-from audio_events import classify_audio_event
+from audio_direction import build_sector_levels
 from audio_io import (
     diagnose_audio_source,
     get_audio_sources,
     measure_noise_floor,
     open_audio_recorder_source,
+    open_capture_stream,
     preflight_audio_source,
+    resolve_audio_source,
     write_diagnostic_report,
 )
+from audio_surround import capture_channels, layout_channels
+from capture_supervisor import CaptureSupervisor
+from focus_tracker import FocusTracker
+from input_state import MovementState, StubInputBackend, Win32KeyBackend
+from frame_ring import FrameRing
+from frame_scheduler import FrameScheduler
+from radar_engine import RadarEngine, empty_frame
+from render_cache import CanvasStateCache
+from session_log import SessionRecorder, session_log_path
 
 def handle_exception(exc_type, exc_value, exc_traceback):
     sys.exit(1)
@@ -46,7 +52,6 @@ try:
     from tkinter import ttk
     import numpy as np
     import soundcard as sc
-    from scipy import signal
 except Exception as e:
     log_message(f"Import Error: {e}")
     sys.exit(1)
@@ -54,29 +59,35 @@ except Exception as e:
 settings = DEFAULT_SETTINGS.copy()
 
 # Глобальные переменные
-sector_data = [0.0] * 16
-is_moving = False
-is_human = False
 running = True
 target_window_title = ""
 selected_speaker_id = None 
 selected_audio_source = None
-current_peak = 0.0
-current_confidence = 0.0
-current_event = "IDLE"
-previous_level = 0.0
 audio_status = "IDLE"
 audio_error_message = ""
-smoothed_direction_angle = None
+# Кадры анализа идут из аудиопотока в GUI только через это кольцо.
+frame_ring = FrameRing()
+# Движок, фокус и состояние движения аудиопотока; GUI читает из них только статистику для отчета.
+radar_engine = None
+focus_tracker = None
+movement_state = None
+capture_stream = None
+capture_supervisor = None
+session_recorder = None
 
 # --- CTYPES ---
 user32 = ctypes.windll.user32
+gdi32 = ctypes.windll.gdi32
 WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
-MOVE_KEYS = (0x57, 0x41, 0x53, 0x44)
 
-
-def is_key_down(vk_code):
-    return bool(user32.GetAsyncKeyState(vk_code) & 0x8000)
+def get_monitor_refresh_rate(default=60):
+    try:
+        hdc = user32.GetDC(0)
+        refresh = gdi32.GetDeviceCaps(hdc, 116)  # VREFRESH
+        user32.ReleaseDC(0, hdc)
+        return refresh if refresh > 1 else default
+    except:
+        return default
 
 def get_open_windows():
     titles = []
@@ -159,11 +170,19 @@ def show_launcher():
     swap_channels_var = tk.BooleanVar(value=settings["swap_channels"])
     sector_spread_var = tk.IntVar(value=settings["sector_spread"])
     noise_floor_var = tk.DoubleVar(value=settings["noise_floor"])
+    adaptive_noise_var = tk.BooleanVar(value=settings["adaptive_noise_floor"])
+    denoise_var = tk.BooleanVar(value=settings["denoise"])
+    move_keys_var = tk.StringVar(value=" ".join(settings["move_keys"]))
     visual_mode_var = tk.StringVar(value=settings["visual_mode"])
     color_profile_var = tk.StringVar(value=settings["color_profile"])
     preset_var = tk.StringVar(value=settings["profile_name"])
     edge_indicators_var = tk.BooleanVar(value=settings["edge_indicators"])
     direction_smoothing_var = tk.DoubleVar(value=settings["direction_smoothing"])
+    max_fps_var = tk.IntVar(value=settings["max_fps"])
+    direction_method_var = tk.StringVar(value=settings["direction_method"])
+    track_sources_var = tk.IntVar(value=settings["track_sources"])
+    channel_layout_var = tk.StringVar(value=settings["channel_layout"])
+    session_log_var = tk.StringVar(value=settings["session_log"])
 
     preset_row = tk.Frame(settings_frame, bg="#111")
     preset_row.pack(fill="x", pady=(0, 6))
@@ -182,6 +201,11 @@ def show_launcher():
         visual_mode_var.set(preset.get("visual_mode", visual_mode_var.get()))
         color_profile_var.set(preset.get("color_profile", color_profile_var.get()))
         opacity_var.set(preset.get("opacity", opacity_var.get()))
+        direction_method_var.set(preset.get("direction_method", direction_method_var.get()))
+        track_sources_var.set(preset.get("track_sources", track_sources_var.get()))
+        denoise_var.set(preset.get("denoise", denoise_var.get()))
+        if "move_keys" in preset:
+            move_keys_var.set(" ".join(preset["move_keys"]))
         update_profile_hint()
 
     preset_combo.bind("<<ComboboxSelected>>", apply_preset)
@@ -203,6 +227,8 @@ def show_launcher():
     add_scale("Ширина сектора", sector_spread_var, 1, 3, 1)
     add_scale("Порог шума", noise_floor_var, 0.002, 0.25, 0.002)
     add_scale("Сглаживание", direction_smoothing_var, 0.05, 1.0, 0.05)
+    add_scale("Макс. FPS", max_fps_var, 20, 240, 10)
+    add_scale("Источников", track_sources_var, 1, 4, 1)
 
     profile_row = tk.Frame(settings_frame, bg="#111")
     profile_row.pack(fill="x", pady=6)
@@ -225,6 +251,34 @@ def show_launcher():
     mode_combo["values"] = ("radar", "minimal")
     mode_combo.pack(side="left")
 
+    direction_row = tk.Frame(settings_frame, bg="#111")
+    direction_row.pack(fill="x", pady=6)
+    tk.Label(direction_row, text="Направление", bg="#111", fg="#ddd", width=15, anchor="w").pack(side="left")
+    direction_combo = ttk.Combobox(direction_row, textvariable=direction_method_var, state="readonly", width=22)
+    direction_combo["values"] = DIRECTION_METHODS
+    direction_combo.pack(side="left")
+
+    layout_row = tk.Frame(settings_frame, bg="#111")
+    layout_row.pack(fill="x", pady=6)
+    tk.Label(layout_row, text="Каналы", bg="#111", fg="#ddd", width=15, anchor="w").pack(side="left")
+    layout_combo = ttk.Combobox(layout_row, textvariable=channel_layout_var, state="readonly", width=22)
+    layout_combo["values"] = CHANNEL_LAYOUTS
+    layout_combo.pack(side="left")
+
+    session_log_row = tk.Frame(settings_frame, bg="#111")
+    session_log_row.pack(fill="x", pady=6)
+    tk.Label(session_log_row, text="Запись сессии", bg="#111", fg="#ddd", width=15, anchor="w").pack(side="left")
+    session_log_combo = ttk.Combobox(session_log_row, textvariable=session_log_var, state="readonly", width=22)
+    session_log_combo["values"] = SESSION_LOG_FORMATS
+    session_log_combo.pack(side="left")
+
+    move_keys_row = tk.Frame(settings_frame, bg="#111")
+    move_keys_row.pack(fill="x", pady=6)
+    tk.Label(move_keys_row, text="Клавиши хода", bg="#111", fg="#ddd", width=15, anchor="w").pack(side="left")
+    tk.Entry(
+        move_keys_row, textvariable=move_keys_var, width=25, bg="#222", fg="#ddd", insertbackground="#ddd"
+    ).pack(side="left")
+
     calibration_row = tk.Frame(settings_frame, bg="#111")
     calibration_row.pack(fill="x", pady=(6, 2))
     calibration_status = tk.Label(calibration_row, text="Калибровка тишины: готово", bg="#111", fg="#aaa", anchor="w")
@@ -369,6 +423,16 @@ def show_launcher():
         bg="#111", fg="#ddd", activebackground="#111", activeforeground="#fff",
         selectcolor="#222"
     ).pack(anchor="w", pady=4)
+    tk.Checkbutton(
+        settings_frame, text="Подстраивать порог шума под фон", variable=adaptive_noise_var,
+        bg="#111", fg="#ddd", activebackground="#111", activeforeground="#fff",
+        selectcolor="#222"
+    ).pack(anchor="w", pady=4)
+    tk.Checkbutton(
+        settings_frame, text="Шумодав: вычитать постоянный фон (ветер, дождь)", variable=denoise_var,
+        bg="#111", fg="#ddd", activebackground="#111", activeforeground="#fff",
+        selectcolor="#222"
+    ).pack(anchor="w", pady=4)
 
     def on_start():
         global target_window_title, selected_speaker_id, selected_audio_source
@@ -393,9 +457,17 @@ def show_launcher():
         settings["swap_channels"] = bool(swap_channels_var.get())
         settings["sector_spread"] = int(sector_spread_var.get())
         settings["noise_floor"] = float(noise_floor_var.get())
+        settings["adaptive_noise_floor"] = bool(adaptive_noise_var.get())
+        settings["denoise"] = bool(denoise_var.get())
+        settings["move_keys"] = parse_move_keys(move_keys_var.get())
         settings["visual_mode"] = visual_mode_var.get()
         settings["edge_indicators"] = bool(edge_indicators_var.get())
         settings["direction_smoothing"] = float(direction_smoothing_var.get())
+        settings["max_fps"] = int(max_fps_var.get())
+        settings["direction_method"] = direction_method_var.get()
+        settings["track_sources"] = int(track_sources_var.get())
+        settings["channel_layout"] = channel_layout_var.get()
+        settings["session_log"] = session_log_var.get()
 
         if not run_preflight_check(selected_audio_source):
             return
@@ -427,7 +499,7 @@ def show_launcher():
 
 # --- АУДИО ДВИЖОК ---
 def audio_loop():
-    global sector_data, is_moving, is_human, running, current_peak, current_confidence, current_event, previous_level, audio_status, audio_error_message, smoothed_direction_angle
+    global running, audio_status, audio_error_message, radar_engine, focus_tracker, movement_state, capture_supervisor, session_recorder
     
     try: np.fromstring(b'\x00'*4, dtype=np.float32)
     except:
@@ -436,98 +508,81 @@ def audio_loop():
             return np.fromiter(string.split(sep), dtype=dtype)
         np.fromstring = fromstring_patch
 
-    try: b, a = signal.butter(4, [FREQ_LOW, FREQ_HIGH], btype='band', fs=SAMPLE_RATE)
+    try: engine = RadarEngine(settings)
     except: return
+    radar_engine = engine
+    focus = FocusTracker(target_window_title)
+    focus_tracker = focus
+    try: backend = Win32KeyBackend(settings["move_keys"])
+    except: backend = StubInputBackend()
+    movement = MovementState(backend).start()
+    movement_state = movement
+
+    def open_stream(source):
+        global capture_stream, session_recorder
+        mic = open_audio_recorder_source(source)
+        channels = capture_channels(mic, settings["channel_layout"])
+        if channels != layout_channels(settings["channel_layout"]):
+            log_message(f"{settings['channel_layout']} unavailable on {getattr(mic, 'name', mic)}, using stereo")
+        if session_recorder is not None and session_recorder.channels != channels:
+            # Устройство после переподключения отдает другое число каналов (5.1 -> стерео): новый сегмент записи.
+            log_message(f"Session log: {session_recorder.channels} -> {channels} channels, starting a new segment")
+            session_recorder.close()
+            session_recorder = None
+        if settings["session_log"] != "off" and session_recorder is None:
+            # Один файл на запуск, пока не сменится число каналов: переподключения пишутся в ту же запись.
+            try:
+                session_recorder = SessionRecorder(session_log_path(), channels, settings["session_log"]).start()
+                log_message(f"Session log: {session_recorder.path}")
+            except Exception as e:
+                log_message(f"Session log error: {e}")
+        capture_stream = open_capture_stream(mic, channels)
+        return capture_stream
+
+    def on_status(status, message):
+        global audio_status, audio_error_message
+        audio_status = status
+        audio_error_message = message
+        if status == "RECONNECTING":
+            frame_ring.publish(empty_frame("RECONNECTING"))
+            log_message(f"Audio device lost, retrying in {supervisor.delay:.2f} s: {message}")
+        elif status == "ERROR":
+            frame_ring.publish(empty_frame("AUDIO ERROR"))
+            log_message(f"Audio loop error, restarting capture in {supervisor.delay:.2f} s: {message}")
+        else:
+            # Движок не пересоздается: пол шума, профиль шумодава и калибровка переживают переподключение.
+            engine.resume()
 
-    while running:
-        try:
-            mic = open_audio_recorder_source(selected_audio_source)
-            audio_status = "RUNNING"
-            audio_error_message = ""
+    supervisor = CaptureSupervisor(open_stream, lambda: resolve_audio_source(selected_audio_source), on_status=on_status)
+    capture_supervisor = supervisor
 
-            with mic.recorder(samplerate=SAMPLE_RATE, channels=2, blocksize=BLOCK_SIZE) as recorder:
-                while running:
-                    data = recorder.record(numframes=BLOCK_SIZE)
-            
-                    if target_window_title:
-                        try:
-                            hwnd = user32.GetForegroundWindow()
-                            buff = ctypes.create_unicode_buffer(255)
-                            user32.GetWindowTextW(hwnd, buff, 255)
-                            if target_window_title not in buff.value and "Razgrom" not in buff.value and buff.value != "":
-                                sector_data = [0.0] * 16
-                                current_peak = 0.0
-                                current_confidence = 0.0
-                                current_event = "IDLE"
-                                previous_level = 0.0
-                                smoothed_direction_angle = None
-                                time.sleep(0.2)
-                                continue
-                        except: pass
-
-                    is_moving = False
-                    try:
-                        is_moving = any(is_key_down(key) for key in MOVE_KEYS)
-                    except: pass
-
-                    filtered = signal.lfilter(b, a, data, axis=0)
-                    raw_l = filtered[:, 0]
-                    raw_r = filtered[:, 1]
-                    
-                    rms_l = math.sqrt(float(np.mean(raw_l ** 2)))
-                    rms_r = math.sqrt(float(np.mean(raw_r ** 2)))
-                    channel_sum = rms_l + rms_r
-                    balance = (rms_r - rms_l) / (channel_sum + 0.000001)
-
-                    sensitivity = settings.get("sensitivity", SENSITIVITY)
-                    total = np.power(channel_sum * sensitivity, COMPRESSION)
-                    
-                    if is_moving:
-                        total *= 0.45
-
-                    current_peak = min(total, 1.0)
-                    current_confidence = clamp((abs(balance) * 0.45) + (current_peak * 0.55), 0.0, 1.0)
-                    
-                    is_back = False
-                    centroid = 0.0
-                    if total > 0.05:
-                        freqs = np.fft.rfft(data[:, 0] + data[:, 1])
-                        mags = np.abs(freqs)
-                        if np.sum(mags) > 0:
-                            centroid = (np.sum(np.arange(len(mags)) * mags) / np.sum(mags)) * (SAMPLE_RATE / BLOCK_SIZE)
-                            if centroid < REAR_THRESHOLD: is_back = True
-
-                    noise_floor = settings.get("noise_floor", NOISE_FLOOR)
-                    current_event = classify_audio_event(total, previous_level, centroid, noise_floor, is_moving=is_moving)
-                    previous_level = (previous_level * 0.72) + (total * 0.28)
-
-                    if total > noise_floor:
-                        angle = direction_angle_from_balance(
-                            balance,
-                            is_back=is_back,
-                            swap_channels=settings.get("swap_channels", False)
-                        )
-                        smoothing = settings.get("direction_smoothing", 0.35)
-                        if current_event in ("IMPACT", "SHARP"):
-                            smoothing = max(smoothing, 0.75)
-                        smoothed_direction_angle = smooth_angle(smoothed_direction_angle, angle, smoothing)
-                        val = min(total, 1.0)
-                        target = build_sector_levels(smoothed_direction_angle, val, spread=settings.get("sector_spread", 2))
-
-                        for i in range(16):
-                            if target[i] > sector_data[i]: sector_data[i] = target[i]
-                    
-                    is_human = total > 0.6
+    # View на слот кольца захвата: валиден до следующего блока, копии не нужны.
+    for data in supervisor.blocks():
+        if not running:
+            break
+
+        try:
+            # Без фокуса блоки продолжают читаться и выбрасываться, чтобы буфер устройства не переполнялся.
+            if not focus.check():
+                if focus.changed:
+                    frame_ring.publish(empty_frame())
+                continue
+            if focus.changed:
+                # Как после переподключения: пол шума и профиль шумодава не выбрасываются при alt-tab.
+                engine.resume()
+
+            # Клавиши опрашивает поток MovementState, здесь только чтение готового состояния.
+            frame = engine.process(data, is_moving=movement.moving)
+            frame_ring.publish(frame)
+            if session_recorder is not None:
+                session_recorder.write(data, frame)
         except Exception as e:
-            audio_status = "ERROR"
-            audio_error_message = str(e)
-            current_event = "AUDIO ERROR"
-            current_peak = 0.0
-            current_confidence = 0.0
-            smoothed_direction_angle = None
-            sector_data = [0.0] * 16
-            log_message(f"Audio loop error: {e}")
-            time.sleep(2)
+            # Сломанный блок не останавливает поток: HUD показывает AUDIO ERROR, супервизор перезапускает захват.
+            engine.reset()
+            supervisor.fail(e)
+    supervisor.stop()
+    if session_recorder is not None:
+        session_recorder.close()
 
 # --- GUI ---
 class RadarOverlay:
@@ -547,6 +602,8 @@ class RadarOverlay:
         
         self.canvas = tk.Canvas(root, width=self.width, height=self.height, bg=TRANS_COLOR, highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
+        self.render = CanvasStateCache(self.canvas)
+        self.sector_render_state = [None] * 16
         
         self.canvas.bind('<Button-1>', self.start_move)
         self.canvas.bind('<B1-Motion>', self.do_move)
@@ -562,6 +619,17 @@ class RadarOverlay:
         self.confidence_text = None
         self.edge_gfx = {}
         self.last_config_save = 0
+        self.sector_levels = np.zeros(16)
+        self.peak = 0.0
+        self.confidence = 0.0
+        self.noise_floor = 0.0
+        self.event = "IDLE"
+        self.is_moving = False
+        self.is_loud = False
+        self.scheduler = FrameScheduler(
+            active_fps=min(settings["max_fps"], get_monitor_refresh_rate()),
+            idle_fps=settings["idle_fps"],
+        )
         self.menu = tk.Menu(root, tearoff=0, bg="#151515", fg="#eeeeee", activebackground="#333333")
         self.menu.add_command(label="Скрыть / показать подписи", command=self.toggle_labels)
         self.menu.add_command(label="Переключить HUD", command=self.toggle_visual_mode)
@@ -572,6 +640,11 @@ class RadarOverlay:
         test_menu.add_command(label="Назад", command=lambda: self.test_direction(180))
         test_menu.add_command(label="Влево", command=lambda: self.test_direction(270))
         self.menu.add_cascade(label="Тест направлений", menu=test_menu)
+        self.menu.add_command(label="Сохранить диагностический отчет", command=self.export_diagnostic_report)
+        self.menu.add_separator()
+        self.menu.add_command(label="FPS --", state="disabled")
+        self.stats_menu_index = self.menu.index("end")
+        self.menu.add_separator()
         self.menu.add_command(label="Закрыть радар", command=self.close)
         self.init_graphics()
         self.update_gui()
@@ -607,7 +680,39 @@ class RadarOverlay:
         self.start_y = event.y
         self.save_layout_throttled(force=True)
 
+    def runtime_stats(self):
+        return {
+            "render": self.scheduler.stats(),
+            "canvas": self.render.stats(),
+            "frame_ring": frame_ring.stats(),
+            "focus": focus_tracker.stats() if focus_tracker is not None else None,
+            "movement": movement_state.stats() if movement_state is not None else None,
+            "capture": capture_stream.stats() if capture_stream is not None else None,
+            "device_recovery": capture_supervisor.stats() if capture_supervisor is not None else None,
+            "session_log": session_recorder.stats() if session_recorder is not None else None,
+            "noise_floor": {
+                "gate": round(self.noise_floor, 5),
+                "adaptive": settings["adaptive_noise_floor"],
+                **(radar_engine.noise.stats() if radar_engine is not None else {}),
+            },
+        }
+
+    def export_diagnostic_report(self):
+        try:
+            path = write_diagnostic_report(
+                target_window_title, selected_audio_source, settings, audio_status, audio_error_message,
+                runtime_stats=self.runtime_stats(),
+            )
+            log_message(f"Diagnostic report saved: {path}")
+        except Exception as e:
+            log_message(f"Diagnostic report error: {e}")
+
     def show_context_menu(self, event):
+        stats = self.scheduler.stats()
+        self.menu.entryconfigure(
+            self.stats_menu_index,
+            label=f"FPS {stats['fps']:.0f} | кадр {stats['frame_time_ms']:.1f} мс | Tk {self.render.calls_last_frame}"
+        )
         try:
             self.menu.tk_popup(event.x_root, event.y_root)
         finally:
@@ -629,13 +734,11 @@ class RadarOverlay:
         self.save_layout_throttled(force=True)
 
     def test_direction(self, angle):
-        global sector_data, current_peak, current_confidence, is_human
         test = build_sector_levels(angle, 1.0, spread=settings.get("sector_spread", 2))
-        for i in range(16):
-            sector_data[i] = max(sector_data[i], test[i])
-        current_peak = 1.0
-        current_confidence = 1.0
-        is_human = True
+        np.maximum(self.sector_levels, test, out=self.sector_levels)
+        self.peak = 1.0
+        self.confidence = 1.0
+        self.is_loud = True
 
     def save_layout_throttled(self, force=False):
         now = time.time()
@@ -656,9 +759,12 @@ class RadarOverlay:
     def close(self):
         global running
         running = False
+        if capture_supervisor is not None:
+            capture_supervisor.stop()
         settings["overlay_x"] = self.root.winfo_x()
         settings["overlay_y"] = self.root.winfo_y()
         self.save_layout_throttled(force=True)
+        log_message(f"Runtime stats: {self.runtime_stats()}")
         self.root.destroy()
 
     def draw_block(self, cx, cy, r_in, r_out, start_deg, end_deg):
@@ -672,10 +778,14 @@ class RadarOverlay:
             ang = math.radians(end_deg - (end_deg - start_deg) * i / steps - 90)
             points.append(cx + r_in * math.cos(ang))
             points.append(cy + r_in * math.sin(ang))
-        return self.canvas.create_polygon(points, outline=self.profile["grid"], width=1, fill=TRANS_COLOR)
+        poly = self.canvas.create_polygon(points, outline=self.profile["grid"], width=1, fill=TRANS_COLOR)
+        self.render.remember(poly, fill=TRANS_COLOR)
+        return poly
 
     def init_graphics(self):
         self.canvas.delete("all")
+        self.render.clear()
+        self.sector_render_state = [None] * 16
         self.blocks_gfx = []
         self.edge_gfx = {}
         self.profile = COLOR_PROFILES.get(settings["color_profile"], COLOR_PROFILES["orange"])
@@ -752,6 +862,8 @@ class RadarOverlay:
                 "back": self.canvas.create_rectangle(pad, self.height - pad - edge_width, self.width - pad, self.height - pad, outline="", fill=TRANS_COLOR),
                 "left": self.canvas.create_rectangle(pad, pad, pad + edge_width, self.height - pad, outline="", fill=TRANS_COLOR),
             }
+            for item in self.edge_gfx.values():
+                self.render.remember(item, fill=TRANS_COLOR)
 
     def cardinal_levels(self):
         groups = {
@@ -760,75 +872,102 @@ class RadarOverlay:
             "back": [7, 8, 9],
             "left": [11, 12, 13],
         }
-        return {name: max(sector_data[index] for index in indexes) for name, indexes in groups.items()}
+        return {name: max(self.sector_levels[index] for index in indexes) for name, indexes in groups.items()}
 
     def update_gui(self):
-        global sector_data, is_moving, is_human, current_peak, current_confidence, current_event, audio_status
-        decay = 0.08
+        # Затухание считается от реального времени кадра, т.к. частота кадров меняется.
+        dt = min(self.scheduler.begin_frame(), 0.25)
+        frame = frame_ring.consume(self.sector_levels)
+        if frame is not None:
+            self.peak = frame["peak"]
+            self.confidence = frame["confidence"]
+            self.noise_floor = frame["noise_floor"]
+            self.event = frame["event"]
+            self.is_moving = frame["is_moving"]
+            self.is_loud = frame["is_loud"]
+        current_event = self.event
+        render = self.render
+        render.begin_frame()
+        decay = 4.0 * dt
         active_color = self.profile["active"]
         danger_color = self.profile["danger"]
         muted_color = self.profile["muted"]
         text_color = self.profile["text"]
         blocks_per_sector = 6 if settings["visual_mode"] == "minimal" else 10
         for s in range(16):
-            level = sector_data[s]
+            level = self.sector_levels[s]
             active = int(math.ceil(level * blocks_per_sector))
+            if current_event in ("IMPACT", "SHARP") and level > 0.65:
+                col = danger_color
+            else:
+                col = active_color
+            # Сектор перерисовывается только если изменилось число горящих блоков или их цвет.
+            state = (active, col)
+            if self.sector_render_state[s] == state:
+                continue
+            self.sector_render_state[s] = state
             for b in range(blocks_per_sector):
-                poly = self.blocks_gfx[s][b]
-                if b < active:
-                    if current_event in ("IMPACT", "SHARP") and level > 0.65:
-                        col = danger_color
-                    else:
-                        col = active_color
-                    self.canvas.itemconfigure(poly, fill=col)
-                else:
-                    self.canvas.itemconfigure(poly, fill=TRANS_COLOR)
-            if sector_data[s] > 0: sector_data[s] -= decay
-            if sector_data[s] < 0: sector_data[s] = 0
+                render.itemconfigure(self.blocks_gfx[s][b], fill=col if b < active else TRANS_COLOR)
+        np.subtract(self.sector_levels, decay, out=self.sector_levels)
+        np.maximum(self.sector_levels, 0.0, out=self.sector_levels)
 
         if audio_status == "ERROR":
             status = "AUDIO ERROR"
             icon_color = danger_color
-        elif is_moving:
+        elif audio_status == "RECONNECTING":
+            status = "RECONNECT"
+            icon_color = danger_color
+        elif self.is_moving:
             status = "MOVE"
             icon_color = muted_color
-        elif is_human:
+        elif self.is_loud:
             status = "LOUD"
             icon_color = danger_color
-        elif current_peak > 0.05:
+        elif self.peak > 0.05:
             status = "SOUND"
             icon_color = active_color
         else:
             status = "IDLE"
             icon_color = active_color
 
-        self.canvas.itemconfigure(self.center_icon, fill=icon_color)
+        render.itemconfigure(self.center_icon, fill=icon_color)
         if self.status_text:
-            self.canvas.itemconfigure(self.status_text, text=status, fill=danger_color if is_human else text_color)
+            render.itemconfigure(self.status_text, text=status, fill=danger_color if self.is_loud else text_color)
         if self.confidence_text:
-            conf = int(clamp(current_confidence, 0.0, 1.0) * 100)
-            self.canvas.itemconfigure(self.confidence_text, text=f"CONF {conf}%", fill=danger_color if conf > 80 else text_color)
+            conf = int(clamp(self.confidence, 0.0, 1.0) * 100)
+            render.itemconfigure(self.confidence_text, text=f"CONF {conf}%  NF {self.noise_floor:.3f}", fill=danger_color if conf > 80 else text_color)
         if self.event_text:
             event_color = danger_color if current_event in ("IMPACT", "SHARP") else text_color
-            self.canvas.itemconfigure(self.event_text, text=f"EVENT {current_event}", fill=event_color)
+            render.itemconfigure(self.event_text, text=f"EVENT {current_event}", fill=event_color)
         if self.edge_gfx:
             for name, level in self.cardinal_levels().items():
                 if level <= 0.03:
-                    self.canvas.itemconfigure(self.edge_gfx[name], fill=TRANS_COLOR)
+                    render.itemconfigure(self.edge_gfx[name], fill=TRANS_COLOR)
                     continue
                 color = danger_color if current_event in ("IMPACT", "SHARP") and level > 0.5 else active_color
-                self.canvas.itemconfigure(self.edge_gfx[name], fill=color)
+                render.itemconfigure(self.edge_gfx[name], fill=color)
         if self.peak_bar:
             cx = self.width / 2
             radius = min(self.width, self.height) / 2 - 10
             bar_w = radius * 0.65
             bar_y = self.height / 2 + radius * 0.48
-            peak = clamp(current_peak, 0.0, 1.0)
-            self.canvas.coords(self.peak_bar, cx - bar_w / 2, bar_y, cx - bar_w / 2 + bar_w * peak, bar_y + 4)
-            self.canvas.itemconfigure(self.peak_bar, fill=danger_color if peak > 0.8 else active_color)
-            current_peak *= 0.92
-            current_confidence *= 0.94
-        self.root.after(20, self.update_gui)
+            peak = clamp(self.peak, 0.0, 1.0)
+            bar_fill = round(bar_w * peak)
+            render.coords(self.peak_bar, cx - bar_w / 2, bar_y, cx - bar_w / 2 + bar_fill, bar_y + 4)
+            render.itemconfigure(self.peak_bar, fill=danger_color if peak > 0.8 else active_color)
+            self.peak *= 0.92 ** (dt / 0.02)
+            self.confidence *= 0.94 ** (dt / 0.02)
+        render.end_frame()
+        active = bool(self.sector_levels.any()) or self.peak > 0.05 or current_event not in ("IDLE", "AUDIO ERROR", "RECONNECTING")
+        self.root.after(self.scheduler.end_frame(active), self.tick)
+
+    def tick(self):
+        # Между кадрами: кадр по дедлайну или сразу, если аудиопоток прислал звук в редком режиме.
+        delay = self.scheduler.wait(frame_ring.wake_pending())
+        if delay == 0:
+            self.update_gui()
+        else:
+            self.root.after(delay, self.tick)
 
 if __name__ == "__main__":
     show_launcher()
@@ -842,4 +981,7 @@ if __name__ == "__main__":
             root.mainloop()
         except Exception as e:
             log_message(f"GUI Error: {e}")
+        running = False
+        # Аудиопоток закрывает запись сессии: ждем, пока он допишет последний чанк.
+        t.join(timeout=2.0)
     running = False
@@ -0,0 +1,99 @@
+import numpy as np
+
+from app_config import BLOCK_SIZE, SAMPLE_RATE
+
+# Минимум сглаженного уровня занижен относительно среднего шума; поправка и запас над полом для порога.
+# Уровень сжат (COMPRESSION 0.4), поэтому запас 1.25 - это примерно +5 дБ по амплитуде над фоном.
+MINIMUM_BIAS = 1.1
+GATE_MARGIN = 1.25
+# Адаптивный порог не поднимается до громких звуков (is_loud), даже если они длятся дольше окна.
+GATE_MAX = 0.6
+
+
+class MinimumStatistics:
+    # Скользящий минимум по окну из subwindows подокон: внутри текущего подокна держится бегущий
+    # минимум, а по окну - минимум из subwindows готовых значений. Работа на блок O(subwindows),
+    # без списков и сортировки; values может быть вектором (уровень или несколько полос сразу).
+    def __init__(self, size=1, window_blocks=188, subwindows=8, smoothing=0.7):
+        self.subwindows = subwindows
+        self.subwindow_blocks = max(1, window_blocks // subwindows)
+        self.smoothing = smoothing
+        self.minima = np.full((subwindows, size), np.inf)
+        self.current = np.full(size, np.inf)
+        self.smoothed = np.zeros(size)
+        self.scratch = np.zeros(size)
+        self.floor = np.zeros(size)
+        self.reset()
+
+    def reset(self):
+        self.minima.fill(np.inf)
+        self.current.fill(np.inf)
+        self.floor.fill(0.0)
+        self.slot = 0
+        self.count = 0
+        self.blocks = 0
+
+    @property
+    def ready(self):
+        # Пока окно не заполнено хотя бы раз, минимум говорит только о начале записи.
+        return self.blocks >= self.subwindows * self.subwindow_blocks
+
+    def update(self, values):
+        if self.blocks == 0:
+            self.smoothed[:] = values
+        else:
+            np.multiply(values, 1.0 - self.smoothing, out=self.scratch)
+            self.smoothed *= self.smoothing
+            self.smoothed += self.scratch
+        self.blocks += 1
+
+        np.minimum(self.current, self.smoothed, out=self.current)
+        self.count += 1
+        if self.count == self.subwindow_blocks:
+            self.minima[self.slot] = self.current
+            self.slot = (self.slot + 1) % self.subwindows
+            self.current.fill(np.inf)
+            self.count = 0
+
+        np.copyto(self.floor, self.current)
+        for row in self.minima:
+            np.minimum(self.floor, row, out=self.floor)
+        self.floor *= MINIMUM_BIAS
+        return self.floor
+
+
+class NoiseFloorTracker:
+    # Пол шума внутри цикла анализа: общий уровень обновляется каждый блок,
+    # энергии полос - только когда для блока посчитан спектр.
+    def __init__(self, band_names, window_seconds=2.0, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE):
+        window_blocks = max(8, int(window_seconds * sample_rate / block_size))
+        self.band_names = tuple(band_names)
+        self.level = MinimumStatistics(1, window_blocks)
+        self.bands = MinimumStatistics(len(self.band_names), window_blocks)
+        self.band_floor = np.zeros(len(self.band_names))
+
+    def reset(self):
+        self.level.reset()
+        self.bands.reset()
+        self.band_floor.fill(0.0)
+
+    def update_level(self, level):
+        return float(self.level.update(level)[0])
+
+    def gate(self, minimum):
+        if not self.level.ready:
+            return minimum
+        return min(max(minimum, float(self.level.floor[0]) * GATE_MARGIN), max(minimum, GATE_MAX))
+
+    def update_bands(self, energies):
+        self.bands.update(energies)
+        if self.bands.ready:
+            np.copyto(self.band_floor, self.bands.floor)
+        return self.band_floor
+
+    def stats(self):
+        return {
+            "ready": self.level.ready,
+            "level": round(float(self.level.floor[0]), 5),
+            "bands": {name: float(value) for name, value in zip(self.band_names, self.band_floor)},
+        }
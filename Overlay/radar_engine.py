@@ -0,0 +1,240 @@
+import math
+
+import numpy as np
+
+from app_config import (
+    BLOCK_SIZE,
+    COMPRESSION,
+    DEFAULT_SETTINGS,
+    FEATURE_BANDS,
+    NOISE_FLOOR,
+    REAR_THRESHOLD,
+    SAMPLE_RATE,
+    SENSITIVITY,
+    clamp,
+)
+from audio_denoise import SpectralDenoiser
+from audio_direction import NUM_SECTORS, build_sector_levels, direction_angle_from_balance, smooth_angle
+from audio_events import classify_audio_event_bands
+from audio_features import SpectrumAnalyzer
+from audio_filters import StreamingBandpass
+from audio_panning import SpectralPanner
+from audio_surround import SurroundDirection, layout_for_channels
+from audio_tdoa import TdoaEstimator, combine_direction, rear_with_hysteresis
+from audio_tracker import SourceTracker, tracks_to_sectors
+from noise_floor import NoiseFloorTracker
+
+
+def empty_frame(event="IDLE"):
+    return {
+        "sectors": [0.0] * NUM_SECTORS,
+        "peak": 0.0,
+        "confidence": 0.0,
+        "event": event,
+        "angle": None,
+        "level": 0.0,
+        "balance": 0.0,
+        "centroid": 0.0,
+        "bands": None,
+        "delay": None,
+        "tracks": [],
+        "noise_floor": 0.0,
+        "is_moving": False,
+        "is_loud": False,
+    }
+
+
+class RadarEngine:
+    # Весь анализ одного стерео-блока без устройств, окон и глобальных переменных.
+    def __init__(self, settings=None, sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE):
+        self.settings = settings if settings is not None else DEFAULT_SETTINGS.copy()
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.bandpass = StreamingBandpass(sample_rate=sample_rate)
+        self.spectrum = SpectrumAnalyzer(block_size, sample_rate)
+        self.tdoa = TdoaEstimator(block_size, sample_rate)
+        self.tracker = SourceTracker(self.spectrum)
+        self.panner = SpectralPanner(self.spectrum)
+        self.surround = None
+        self.denoiser = None
+        self.band_names = tuple(FEATURE_BANDS.keys())
+        self.band_ranges = tuple(FEATURE_BANDS.values())
+        self.band_energies = np.zeros(len(self.band_ranges))
+        self.band_signal = np.zeros(len(self.band_ranges))
+        self.noise = NoiseFloorTracker(self.band_names, block_size=block_size, sample_rate=sample_rate)
+        self.previous_level = 0.0
+        self.smoothed_angle = None
+        self.was_back = False
+
+    def reset(self):
+        self.bandpass.reset()
+        self.previous_level = 0.0
+        self.smoothed_angle = None
+        self.was_back = False
+        self.tracker.reset()
+        self.panner.release()
+        self.noise.reset()
+        if self.denoiser is not None:
+            self.denoiser.reset()
+
+    def resume(self):
+        # После переподключения устройства: сбрасывается только то, что зависит от непрерывности
+        # сигнала (фильтр, атака, угол, треки). Пол шума и профиль шумодава остаются прогретыми.
+        self.bandpass.reset()
+        self.previous_level = 0.0
+        self.smoothed_angle = None
+        self.was_back = False
+        self.tracker.reset()
+        self.panner.release()
+        if self.denoiser is not None:
+            self.denoiser.flush()
+
+    def process(self, data, is_moving=False):
+        settings = self.settings
+        surround = None
+        if data.shape[1] > 2:
+            # 5.1/7.1: направление по колонкам, а признаки и события - по стерео-даунмиксу, как обычно.
+            layout = layout_for_channels(data.shape[1])
+            if layout is not None:
+                if self.surround is None or self.surround.layout != layout or self.surround.block_size != len(data):
+                    self.surround = SurroundDirection(layout, len(data), self.sample_rate)
+                surround = self.surround.analyze(data)
+                data = self.surround.downmix(data)
+            else:
+                data = data[:, :2]
+        if settings.get("denoise", False):
+            # Шумодав стоит до фильтра: баланс, центр и полосы считаются уже без постоянного фона.
+            if self.denoiser is None or self.denoiser.block_size != len(data):
+                self.denoiser = SpectralDenoiser(len(data), self.sample_rate)
+            data = self.denoiser.process(data)
+        filtered = self.bandpass.process(data)
+        raw_l = filtered[:, 0]
+        raw_r = filtered[:, 1]
+
+        rms_l = math.sqrt(float(np.dot(raw_l, raw_l)) / len(raw_l))
+        rms_r = math.sqrt(float(np.dot(raw_r, raw_r)) / len(raw_r))
+        channel_sum = rms_l + rms_r
+        balance = (rms_r - rms_l) / (channel_sum + 0.000001)
+
+        sensitivity = settings.get("sensitivity", SENSITIVITY)
+        total = float(np.power(channel_sum * sensitivity, COMPRESSION))
+
+        # Пол шума считается по уровню до поправки на движение, чтобы ходьба не роняла оценку фона.
+        noise_floor = settings.get("noise_floor", NOISE_FLOOR)
+        adaptive_noise = settings.get("adaptive_noise_floor", True)
+        if adaptive_noise:
+            self.noise.update_level(total)
+            noise_floor = self.noise.gate(noise_floor)
+
+        if is_moving:
+            total *= 0.45
+
+        peak = min(total, 1.0)
+        confidence = clamp((abs(balance) * 0.45) + (peak * 0.55), 0.0, 1.0)
+        if surround is not None:
+            confidence = clamp((surround["focus"] * 0.45) + (peak * 0.55), 0.0, 1.0)
+
+        is_back = False
+        centroid = 0.0
+        bands = None
+        delay = None
+        direction_balance = balance
+        direction_method = settings.get("direction_method", "balance")
+        use_tdoa = direction_method == "gcc_phat"
+        use_panning = direction_method == "spectral_pan" and surround is None
+        panning = None
+        max_sources = settings.get("track_sources", 1)
+        spectrum_ready = False
+        if total > 0.05:
+            if use_tdoa or use_panning or max_sources > 1:
+                self.spectrum.analyze_stereo(data)
+            else:
+                self.spectrum.analyze(data)
+            if self.spectrum.mag_sum > 0:
+                spectrum_ready = True
+                centroid = self.spectrum.centroid()
+                if use_tdoa:
+                    delay, strength = self.tdoa.estimate(self.spectrum.channel_spectra[0], self.spectrum.channel_spectra[1])
+                    direction_balance, direction_confidence = combine_direction(balance, self.tdoa.delay_balance(delay), strength)
+                    confidence = clamp((direction_confidence * 0.45) + (peak * 0.55), 0.0, 1.0)
+                    is_back = rear_with_hysteresis(centroid, REAR_THRESHOLD, self.was_back)
+                    self.was_back = is_back
+                elif centroid < REAR_THRESHOLD:
+                    is_back = True
+                if use_panning:
+                    panning = self.panner.analyze(is_back=is_back, swap_channels=settings.get("swap_channels", False))
+                    if panning is not None:
+                        confidence = clamp((panning["focus"] * 0.45) + (peak * 0.55), 0.0, 1.0)
+                self.spectrum.band_energies(self.band_ranges, out=self.band_energies)
+                energy = self.spectrum.energy()
+                band_energies = self.band_energies
+                if adaptive_noise:
+                    # Постоянный фон в полосе (гул, ветер) вычитается из ее доли, чтобы не выдавать себя за событие.
+                    np.subtract(self.band_energies, self.noise.update_bands(self.band_energies), out=self.band_signal)
+                    np.maximum(self.band_signal, 0.0, out=self.band_signal)
+                    band_energies = self.band_signal
+                bands = {name: float(value) / energy for name, value in zip(self.band_names, band_energies)}
+
+        event = classify_audio_event_bands(total, self.previous_level, centroid, bands, noise_floor, is_moving=is_moving)
+        self.previous_level = (self.previous_level * 0.72) + (total * 0.28)
+
+        sectors = [0.0] * NUM_SECTORS
+        if total > noise_floor:
+            if surround is not None and surround["angle"] is not None:
+                angle = surround["angle"]
+                if settings.get("swap_channels", False):
+                    angle = (360 - angle) % 360
+            elif panning is not None:
+                angle = panning["angle"]
+            else:
+                angle = direction_angle_from_balance(
+                    direction_balance,
+                    is_back=is_back,
+                    swap_channels=settings.get("swap_channels", False)
+                )
+            smoothing = settings.get("direction_smoothing", 0.35)
+            if event in ("IMPACT", "SHARP"):
+                smoothing = max(smoothing, 0.75)
+            self.smoothed_angle = smooth_angle(self.smoothed_angle, angle, smoothing)
+            sectors = build_sector_levels(self.smoothed_angle, peak, spread=settings.get("sector_spread", 2))
+            if panning is not None:
+                # Гистограмма панорамы: несколько направлений видны одновременно, с тем же сглаживанием и шириной сектора.
+                sectors = self.panner.sector_levels(peak, spread=settings.get("sector_spread", 2), smoothing=smoothing).tolist()
+        if use_panning and (panning is None or total <= noise_floor):
+            self.panner.release()
+
+        tracks = []
+        if max_sources > 1 and surround is None:
+            if spectrum_ready and total > noise_floor:
+                tracks = self.tracker.update(
+                    peak,
+                    centroid,
+                    noise_floor,
+                    is_back=is_back,
+                    is_moving=is_moving,
+                    max_sources=max_sources,
+                    swap_channels=settings.get("swap_channels", False),
+                    smoothing=settings.get("direction_smoothing", 0.35),
+                )
+            else:
+                tracks = self.tracker.decay_tracks(noise_floor)
+            if len(tracks):
+                # Каждый трек рисуется своим пятном, вместо одного среднего направления между ними.
+                sectors = tracks_to_sectors(tracks, spread=settings.get("sector_spread", 2))
+
+        return {
+            "sectors": sectors,
+            "peak": peak,
+            "confidence": confidence,
+            "event": event,
+            "angle": self.smoothed_angle,
+            "level": total,
+            "balance": balance,
+            "centroid": centroid,
+            "bands": bands,
+            "delay": delay,
+            "tracks": tracks,
+            "noise_floor": noise_floor,
+            "is_moving": is_moving,
+            "is_loud": total > 0.6,
+        }
@@ -0,0 +1,56 @@
+class CanvasStateCache:
+    # Помнит последние fill/text/coords каждого элемента холста и пропускает вызовы Tk,
+    # которые ничего не меняют. Каждый пропущенный вызов - это сэкономленный переход в Tcl.
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.item_options = {}
+        self.item_coords = {}
+        self.frame_calls = 0
+        self.calls_last_frame = 0
+        self.total_calls = 0
+        self.skipped_calls = 0
+
+    def clear(self):
+        self.item_options.clear()
+        self.item_coords.clear()
+
+    def remember(self, item, **options):
+        self.item_options.setdefault(item, {}).update(options)
+
+    def itemconfigure(self, item, **options):
+        state = self.item_options.setdefault(item, {})
+        changed = None
+        for key, value in options.items():
+            if state.get(key) != value:
+                if changed is None:
+                    changed = {}
+                changed[key] = value
+        if changed is None:
+            self.skipped_calls += 1
+            return
+        self.canvas.itemconfigure(item, **changed)
+        state.update(changed)
+        self.frame_calls += 1
+        self.total_calls += 1
+
+    def coords(self, item, *coords):
+        if self.item_coords.get(item) == coords:
+            self.skipped_calls += 1
+            return
+        self.canvas.coords(item, *coords)
+        self.item_coords[item] = coords
+        self.frame_calls += 1
+        self.total_calls += 1
+
+    def begin_frame(self):
+        self.frame_calls = 0
+
+    def end_frame(self):
+        self.calls_last_frame = self.frame_calls
+
+    def stats(self):
+        return {
+            "tk_calls_last_frame": self.calls_last_frame,
+            "tk_calls_total": self.total_calls,
+            "tk_calls_skipped": self.skipped_calls,
+        }
@@ -0,0 +1,442 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from app_config import BLOCK_SIZE, REPLAY_DIR, SAMPLE_RATE, log_message
+from audio_direction import NUM_SECTORS, angle_to_sector
+from audio_file import pcm_to_float32
+
+SESSION_LOG_EXTENSION = ".rzlog"
+SESSION_LOG_MAGIC = b"RZLOG1"
+# 64 блока по 512 сэмплов - около 0.7 с на чанк; в очереди писателя не больше 4 чанков.
+CHUNK_BLOCKS = 64
+QUEUE_CHUNKS = 4
+AUDIO_DTYPES = {"int16": np.dtype("<i2"), "float32": np.dtype("<f4")}
+EVENT_NAMES = ("IDLE", "SOUND", "STEP", "IMPACT", "SHARP", "LOW")
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_NAMES)}
+MOVING_FLAG = 1
+LOUD_FLAG = 2
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("sample_rate", "<u4"),
+    ("block_size", "<u4"),
+    ("channels", "<u4"),
+    ("chunk_blocks", "<u4"),
+    ("num_sectors", "<u4"),
+    ("audio_format", "S8"),
+    ("started_at", "<f8"),
+])
+# Индекс чанков лежит рядом в <файл>.idx: по нему поиск по времени не трогает сами чанки.
+INDEX_DTYPE = np.dtype([
+    ("chunk", "<u4"),
+    ("count", "<u4"),
+    ("first_seq", "<u8"),
+    ("start", "<f8"),
+    ("end", "<f8"),
+])
+
+
+def record_dtype(num_sectors=NUM_SECTORS):
+    # Результат анализа одного блока; angle = NaN, если направления не было.
+    return np.dtype([
+        ("seq", "<u8"),
+        ("time", "<f8"),
+        ("angle", "<f4"),
+        ("level", "<f4"),
+        ("peak", "<f4"),
+        ("confidence", "<f4"),
+        ("centroid", "<f4"),
+        ("balance", "<f4"),
+        ("noise_floor", "<f4"),
+        ("event", "u1"),
+        ("flags", "u1"),
+        ("sectors", "<f4", (num_sectors,)),
+    ])
+
+
+def chunk_dtype(block_size, channels, audio_format, chunk_blocks=CHUNK_BLOCKS, num_sectors=NUM_SECTORS):
+    # Чанк фиксированного размера: смещение чанка k в файле - HEADER + k * itemsize,
+    # поэтому весь файл после заголовка читается одним np.memmap как массив чанков.
+    return np.dtype([
+        ("chunk", "<u4"),
+        ("count", "<u4"),
+        ("records", record_dtype(num_sectors), (chunk_blocks,)),
+        ("audio", AUDIO_DTYPES[audio_format], (chunk_blocks, block_size, channels)),
+    ])
+
+
+def session_log_path(folder=REPLAY_DIR):
+    # Новый сегмент в ту же секунду (переподключение с другим числом каналов) получает суффикс -2, -3...
+    base = os.path.join(folder, time.strftime("session-%Y%m%d-%H%M%S"))
+    path = base + SESSION_LOG_EXTENSION
+    number = 2
+    while os.path.exists(path):
+        path = f"{base}-{number}{SESSION_LOG_EXTENSION}"
+        number += 1
+    return path
+
+
+def is_session_log(path):
+    return os.path.splitext(str(path))[1].lower() == SESSION_LOG_EXTENSION
+
+
+class SessionRecorder:
+    # Запись сессии: сырой блок и результат анализа на каждый блок. write() вызывается из аудиопотока
+    # и только копирует блок в заранее выделенный чанк; на диск чанки пишет отдельный поток.
+    # Если писатель не успевает и свободных чанков нет, блоки выбрасываются (dropped), а аудиопоток не ждет.
+    def __init__(self, path, channels=2, audio_format="int16", block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE,
+                 chunk_blocks=CHUNK_BLOCKS, queue_chunks=QUEUE_CHUNKS, clock=time.perf_counter):
+        if audio_format not in AUDIO_DTYPES:
+            raise ValueError(f"Unknown session log format: {audio_format}")
+        self.path = path
+        self.channels = channels
+        self.audio_format = audio_format
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.chunk_blocks = chunk_blocks
+        self.clock = clock
+        self.dtype = chunk_dtype(block_size, channels, audio_format, chunk_blocks)
+        self.chunks = [np.zeros(1, dtype=self.dtype) for _ in range(queue_chunks)]
+        self.records = [chunk["records"][0] for chunk in self.chunks]
+        self.audio = [chunk["audio"][0] for chunk in self.chunks]
+        self.scratch = np.zeros((block_size, channels), dtype=np.float32)
+        self.free = queue.Queue()
+        self.full = queue.Queue()
+        for index in range(queue_chunks):
+            self.free.put(index)
+        self.current = None
+        self.position = 0
+        self.chunk_count = 0
+        self.seq = 0
+        self.started = None
+        self.file = None
+        self.index_file = None
+        self.thread = None
+        self.error = None
+        self.written = 0
+        self.dropped = 0
+        self.mismatched = 0
+        self.bytes_written = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def start(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = SESSION_LOG_MAGIC
+        header["sample_rate"] = self.sample_rate
+        header["block_size"] = self.block_size
+        header["channels"] = self.channels
+        header["chunk_blocks"] = self.chunk_blocks
+        header["num_sectors"] = NUM_SECTORS
+        header["audio_format"] = self.audio_format.encode()
+        header["started_at"] = time.time()
+        self.file = open(self.path, "wb")
+        self.index_file = open(self.path + ".idx", "wb")
+        header.tofile(self.file)
+        self.file.flush()
+        self.bytes_written = HEADER_DTYPE.itemsize
+        self.started = self.clock()
+        self.thread = threading.Thread(target=self.run, name="session-log", daemon=True)
+        self.thread.start()
+        return self
+
+    def write(self, data, frame):
+        seq = self.seq
+        self.seq += 1
+        if data.shape != (self.block_size, self.channels):
+            # Не очередь, а другой формат блока: считается отдельно от dropped и пишется в лог один раз.
+            if not self.mismatched:
+                log_message(f"Session log expects {self.block_size}x{self.channels} blocks, got {data.shape}")
+            self.mismatched += 1
+            return False
+        if self.current is None:
+            try:
+                self.current = self.free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return False
+            self.position = 0
+
+        index = self.current
+        position = self.position
+        record = self.records[index][position]
+        record["seq"] = seq
+        record["time"] = self.clock() - self.started
+        record["angle"] = np.nan if frame["angle"] is None else frame["angle"]
+        record["level"] = frame["level"]
+        record["peak"] = frame["peak"]
+        record["confidence"] = frame["confidence"]
+        record["centroid"] = frame["centroid"]
+        record["balance"] = frame["balance"]
+        record["noise_floor"] = frame["noise_floor"]
+        record["event"] = EVENT_CODES.get(frame["event"], 0)
+        record["flags"] = (MOVING_FLAG if frame["is_moving"] else 0) | (LOUD_FLAG if frame["is_loud"] else 0)
+        record["sectors"] = frame["sectors"]
+
+        audio = self.audio[index][position]
+        if self.audio_format == "int16":
+            # Та же шкала, что у pcm_to_float32 при чтении: 1.0 -> 32768, с обрезкой до 32767.
+            np.multiply(data, 32768.0, out=self.scratch)
+            np.clip(self.scratch, -32768.0, 32767.0, out=self.scratch)
+            np.copyto(audio, self.scratch, casting="unsafe")
+        else:
+            np.copyto(audio, data)
+
+        self.position = position + 1
+        self.written += 1
+        if self.position == self.chunk_blocks:
+            self.submit()
+        return True
+
+    def submit(self):
+        self.chunks[self.current]["chunk"] = self.chunk_count
+        self.chunks[self.current]["count"] = self.position
+        self.chunk_count += 1
+        self.full.put(self.current)
+        self.current = None
+
+    def run(self):
+        while True:
+            index = self.full.get()
+            if index is None:
+                return
+            chunk = self.chunks[index]
+            count = int(chunk["count"][0])
+            records = self.records[index]
+            entry = np.zeros(1, dtype=INDEX_DTYPE)
+            entry["chunk"] = chunk["chunk"]
+            entry["count"] = count
+            entry["first_seq"] = records["seq"][0]
+            entry["start"] = records["time"][0]
+            entry["end"] = records["time"][count - 1]
+            try:
+                # Чанк пишется целиком даже неполным, чтобы смещения в файле оставались кратными размеру чанка.
+                chunk.tofile(self.file)
+                self.file.flush()
+                entry.tofile(self.index_file)
+                self.index_file.flush()
+                self.bytes_written += self.dtype.itemsize
+            except Exception as e:
+                if self.error is None:
+                    log_message(f"Session log write error: {e}")
+                self.error = e
+                self.dropped += count
+            self.free.put(index)
+
+    def close(self):
+        if self.thread is None:
+            return
+        if self.current is not None and self.position:
+            self.submit()
+        self.full.put(None)
+        self.thread.join(timeout=5.0)
+        self.thread = None
+        self.file.close()
+        self.index_file.close()
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "format": self.audio_format,
+            "blocks": self.written,
+            "dropped": self.dropped,
+            "mismatched": self.mismatched,
+            "chunks": self.chunk_count,
+            "queued": self.full.qsize(),
+            "bytes": self.bytes_written,
+            "error": str(self.error) if self.error is not None else "",
+        }
+
+
+class SessionLog:
+    # Чтение записи через np.memmap: открытие и поиск по времени не читают аудио,
+    # страницы файла подгружаются, только когда блок действительно нужен.
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if not len(header) or header["magic"][0] != SESSION_LOG_MAGIC:
+            raise ValueError(f"Not a session log: {path}")
+        header = header[0]
+        self.path = path
+        self.sample_rate = int(header["sample_rate"])
+        self.block_size = int(header["block_size"])
+        self.channels = int(header["channels"])
+        self.chunk_blocks = int(header["chunk_blocks"])
+        self.audio_format = header["audio_format"].decode()
+        self.started_at = float(header["started_at"])
+        self.dtype = chunk_dtype(self.block_size, self.channels, self.audio_format, self.chunk_blocks, int(header["num_sectors"]))
+
+        # Недописанный хвост (запись оборвалась посреди чанка) отбрасывается.
+        count = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // self.dtype.itemsize
+        if count > 0:
+            self.chunks = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,))
+        else:
+            self.chunks = np.zeros(0, dtype=self.dtype)
+        self.index = self.load_index(count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        self.chunks = np.zeros(0, dtype=self.dtype)
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+
+    def load_index(self, count):
+        index_path = self.path + ".idx"
+        if os.path.exists(index_path):
+            index = np.fromfile(index_path, dtype=INDEX_DTYPE)
+            if len(index) == count:
+                return index
+        # Индекса нет или он не совпадает с файлом: собирается по заголовкам чанков.
+        index = np.zeros(count, dtype=INDEX_DTYPE)
+        for number in range(count):
+            chunk_count = int(self.chunks["count"][number])
+            times = self.chunks["records"][number]["time"]
+            index[number] = (number, chunk_count, self.chunks["records"][number]["seq"][0], times[0], times[max(chunk_count - 1, 0)])
+        return index
+
+    @property
+    def blocks(self):
+        return int(self.index["count"].sum())
+
+    @property
+    def duration(self):
+        if not len(self.index):
+            return 0.0
+        return float(self.index["end"][-1]) + self.block_size / self.sample_rate
+
+    def locate(self, seconds):
+        # (чанк, позиция) блока, который шел в момент seconds: двоичный поиск по индексу, потом внутри чанка.
+        if not len(self.index):
+            raise EOFError("Запись пустая")
+        number = max(int(np.searchsorted(self.index["start"], seconds, side="right")) - 1, 0)
+        times = self.chunks["records"][number]["time"][:int(self.index["count"][number])]
+        position = max(int(np.searchsorted(times, seconds, side="right")) - 1, 0)
+        return number, position
+
+    def records(self, start=0.0, end=None):
+        # Пары (результат, сырой блок) начиная с start; блок - view на memmap без копирования.
+        if not len(self.index):
+            return
+        number, position = self.locate(start)
+        while number < len(self.index):
+            records = self.chunks["records"][number]
+            audio = self.chunks["audio"][number]
+            for position in range(position, int(self.index["count"][number])):
+                record = records[position]
+                if end is not None and record["time"] > end:
+                    return
+                yield record, audio[position]
+            number += 1
+            position = 0
+
+    def frame(self, record):
+        angle = float(record["angle"])
+        flags = int(record["flags"])
+        event = int(record["event"])
+        return {
+            "time": float(record["time"]),
+            "seq": int(record["seq"]),
+            "sectors": [float(value) for value in record["sectors"]],
+            "peak": float(record["peak"]),
+            "confidence": float(record["confidence"]),
+            "event": EVENT_NAMES[event] if event < len(EVENT_NAMES) else "SOUND",
+            "angle": None if np.isnan(angle) else angle,
+            "level": float(record["level"]),
+            "balance": float(record["balance"]),
+            "centroid": float(record["centroid"]),
+            "noise_floor": float(record["noise_floor"]),
+            "is_moving": bool(flags & MOVING_FLAG),
+            "is_loud": bool(flags & LOUD_FLAG),
+        }
+
+    def timeline(self, start=0.0, end=None):
+        # То, что радар показывал во время записи, в формате таймлайна audio_replay.
+        rows = []
+        for record, _audio in self.records(start, end):
+            frame = self.frame(record)
+            rows.append({
+                "time": round(frame["time"], 4),
+                "event": frame["event"],
+                "angle": None if frame["angle"] is None else round(frame["angle"], 1),
+                "sector": None if frame["angle"] is None else angle_to_sector(frame["angle"]),
+                "level": round(frame["level"], 4),
+                "confidence": round(frame["confidence"], 3),
+            })
+        return rows
+
+
+class SessionLogRecorder:
+    # Интерфейс soundcard-рекордера поверх записи: блоки идут с нужного момента, как из устройства.
+    def __init__(self, log, channels, start=0.0, end=None, realtime=False):
+        self.log = log
+        self.channels = channels
+        self.realtime = realtime
+        self.blocks = log.records(start, end)
+        self.timestamp = start
+        self.frames_read = 0
+        self.started_at = None
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.blocks.close()
+        return False
+
+    def record(self, numframes=None):
+        if numframes is not None and numframes != self.log.block_size:
+            raise ValueError(f"Session log has {self.log.block_size}-sample blocks, requested {numframes}")
+        try:
+            record, audio = next(self.blocks)
+        except StopIteration:
+            raise EOFError("Запись закончилась")
+        self.timestamp = float(record["time"])
+        chunk = pcm_to_float32(np.asarray(audio))
+        if chunk.shape[1] >= self.channels:
+            block = np.array(chunk[:, :self.channels], dtype=np.float32)
+        else:
+            block = np.tile(chunk, (1, self.channels))[:, :self.channels]
+
+        self.frames_read += len(block)
+        if self.realtime:
+            delay = self.started_at + self.frames_read / self.log.sample_rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return block
+
+
+class SessionLogSource:
+    # Как FileAudioSource, но для .rzlog: воспроизведение с любого момента без чтения начала файла.
+    def __init__(self, path, start=0.0, end=None, realtime=False):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.start = start
+        self.end = end
+        self.realtime = realtime
+        self.log = SessionLog(path)
+
+    @property
+    def channels(self):
+        return self.log.channels
+
+    def recorder(self, samplerate, channels=2, blocksize=None):
+        if samplerate != self.log.sample_rate:
+            raise ValueError(f"Session log is {self.log.sample_rate} Hz, requested {samplerate} Hz")
+        return SessionLogRecorder(self.log, channels, start=self.start, end=self.end, realtime=self.realtime)
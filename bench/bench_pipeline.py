@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "Overlay"))
+sys.path.insert(0, BENCH_DIR)
+
+from app_config import DEFAULT_SETTINGS, DIRECTION_METHODS, SAMPLE_RATE
+from radar_engine import RadarEngine
+from signals import SIGNALS
+
+BLOCK_SIZES = (256, 512, 1024, 2048)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def run_case(signal_name, block_size, seconds=3.0, sample_rate=SAMPLE_RATE, warmup_blocks=20, settings=None):
+    audio = SIGNALS[signal_name](seconds, sample_rate=sample_rate)
+    blocks = [audio[i:i + block_size] for i in range(0, len(audio) - block_size + 1, block_size)]
+    engine = RadarEngine(settings, sample_rate=sample_rate, block_size=block_size)
+    for block in blocks[:warmup_blocks]:
+        engine.process(block)
+    engine.reset()
+
+    timings = np.empty(len(blocks))
+    started = time.perf_counter()
+    for index, block in enumerate(blocks):
+        block_started = time.perf_counter()
+        engine.process(block)
+        timings[index] = time.perf_counter() - block_started
+    elapsed = time.perf_counter() - started
+
+    budget_ms = block_size / sample_rate * 1000.0
+    p50_ms = float(np.percentile(timings, 50) * 1000.0)
+    p99_ms = float(np.percentile(timings, 99) * 1000.0)
+    return {
+        "signal": signal_name,
+        "block_size": block_size,
+        "blocks": len(blocks),
+        "p50_ms": p50_ms,
+        "p99_ms": p99_ms,
+        "blocks_per_second": len(blocks) / elapsed,
+        "budget_ms": budget_ms,
+        "budget_used": p99_ms / budget_ms,
+    }
+
+
+def run_benchmark(signals=None, block_sizes=BLOCK_SIZES, seconds=3.0, direction_method="balance", track_sources=1, denoise=False):
+    settings = dict(DEFAULT_SETTINGS, direction_method=direction_method, track_sources=track_sources, denoise=denoise)
+    # Ключи режима по умолчанию не меняются, чтобы старые baseline.json оставались сравнимыми.
+    suffix = "" if direction_method == "balance" else f"/{direction_method}"
+    if track_sources > 1:
+        suffix += f"/tracks{track_sources}"
+    if denoise:
+        suffix += "/denoise"
+    results = {}
+    for signal_name in signals or SIGNALS:
+        for block_size in block_sizes:
+            results[f"{signal_name}/{block_size}{suffix}"] = run_case(signal_name, block_size, seconds=seconds, settings=settings)
+    return results
+
+
+def find_regressions(results, baseline, margin):
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        limit = reference["p50_ms"] * (1.0 + margin)
+        if result["p50_ms"] > limit:
+            regressions.append(f"{key}: p50 {result['p50_ms']:.3f} ms > {limit:.3f} ms (baseline {reference['p50_ms']:.3f} ms)")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'case':<30}{'p50 ms':>10}{'p99 ms':>10}{'blocks/s':>12}{'budget':>9}")
+    for key, result in results.items():
+        print(
+            f"{key:<30}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+            f"{result['blocks_per_second']:>12.0f}{result['budget_used']:>8.1%}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк анализа одного блока: фильтр, RMS, rfft, классификатор, секторы.")
+    parser.add_argument("--signals", nargs="+", choices=list(SIGNALS.keys()))
+    parser.add_argument("--block-sizes", nargs="+", type=int, default=list(BLOCK_SIZES))
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--direction-method", choices=DIRECTION_METHODS, default="balance")
+    parser.add_argument("--track-sources", type=int, default=1, help="больше 1 - трекер нескольких источников")
+    parser.add_argument("--denoise", action="store_true", help="спектральный шумодав перед анализом")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--margin", type=float, default=0.25, help="допустимое замедление p50 относительно базы (0.25 = +25%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.signals, args.block_sizes, args.seconds, args.direction_method, args.track_sources, args.denoise)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = find_regressions(results, baseline, args.margin)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
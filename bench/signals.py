@@ -0,0 +1,63 @@
+import numpy as np
+from scipy import signal
+
+from app_config import SAMPLE_RATE
+
+
+def silence(seconds, sample_rate=SAMPLE_RATE):
+    return np.zeros((int(seconds * sample_rate), 2), dtype=np.float32)
+
+
+def pink_noise(seconds, sample_rate=SAMPLE_RATE, level=0.05, seed=1):
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * sample_rate)
+    spectrum = np.fft.rfft(rng.standard_normal((frames, 2)), axis=0)
+    scale = 1.0 / np.sqrt(np.maximum(np.arange(spectrum.shape[0]), 1))
+    pink = np.fft.irfft(spectrum * scale[:, np.newaxis], n=frames, axis=0)
+    pink *= level / (np.std(pink) + 1e-12)
+    return pink.astype(np.float32)
+
+
+def footsteps(seconds, sample_rate=SAMPLE_RATE, pan=0.6, interval=0.45, seed=2):
+    # Короткие глухие удары 200-2000 Гц с паузами, как шаги сбоку.
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * sample_rate)
+    mono = np.zeros(frames)
+    step = int(0.06 * sample_rate)
+    envelope = np.exp(-np.linspace(0, 6, step))
+    sos = signal.butter(2, [200, 2000], btype="band", fs=sample_rate, output="sos")
+    for start in range(0, frames - step, int(interval * sample_rate)):
+        mono[start:start + step] += signal.sosfilt(sos, rng.standard_normal(step)) * envelope * 0.4
+    return pan_mono(mono, pan)
+
+
+def gunshots(seconds, sample_rate=SAMPLE_RATE, pan=-0.4, interval=0.8, seed=3):
+    # Широкополосный резкий щелчок с быстрым спадом.
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * sample_rate)
+    mono = np.zeros(frames)
+    shot = int(0.12 * sample_rate)
+    envelope = np.exp(-np.linspace(0, 12, shot))
+    for start in range(0, frames - shot, int(interval * sample_rate)):
+        mono[start:start + shot] += rng.standard_normal(shot) * envelope * 0.9
+    return pan_mono(mono, pan)
+
+
+def crossfire(seconds, sample_rate=SAMPLE_RATE):
+    # Шаги слева и выстрелы справа одновременно - случай для трекера нескольких источников.
+    return footsteps(seconds, sample_rate, pan=-0.7) + gunshots(seconds, sample_rate, pan=0.7)
+
+
+def pan_mono(mono, pan):
+    left = mono * np.sqrt((1.0 - pan) / 2.0)
+    right = mono * np.sqrt((1.0 + pan) / 2.0)
+    return np.stack([left, right], axis=1).astype(np.float32)
+
+
+SIGNALS = {
+    "silence": silence,
+    "pink_noise": pink_noise,
+    "footsteps": footsteps,
+    "gunshots": gunshots,
+    "crossfire": crossfire,
+}
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Overlay"))
+sys.path.insert(0, os.path.join(ROOT, "web"))
+
+try:
+    from aiohttp import ClientSession, WSMsgType, web
+except ImportError:
+    web = None
+
+from audio_direction import NUM_SECTORS
+from radar_broadcast import KEYFRAME, decode_frame
+from radar_pipeline import LatestFrameQueue, PipelineStats
+
+if web is not None:
+    from async_server import AsyncRadarServer
+
+
+def make_frame(level):
+    return {
+        "sectors": [level] + [0.0] * (NUM_SECTORS - 1),
+        "event": "STEP",
+        "is_moving": False,
+        "is_loud": False,
+        "timestamp": time.time(),
+        "captured_at": time.perf_counter(),
+    }
+
+
+@unittest.skipUnless(web is not None, "aiohttp is not installed")
+class AsyncRadarServerTests(unittest.TestCase):
+    def run_clients(self, clients):
+        async def scenario():
+            frame_queue = LatestFrameQueue()
+            server = AsyncRadarServer("<html>{{ transport }}</html>", frame_queue, PipelineStats())
+            runner = web.AppRunner(server.app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            base = "http://127.0.0.1:%d" % site._server.sockets[0].getsockname()[1]
+            try:
+                async with ClientSession() as session:
+                    async with session.get(base + "/") as response:
+                        page = await response.text()
+                    sockets = [await session.ws_connect(base + "/ws") for _ in range(clients)]
+                    while len(server.outboxes) < clients:
+                        await asyncio.sleep(0.01)
+                    frame_queue.put(make_frame(0.5))
+                    decoded = []
+                    for ws in sockets:
+                        message = await ws.receive(timeout=5)
+                        self.assertEqual(message.type, WSMsgType.BINARY)
+                        sectors = bytearray(NUM_SECTORS)
+                        decoded.append((decode_frame(message.data, sectors), bytes(sectors)))
+                        await ws.close()
+                    async with session.get(base + "/stats") as response:
+                        stats = await response.json()
+                return page, decoded, stats
+            finally:
+                await runner.cleanup()
+
+        return asyncio.run(scenario())
+
+    def test_every_client_receives_keyframe(self):
+        page, decoded, stats = self.run_clients(5)
+
+        self.assertEqual(page, "<html>ws</html>")
+        self.assertEqual(len(decoded), 5)
+        for frame, sectors in decoded:
+            self.assertEqual(frame["kind"], KEYFRAME)
+            self.assertEqual(frame["event"], "STEP")
+            self.assertEqual(sectors[0], 128)
+        self.assertEqual(stats["network"]["frames_sent"], 5)
+        self.assertIn("cpu_percent", stats["server"])
+
+    def test_overflowing_client_gets_keyframe_next(self):
+        frame_queue = LatestFrameQueue()
+        server = AsyncRadarServer("", frame_queue, PipelineStats())
+        server.outboxes[1] = asyncio.Queue(maxsize=1)
+        server.broadcaster.add_client(1)
+        server.broadcaster.clients[1].last_keyframe = 0.0
+
+        server.enqueue(1, b"a")
+        server.enqueue(1, b"b")
+
+        self.assertTrue(server.outboxes[1].empty())
+        self.assertEqual(server.overflows, 1)
+        self.assertIsNone(server.broadcaster.clients[1].last_keyframe)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.io import wavfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from audio_capture import CaptureStream, RecorderBackend, SyntheticBackend
+from audio_file import FileAudioSource
+
+
+def counter_block(out, index):
+    # Номер блока в каждом сэмпле: по нему видно порядок и пропуски.
+    out.fill(index)
+
+
+class CaptureStreamTests(unittest.TestCase):
+    def test_blocks_arrive_in_order_as_ring_views(self):
+        stream = CaptureStream(SyntheticBackend(counter_block, blocks=40), capacity=64)
+        seen = []
+        with stream:
+            while True:
+                try:
+                    data = stream.read(timeout=1.0)
+                except EOFError:
+                    break
+                self.assertTrue(np.shares_memory(data, stream.blocks))
+                self.assertEqual(data.shape, (512, 2))
+                seen.append(int(data[0, 0]))
+        self.assertEqual(seen, list(range(40)))
+        stats = stream.stats()
+        self.assertEqual(stats["overruns"], 0)
+        self.assertEqual(stats["read"], 40)
+        self.assertGreaterEqual(stats["latency_max_ms"], 0.0)
+
+    def test_slow_reader_counts_overruns_and_keeps_held_view(self):
+        stream = CaptureStream(SyntheticBackend(counter_block, blocks=20), capacity=4)
+        with stream:
+            held = stream.read(timeout=1.0)
+            self.assertEqual(int(held[0, 0]), 0)
+            # Пока view у читателя, писатель заполняет остальные слоты и выбрасывает лишнее, пока сигнал не кончится.
+            stream.thread.join(timeout=2.0)
+            self.assertFalse(stream.running)
+            self.assertTrue(np.all(held == 0))
+            values = []
+            while True:
+                try:
+                    values.append(int(stream.read(timeout=1.0)[0, 0]))
+                except EOFError:
+                    break
+        self.assertEqual(values, [1, 2, 3])
+        self.assertEqual(stream.stats()["overruns"], 16)
+
+    def test_underrun_when_device_is_late(self):
+        backend = SyntheticBackend(counter_block, block_size=4800, realtime=True)
+        with CaptureStream(backend) as stream:
+            # Блок 0.1 с, ждем 10 мс.
+            self.assertIsNone(stream.read(timeout=0.01))
+            self.assertIsNotNone(stream.read(timeout=1.0))
+        self.assertEqual(stream.stats()["underruns"], 1)
+
+    def test_device_error_reaches_reader_after_queued_blocks(self):
+        def generate(out, index):
+            if index == 2:
+                raise OSError("device unplugged")
+            counter_block(out, index)
+
+        with CaptureStream(SyntheticBackend(generate)) as stream:
+            self.assertEqual(int(stream.read(timeout=1.0)[0, 0]), 0)
+            self.assertEqual(int(stream.read(timeout=1.0)[0, 0]), 1)
+            with self.assertRaises(OSError):
+                stream.read(timeout=1.0)
+
+    def test_file_backend_through_recorder_interface(self):
+        data = np.random.default_rng(0).standard_normal((512 * 6, 2)).astype(np.float32) * 0.1
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "take.wav")
+            wavfile.write(path, 48000, data)
+            blocks = []
+            with CaptureStream(RecorderBackend(FileAudioSource(path))) as stream:
+                for _ in range(6):
+                    blocks.append(stream.read(timeout=1.0).copy())
+        np.testing.assert_array_equal(np.concatenate(blocks), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
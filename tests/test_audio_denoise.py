@@ -0,0 +1,110 @@
+import os
+import sys
+import tracemalloc
+import unittest
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from app_config import PROFILE_PRESETS, DEFAULT_SETTINGS, apply_profile_preset
+from audio_denoise import SpectralDenoiser
+from radar_engine import RadarEngine
+
+
+def band_noise(frames, low, high, gain, seed):
+    rng = np.random.default_rng(seed)
+    sos = signal.butter(4, [low, high], btype="band", fs=48000, output="sos")
+    return signal.sosfilt(sos, rng.standard_normal(frames)) * gain
+
+
+def ambience(frames=48000 * 4):
+    # Некоррелированный шум в двух каналах, как дождь или ветер со всех сторон.
+    return np.stack([band_noise(frames, 200, 6000, 0.001, 3), band_noise(frames, 200, 6000, 0.001, 4)], axis=1)
+
+
+def run_denoiser(denoiser, data, block_size=512):
+    return np.concatenate([denoiser.process(data[start:start + block_size]).copy() for start in range(0, len(data), block_size)])
+
+
+class SpectralDenoiserTests(unittest.TestCase):
+    def test_overlap_add_reconstructs_with_one_block_delay(self):
+        data = np.random.default_rng(0).standard_normal((512 * 20, 2))
+        denoiser = SpectralDenoiser(512)
+        output = run_denoiser(denoiser, data[:512 * 10])
+        # Пока профиль шума не выучен, усиление 1 и сигнал проходит без изменений.
+        self.assertFalse(denoiser.ready)
+        np.testing.assert_allclose(output[512:], data[:512 * 9], atol=1e-12)
+
+    def test_steady_noise_is_suppressed_and_tone_burst_kept(self):
+        data = ambience()
+        burst = np.zeros(len(data))
+        start = len(data) - 512 * 8
+        burst[start:start + 512 * 4] = 0.01 * np.sin(2 * np.pi * 937.5 * np.arange(512 * 4) / 48000)
+        data[:, 0] += burst
+
+        output = run_denoiser(SpectralDenoiser(512), data)
+        quiet = slice(start - 512 * 20, start - 512 * 2)
+        noise_drop = np.mean(output[quiet] ** 2) / np.mean(data[quiet] ** 2)
+        self.assertLess(10 * np.log10(noise_drop), -10.0)
+
+        kept = slice(start + 512 * 2, start + 512 * 4)
+        tone_ratio = np.mean(output[kept, 0] ** 2) / np.mean(burst[start:start + 512 * 4] ** 2)
+        self.assertGreater(tone_ratio, 0.8)
+
+    def test_same_gain_on_both_channels(self):
+        data = ambience()
+        data[:, 1] = data[:, 0] * 0.5
+        output = run_denoiser(SpectralDenoiser(512), data)
+        tail = output[-512 * 20:]
+        np.testing.assert_allclose(tail[:, 1], tail[:, 0] * 0.5, atol=1e-12)
+
+    def test_process_has_fixed_cost(self):
+        denoiser = SpectralDenoiser(512)
+        block = np.random.default_rng(1).standard_normal((512, 2)).astype(np.float32)
+        for _ in range(250):
+            denoiser.process(block)
+        peaks = []
+        tracemalloc.start()
+        for _ in range(100):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            denoiser.process(block)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+        self.assertLess(sorted(peaks)[len(peaks) // 2], 3072)
+
+
+class EngineDenoiseTests(unittest.TestCase):
+    def run_engine(self, denoise, data):
+        engine = RadarEngine(dict(DEFAULT_SETTINGS, denoise=denoise, adaptive_noise_floor=False))
+        return [engine.process(data[start:start + 512]) for start in range(0, len(data) - 512 + 1, 512)]
+
+    def test_step_direction_survives_ambience(self):
+        data = ambience()
+        start = len(data) - 4096
+        data[start:start + 2400, 1] += band_noise(2400, 500, 1500, 0.004, 5)
+
+        plain = self.run_engine(False, data)
+        cleaned = self.run_engine(True, data)
+        # Шаг справа: после шумодава баланс ближе к правому краю, а один фон дает меньшую уверенность.
+        step_balance = lambda frames: max(frame["balance"] for frame in frames[-10:])
+        self.assertGreater(step_balance(cleaned), step_balance(plain) + 0.1)
+        self.assertLess(cleaned[-1]["confidence"], plain[-1]["confidence"])
+        self.assertLess(cleaned[-1]["level"], plain[-1]["level"])
+
+    def test_presets_toggle_denoise(self):
+        for name, preset in PROFILE_PRESETS.items():
+            if name == "Custom":
+                continue
+            self.assertIn("denoise", preset)
+        settings = DEFAULT_SETTINGS.copy()
+        apply_profile_preset(settings, "Tarkov / tactical")
+        self.assertTrue(settings["denoise"])
+        apply_profile_preset(settings, "CS2 / footsteps")
+        self.assertFalse(settings["denoise"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from Overlay.audio_events import classify_audio_event
+from Overlay.audio_events import classify_audio_event, classify_audio_event_bands
 
 
 class AudioEventTests(unittest.TestCase):
@@ -23,6 +23,34 @@ class AudioEventTests(unittest.TestCase):
         self.assertEqual(classify_audio_event(0.12, 0.1, 180, 0.02), "LOW")
 
 
+class BandEventTests(unittest.TestCase):
+    def test_without_bands_falls_back_to_centroid(self):
+        self.assertEqual(classify_audio_event_bands(0.28, 0.12, 900, None, 0.02), "STEP")
+        self.assertEqual(classify_audio_event_bands(0.01, 0.0, 900, None, 0.02), "IDLE")
+
+    def test_step_over_low_rumble(self):
+        bands = {"low": 0.35, "step": 0.55, "crack": 0.02}
+        self.assertEqual(classify_audio_event(0.28, 0.12, 160, 0.02), "LOW")
+        self.assertEqual(classify_audio_event_bands(0.28, 0.12, 160, bands, 0.02), "STEP")
+
+    def test_sharp_crack_with_low_boom(self):
+        bands = {"low": 0.3, "step": 0.3, "crack": 0.35}
+        self.assertEqual(classify_audio_event(0.4, 0.38, 1500, 0.02), "SOUND")
+        self.assertEqual(classify_audio_event_bands(0.4, 0.38, 1500, bands, 0.02), "SHARP")
+
+    def test_low_rumble(self):
+        bands = {"low": 0.8, "step": 0.15, "crack": 0.0}
+        self.assertEqual(classify_audio_event_bands(0.12, 0.1, 600, bands, 0.02), "LOW")
+
+    def test_movement_suppresses_band_step(self):
+        bands = {"low": 0.1, "step": 0.8, "crack": 0.05}
+        self.assertNotEqual(classify_audio_event_bands(0.28, 0.12, 900, bands, 0.02, is_moving=True), "STEP")
+
+    def test_impact_still_wins(self):
+        bands = {"low": 0.1, "step": 0.2, "crack": 0.6}
+        self.assertEqual(classify_audio_event_bands(0.9, 0.4, 3000, bands, 0.02), "IMPACT")
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,98 @@
+import math
+import os
+import sys
+import tracemalloc
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from audio_features import SpectrumAnalyzer, analyze_block_batch
+
+
+def reference_block(data, sensitivity):
+    rms_l = math.sqrt(float(np.mean(data[:, 0] ** 2)))
+    rms_r = math.sqrt(float(np.mean(data[:, 1] ** 2)))
+    channel_sum = rms_l + rms_r
+    mags = np.abs(np.fft.rfft(data[:, 0] + data[:, 1]))
+    mag_sum = np.sum(mags)
+    centroid = float((np.sum(np.arange(len(mags)) * mags) / mag_sum) * (48000 / len(data))) if mag_sum > 0 else 0.0
+    return {
+        "level": float(np.power(channel_sum * sensitivity, 0.4)),
+        "balance": (rms_r - rms_l) / (channel_sum + 0.000001),
+        "centroid": centroid,
+    }
+
+
+class BatchFeatureTests(unittest.TestCase):
+    def test_batch_matches_per_block_loop(self):
+        rng = np.random.default_rng(5)
+        blocks = (rng.standard_normal((40, 512, 2)) * rng.uniform(0.001, 0.3, (40, 1, 2))).astype(np.float32)
+        blocks[3] = 0.0
+        features = analyze_block_batch(blocks, 350.0)
+
+        for index, block in enumerate(blocks):
+            expected = reference_block(block, 350.0)
+            self.assertAlmostEqual(features["level"][index], expected["level"], places=4)
+            self.assertAlmostEqual(features["balance"][index], expected["balance"], places=4)
+            self.assertAlmostEqual(features["centroid"][index], expected["centroid"], delta=0.5)
+
+    def test_silent_block_has_no_spectrum(self):
+        features = analyze_block_batch(np.zeros((2, 512, 2), dtype=np.float32), 350.0)
+        self.assertFalse(features["has_spectrum"].any())
+        self.assertEqual(features["centroid"].tolist(), [0.0, 0.0])
+
+
+class SpectrumAnalyzerTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.block = (rng.standard_normal((512, 2)) * 0.1).astype(np.float32)
+
+    def test_centroid_matches_reference(self):
+        analyzer = SpectrumAnalyzer(512, 48000)
+        analyzer.analyze(self.block)
+        self.assertAlmostEqual(analyzer.centroid(), reference_block(self.block, 350.0)["centroid"], delta=0.01)
+
+    def test_band_energies_and_rolloff_for_pure_tone(self):
+        t = np.arange(512) / 48000
+        tone = np.sin(2 * np.pi * 3000 * t)
+        block = np.stack([tone, tone], axis=1)
+        analyzer = SpectrumAnalyzer(512, 48000)
+        analyzer.analyze(block)
+        low, high = analyzer.band_energies(((20, 1000), (2000, 4000)))
+        self.assertGreater(high, low * 1000)
+        self.assertAlmostEqual(analyzer.rolloff(0.5), 3000, delta=48000 / 512)
+
+    def test_resizes_for_other_block_lengths(self):
+        analyzer = SpectrumAnalyzer(512, 48000)
+        analyzer.analyze(np.ones((1024, 2)))
+        self.assertEqual(len(analyzer.mags), 513)
+
+    def test_steady_state_does_not_allocate(self):
+        analyzer = SpectrumAnalyzer(512, 48000)
+        bands = ((40, 250), (250, 2000), (2500, 8000))
+        energies = np.empty(3)
+        for _ in range(5):
+            analyzer.analyze(self.block)
+            analyzer.band_energies(bands, out=energies)
+            analyzer.rolloff()
+
+        peaks = []
+        tracemalloc.start()
+        for _ in range(200):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            analyzer.analyze(self.block)
+            analyzer.centroid()
+            analyzer.band_energies(bands, out=energies)
+            analyzer.rolloff()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+        # Только временный буфер внутри rfft; прежний путь держал ~16 KB на блок.
+        self.assertLess(sorted(peaks)[len(peaks) // 2], 8192)
+        self.assertIs(analyzer.analyze(self.block), analyzer.mags)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from audio_filters import StreamingBandpass
+
+
+def synthetic_recording(seconds=10.0, sample_rate=48000):
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    left = 0.2 * np.sin(2 * np.pi * 700 * t) + 0.05 * rng.standard_normal(len(t))
+    right = 0.1 * np.sin(2 * np.pi * 2400 * t) + 0.05 * rng.standard_normal(len(t))
+    clicks = (np.arange(len(t)) % 9000) < 40
+    left[clicks] += 0.8
+    return np.stack([left, right], axis=1).astype(np.float32)
+
+
+class StreamingBandpassTests(unittest.TestCase):
+    def test_blockwise_output_matches_whole_stream(self):
+        recording = synthetic_recording()
+        bandpass = StreamingBandpass()
+        expected = signal.sosfilt(bandpass.sos, recording, axis=0)
+
+        chunks = [bandpass.process(recording[i:i + 512]) for i in range(0, len(recording), 512)]
+        np.testing.assert_allclose(np.concatenate(chunks), expected, rtol=0, atol=1e-12)
+
+    def test_irregular_block_sizes_match_whole_stream(self):
+        recording = synthetic_recording(seconds=2.0)
+        bandpass = StreamingBandpass()
+        expected = signal.sosfilt(bandpass.sos, recording, axis=0)
+
+        chunks = []
+        position = 0
+        for size in [1, 17, 512, 1024, 333] * 40:
+            chunks.append(bandpass.process(recording[position:position + size]))
+            position += size
+        chunks.append(bandpass.process(recording[position:]))
+        np.testing.assert_allclose(np.concatenate(chunks), expected, rtol=0, atol=1e-12)
+
+    def test_tiny_state_is_flushed_in_place(self):
+        bandpass = StreamingBandpass()
+        bandpass.process(synthetic_recording(seconds=0.1)[:512])
+        scratch = bandpass.zi_abs
+        for _ in range(400):
+            bandpass.process(np.zeros((512, 2)))
+        self.assertIs(bandpass.zi_abs, scratch)
+        self.assertFalse(bandpass.zi.any())
+
+    def test_reset_restarts_from_cold_state(self):
+        recording = synthetic_recording(seconds=0.5)
+        bandpass = StreamingBandpass()
+        first = bandpass.process(recording[:512])
+        bandpass.process(recording[512:4096])
+        bandpass.reset()
+        np.testing.assert_array_equal(bandpass.process(recording[:512]), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
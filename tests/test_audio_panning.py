@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from audio_direction import angle_to_sector
+from audio_features import SpectrumAnalyzer
+from audio_panning import SpectralPanner
+from radar_engine import RadarEngine
+
+
+def tone(freq, frames=512, gain=0.2):
+    # Частоты кратны шагу бина (93.75 Гц), чтобы тон не растекался по соседним бинам.
+    return gain * np.sin(2 * np.pi * freq * np.arange(frames) / 48000)
+
+
+def pan(mono, value):
+    return np.stack([mono * np.sqrt((1.0 - value) / 2.0), mono * np.sqrt((1.0 + value) / 2.0)], axis=1).astype(np.float32)
+
+
+def pan_sector(value):
+    # Сектор, куда direction_angle_from_balance ставит моно-источник с такой панорамой.
+    left, right = np.sqrt((1.0 - value) / 2.0), np.sqrt((1.0 + value) / 2.0)
+    return angle_to_sector((right - left) / (right + left) * 90)
+
+
+def analyze(data, **kwargs):
+    spectrum = SpectrumAnalyzer(len(data))
+    spectrum.analyze_stereo(data)
+    return SpectralPanner(spectrum).analyze(**kwargs)
+
+
+class SpectralPannerTests(unittest.TestCase):
+    def test_two_panned_tones_give_two_peaks(self):
+        data = pan(tone(656.25), -1.0) + pan(tone(3000.0, gain=0.1), 1.0)
+        result = analyze(data)
+        histogram = result["histogram"]
+        self.assertEqual(histogram[12], 1.0)
+        self.assertAlmostEqual(histogram[4], 0.5, delta=0.05)
+        self.assertEqual(angle_to_sector(result["angle"]), 12)
+        self.assertLess(result["focus"], 0.8)
+
+    def test_back_hemisphere_and_swap(self):
+        data = pan(tone(937.5), 1.0)
+        self.assertEqual(angle_to_sector(analyze(data)["angle"]), 4)
+        self.assertEqual(angle_to_sector(analyze(data, swap_channels=True)["angle"]), 12)
+        data = pan(tone(937.5), 0.0)
+        self.assertEqual(angle_to_sector(analyze(data)["angle"]), 0)
+        self.assertEqual(angle_to_sector(analyze(data, is_back=True)["angle"]), 8)
+
+    def test_bins_outside_step_and_crack_bands_are_ignored(self):
+        data = pan(tone(187.5, gain=1.0), -1.0) + pan(tone(1500.0, gain=0.05), 0.6)
+        result = analyze(data)
+        self.assertEqual(int(np.argmax(result["histogram"])), pan_sector(0.6))
+
+    def test_sector_levels_follow_spread_and_smoothing(self):
+        left = pan(tone(937.5), -1.0)
+        right = pan(tone(937.5), 1.0)
+        spectrum = SpectrumAnalyzer(512)
+        panner = SpectralPanner(spectrum)
+
+        spectrum.analyze_stereo(left)
+        panner.analyze()
+        narrow = panner.sector_levels(0.8, spread=1).copy()
+        panner.release()
+        wide = panner.sector_levels(0.8, spread=3).copy()
+        self.assertEqual(float(narrow.max()), 0.8)
+        self.assertLess(float(narrow[(12 + 3) % 16]), 0.01)
+        self.assertAlmostEqual(float(wide[(12 + 3) % 16]), 0.1, places=6)
+
+        # Медленное сглаживание: после одного блока справа левый пик еще главный; быстрое - уже справа.
+        for smoothing, expected in ((0.35, 12), (1.0, 4)):
+            panner.release()
+            spectrum.analyze_stereo(left)
+            panner.analyze()
+            panner.sector_levels(1.0, spread=1, smoothing=smoothing)
+            spectrum.analyze_stereo(right)
+            panner.analyze()
+            self.assertEqual(int(np.argmax(panner.sector_levels(1.0, spread=1, smoothing=smoothing))), expected)
+
+    def test_quiet_side_source_is_not_swamped_by_loud_center(self):
+        rng = np.random.default_rng(2)
+        frames = 48000
+        ambience = signal.sosfilt(signal.butter(6, [60, 200], btype="band", fs=48000, output="sos"), rng.standard_normal(frames))
+        steps = signal.sosfilt(signal.butter(6, [500, 1500], btype="band", fs=48000, output="sos"), rng.standard_normal(frames))
+        data = pan(ambience, 0.0) + pan(steps * 0.15, 0.9)
+
+        frames_by_method = {}
+        for method in ("balance", "spectral_pan"):
+            engine = RadarEngine({"direction_method": method})
+            for start in range(0, frames - 512 + 1, 512):
+                frames_by_method[method] = engine.process(data[start:start + 512])
+
+        side = pan_sector(0.9)
+        panned = frames_by_method["spectral_pan"]["sectors"]
+        blended = frames_by_method["balance"]["sectors"]
+        self.assertGreater(panned[side], 0.5 * max(panned))
+        self.assertLess(blended[side], 0.5 * max(blended))
+
+
+if __name__ == "__main__":
+    unittest.main()
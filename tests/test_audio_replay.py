@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.io import wavfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from audio_file import FileAudioSource
+from audio_replay import replay_audio_file
+
+
+def write_tone(path, seconds, left_gain, right_gain, sample_rate=48000, dtype=np.int16):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    tone = 0.3 * np.sin(2 * np.pi * 900 * t)
+    stereo = np.stack([tone * left_gain, tone * right_gain], axis=1)
+    if dtype == np.int16:
+        stereo = (stereo * 32767).astype(np.int16)
+    else:
+        stereo = stereo.astype(dtype)
+    wavfile.write(path, sample_rate, stereo)
+
+
+class FileReplayTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "session.wav")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_recorder_returns_padded_blocks_then_eof(self):
+        write_tone(self.path, 0.025, 1.0, 0.0)
+        with FileAudioSource(self.path).recorder(samplerate=48000, channels=2, blocksize=512) as recorder:
+            blocks = [recorder.record(numframes=512) for _ in range(3)]
+            with self.assertRaises(EOFError):
+                recorder.record(numframes=512)
+        self.assertTrue(all(block.shape == (512, 2) and block.dtype == np.float32 for block in blocks))
+        self.assertEqual(float(np.abs(blocks[2][200:]).max()), 0.0)
+
+    def test_mono_file_is_duplicated_to_both_channels(self):
+        mono = (0.2 * np.ones(1024) * 32767).astype(np.int16)
+        wavfile.write(self.path, 48000, mono)
+        with FileAudioSource(self.path).recorder(samplerate=48000, channels=2, blocksize=512) as recorder:
+            block = recorder.record(numframes=512)
+        np.testing.assert_array_equal(block[:, 0], block[:, 1])
+
+    def test_loop_wraps_around(self):
+        write_tone(self.path, 0.01, 1.0, 1.0)
+        with FileAudioSource(self.path, loop=True).recorder(samplerate=48000, channels=2, blocksize=512) as recorder:
+            for _ in range(5):
+                recorder.record(numframes=512)
+
+    def test_replay_timeline_follows_direction(self):
+        write_tone(self.path, 1.0, 0.0, 1.0, dtype=np.float32)
+        result = replay_audio_file(self.path)
+        self.assertEqual(result["blocks"], len(result["timeline"]))
+        self.assertEqual(result["blocks"], int(np.ceil(48000 / 512)))
+        self.assertEqual(result["timeline"][-1]["sector"], 4)
+        self.assertGreater(result["realtime_factor"], 1.0)
+
+    def test_replay_wav_between_start_and_end(self):
+        t = np.arange(96000) / 48000
+        tone = 0.3 * np.sin(2 * np.pi * 900 * t)
+        stereo = np.stack([tone, tone], axis=1)
+        stereo[:48000, 1] = 0.0
+        stereo[48000:, 0] = 0.0
+        wavfile.write(self.path, 48000, stereo.astype(np.float32))
+        result = replay_audio_file(self.path, start=1.0, end=1.5)
+        self.assertEqual(result["blocks"], int(np.ceil(24000 / 512)))
+        self.assertAlmostEqual(result["timeline"][0]["time"], 1.0)
+        self.assertEqual(result["timeline"][-1]["sector"], 4)
+
+    def test_realtime_pacing_does_not_run_ahead(self):
+        write_tone(self.path, 0.1, 1.0, 0.0)
+        result = replay_audio_file(self.path, realtime=True)
+        self.assertGreaterEqual(result["elapsed"], result["audio_seconds"] * 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.io import wavfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from audio_direction import angle_to_sector
+from audio_file import FileAudioSource
+from audio_replay import replay_audio_file
+from audio_surround import SPEAKER_LAYOUTS, SurroundDirection, capture_channels
+from radar_engine import RadarEngine
+
+# Ожидаемый сектор для каждой колонки 7.1: FL, FR, FC, LFE, BL, BR, SL, SR.
+SECTORS_7_1 = (15, 1, 0, None, 9, 7, 12, 4)
+
+
+def speaker_noise(layout, channel, frames=512 * 12, gain=0.1, seed=4):
+    # Шум только в одной колонке, остальные каналы молчат.
+    rng = np.random.default_rng(seed)
+    data = np.zeros((frames, len(SPEAKER_LAYOUTS[layout])), dtype=np.float32)
+    data[:, channel] = rng.standard_normal(frames) * gain
+    return data
+
+
+def run_engine(engine, data, block_size=512):
+    frame = None
+    for start in range(0, len(data) - block_size + 1, block_size):
+        frame = engine.process(data[start:start + block_size])
+    return frame
+
+
+class SurroundDirectionTests(unittest.TestCase):
+    def test_each_7_1_speaker_maps_to_its_sector(self):
+        for channel, expected in enumerate(SECTORS_7_1):
+            frame = run_engine(RadarEngine(), speaker_noise("7.1", channel))
+            if expected is None:
+                self.assertIsNone(frame["angle"], "LFE must not produce a direction")
+                continue
+            self.assertEqual(angle_to_sector(frame["angle"]), expected, f"channel {channel}")
+            self.assertEqual(frame["sectors"].index(max(frame["sectors"])), expected)
+
+    def test_5_1_surrounds_are_behind_the_sides(self):
+        left = run_engine(RadarEngine(), speaker_noise("5.1", 4))
+        right = run_engine(RadarEngine(), speaker_noise("5.1", 5))
+        self.assertEqual(angle_to_sector(left["angle"]), 11)
+        self.assertEqual(angle_to_sector(right["angle"]), 5)
+
+    def test_phantom_source_between_speakers(self):
+        data = speaker_noise("7.1", 7) + speaker_noise("7.1", 5)
+        frame = run_engine(RadarEngine(), data)
+        self.assertEqual(angle_to_sector(frame["angle"]), 5)
+
+    def test_band_energies_match_per_channel_loop(self):
+        data = np.random.default_rng(1).standard_normal((512, 8)).astype(np.float32)
+        surround = SurroundDirection("7.1")
+        energies = surround.band_energies(data)
+        freqs = np.fft.rfftfreq(512, 1 / 48000)
+        for channel in range(8):
+            power = np.abs(np.fft.rfft(data[:, channel].astype(np.float64))) ** 2
+            expected = power[(freqs >= 250) & (freqs <= 2000)].sum()
+            self.assertAlmostEqual(energies[channel, 1] / expected, 1.0, places=9)
+
+    def test_capture_falls_back_to_stereo(self):
+        class Device:
+            channels = 2
+
+        class SurroundDevice:
+            channels = 8
+
+        self.assertEqual(capture_channels(Device(), "7.1"), 2)
+        self.assertEqual(capture_channels(SurroundDevice(), "7.1"), 8)
+        self.assertEqual(capture_channels(SurroundDevice(), "5.1"), 6)
+        self.assertEqual(capture_channels(SurroundDevice(), "stereo"), 2)
+
+    def test_replay_of_7_1_file_uses_speaker_directions(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "surround.wav")
+            wavfile.write(path, 48000, speaker_noise("7.1", 6, gain=0.2))
+            self.assertEqual(FileAudioSource(path).channels, 8)
+
+            surround = replay_audio_file(path, {"channel_layout": "7.1"})
+            stereo = replay_audio_file(path, {"channel_layout": "stereo"})
+
+        self.assertEqual(surround["timeline"][-1]["sector"], 12)
+        # В стерео читаются только FL/FR, а они здесь молчат.
+        self.assertIsNone(stereo["timeline"][-1]["sector"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from app_config import DEFAULT_SETTINGS, PROFILE_PRESETS, apply_profile_preset
+from audio_direction import angle_to_sector
+from audio_features import SpectrumAnalyzer
+from audio_tdoa import TdoaEstimator, combine_direction, rear_with_hysteresis
+from radar_engine import RadarEngine
+
+
+def delayed_noise(delay_samples, block_size=512, blocks=1, gain_l=1.0, gain_r=1.0, seed=3):
+    # Правый канал - тот же шум, что и левый, сдвинутый на delay_samples (положительный - позже).
+    rng = np.random.default_rng(seed)
+    pad = 64
+    source = rng.standard_normal(block_size * blocks + 2 * pad) * 0.1
+    left = source[pad:pad + block_size * blocks]
+    right = source[pad - delay_samples:pad - delay_samples + block_size * blocks]
+    data = np.stack([left * gain_l, right * gain_r], axis=1).astype(np.float32)
+    return data.reshape(blocks, block_size, 2)
+
+
+def estimate(data):
+    spectrum = SpectrumAnalyzer(len(data))
+    spectrum.analyze_stereo(data)
+    return TdoaEstimator(len(data)).estimate(spectrum.channel_spectra[0], spectrum.channel_spectra[1])
+
+
+class TdoaEstimatorTests(unittest.TestCase):
+    def test_recovers_synthetic_delays(self):
+        for delay_samples in (-30, -12, -3, 0, 4, 17, 35):
+            delay, strength = estimate(delayed_noise(delay_samples)[0])
+            self.assertAlmostEqual(delay * 48000, delay_samples, delta=0.5)
+            self.assertGreater(strength, 0.5)
+
+    def test_delay_balance_points_to_first_channel(self):
+        tdoa = TdoaEstimator()
+        left_first = tdoa.delay_balance(20 / 48000)
+        right_first = tdoa.delay_balance(-20 / 48000)
+        self.assertLess(left_first, 0)
+        self.assertGreater(right_first, 0)
+        self.assertEqual(tdoa.delay_balance(1.0), -1.0)
+
+    def test_uncorrelated_channels_have_weak_peak(self):
+        rng = np.random.default_rng(5)
+        data = rng.standard_normal((512, 2)).astype(np.float32)
+        _, strength = estimate(data)
+        self.assertLess(strength, 0.3)
+
+    def test_stereo_spectrum_matches_mono_analysis(self):
+        data = delayed_noise(7)[0]
+        mono = SpectrumAnalyzer(512)
+        stereo = SpectrumAnalyzer(512)
+        np.testing.assert_allclose(stereo.analyze_stereo(data), mono.analyze(data), rtol=1e-5, atol=1e-5)
+        self.assertAlmostEqual(stereo.centroid(), mono.centroid(), places=2)
+
+    def test_agreeing_cues_raise_confidence(self):
+        agree_balance, agree = combine_direction(0.8, 1.0, 0.9)
+        _, disagree = combine_direction(0.8, -1.0, 0.9)
+        self.assertGreater(agree, disagree)
+        self.assertGreater(agree_balance, 0.8)
+        self.assertEqual(combine_direction(0.3, -1.0, 0.0)[0], 0.3)
+
+    def test_rear_decision_has_hysteresis(self):
+        self.assertTrue(rear_with_hysteresis(900, 1200, was_back=False))
+        self.assertFalse(rear_with_hysteresis(1500, 1200, was_back=True))
+        self.assertTrue(rear_with_hysteresis(1250, 1200, was_back=True))
+        self.assertFalse(rear_with_hysteresis(1150, 1200, was_back=False))
+
+    def test_engine_uses_delay_when_levels_are_equal(self):
+        engine = RadarEngine({"direction_method": "gcc_phat"})
+        frame = None
+        for block in delayed_noise(30, blocks=8):
+            frame = engine.process(block)
+        self.assertIsNotNone(frame["delay"])
+        self.assertGreater(frame["delay"], 0)
+        self.assertIn(angle_to_sector(frame["angle"]), range(9, 16))
+
+        balance_only = RadarEngine()
+        for block in delayed_noise(30, blocks=8):
+            frame = balance_only.process(block)
+        self.assertIsNone(frame["delay"])
+        self.assertEqual(angle_to_sector(frame["angle"]), 0)
+
+    def test_presets_set_direction_method(self):
+        for name, preset in PROFILE_PRESETS.items():
+            if name == "Custom":
+                continue
+            self.assertIn("direction_method", preset)
+        settings = DEFAULT_SETTINGS.copy()
+        apply_profile_preset(settings, "CS2 / footsteps")
+        self.assertEqual(settings["direction_method"], "gcc_phat")
+        apply_profile_preset(settings, "Desktop test")
+        self.assertEqual(settings["direction_method"], "balance")
+
+
+if __name__ == "__main__":
+    unittest.main()
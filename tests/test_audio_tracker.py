@@ -0,0 +1,131 @@
+import os
+import sys
+import tracemalloc
+import unittest
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from app_config import DEFAULT_SETTINGS, PROFILE_PRESETS, apply_profile_preset
+from audio_direction import angle_to_sector
+from audio_features import SpectrumAnalyzer
+from audio_tracker import SourceTracker, tracks_to_sectors
+from radar_engine import RadarEngine
+
+
+def band_noise(low, high, frames, seed):
+    rng = np.random.default_rng(seed)
+    sos = signal.butter(4, [low, high], btype="band", fs=48000, output="sos")
+    return signal.sosfilt(sos, rng.standard_normal(frames)) * 0.3
+
+
+def pan(mono, value):
+    return np.stack([mono * np.sqrt((1.0 - value) / 2.0), mono * np.sqrt((1.0 + value) / 2.0)], axis=1)
+
+
+def crossfire(frames=48000):
+    # Глухие шаги слева и резкий звук справа в одно время.
+    left = pan(band_noise(300, 800, frames, 1), -0.8)
+    right = pan(band_noise(2500, 6000, frames, 2), 0.8)
+    return (left + right).astype(np.float32)
+
+
+def blocks(data, block_size=512):
+    return [data[i:i + block_size] for i in range(0, len(data) - block_size + 1, block_size)]
+
+
+class SourceTrackerTests(unittest.TestCase):
+    def test_two_opposite_sources_become_two_tracks(self):
+        engine = RadarEngine({"track_sources": 3})
+        for block in blocks(crossfire()):
+            frame = engine.process(block)
+
+        tracks = frame["tracks"]
+        self.assertEqual(len(tracks), 2)
+        sides = sorted(angle_to_sector(track["angle"]) for track in tracks)
+        self.assertIn(sides[0], range(1, 5))
+        self.assertIn(sides[1], range(12, 16))
+        self.assertEqual({track["event"] for track in tracks}, {"STEP", "SHARP"})
+        self.assertGreater(frame["sectors"][sides[0]], 0.15)
+        self.assertGreater(frame["sectors"][sides[1]], 0.15)
+        # Оба источника спереди, задняя полусфера остается пустой.
+        self.assertEqual(frame["sectors"][8], 0.0)
+
+    def test_single_source_mode_blends_directions(self):
+        engine = RadarEngine()
+        for block in blocks(crossfire()):
+            frame = engine.process(block)
+        self.assertEqual(len(frame["tracks"]), 0)
+
+    def test_track_ids_persist_and_tracks_expire(self):
+        engine = RadarEngine({"track_sources": 2})
+        ids = set()
+        for block in blocks(crossfire(24000)):
+            frame = engine.process(block)
+            ids.update(track["id"] for track in frame["tracks"])
+        self.assertEqual(len(ids), 2)
+
+        silence = np.zeros((512, 2), dtype=np.float32)
+        for _ in range(20):
+            frame = engine.process(silence)
+        self.assertEqual(len(frame["tracks"]), 0)
+
+    def test_tracks_to_sectors_takes_maximum(self):
+        sectors = tracks_to_sectors([{"angle": 90.0, "level": 0.8}, {"angle": 270.0, "level": 0.5}], spread=1)
+        self.assertEqual(sectors[4], 0.8)
+        self.assertEqual(sectors[12], 0.5)
+        self.assertEqual(sectors[0], 0.0)
+
+    def test_update_does_not_allocate_arrays(self):
+        spectrum = SpectrumAnalyzer(512)
+        tracker = SourceTracker(spectrum)
+        data = blocks(crossfire(24000))
+        for block in data[:10]:
+            spectrum.analyze_stereo(block)
+            tracker.update(0.8, 1500.0, 0.02)
+
+        peaks = []
+        kept = []
+        tracemalloc.start()
+        for block in data[10:40]:
+            spectrum.analyze_stereo(block)
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            tracks = tracker.update(0.8, 1500.0, 0.02)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            kept.append(current - before)
+        tracemalloc.stop()
+        self.assertEqual(len(tracks), 2)
+        # На блок временно создается только гистограмма bincount (~1 KB), и после update ничего не остается.
+        self.assertLess(sorted(peaks)[len(peaks) // 2], 1536)
+        self.assertEqual(sorted(kept)[len(kept) // 2], 0)
+
+    def test_reset_clears_track_state(self):
+        spectrum = SpectrumAnalyzer(512)
+        tracker = SourceTracker(spectrum)
+        for block in blocks(crossfire(12000)):
+            spectrum.analyze_stereo(block)
+            tracker.update(0.8, 1500.0, 0.02)
+        tracker.reset()
+        self.assertEqual(len(tracker.tracks()), 0)
+        self.assertFalse(tracker.balance.any())
+        self.assertFalse(tracker.age.any())
+        self.assertTrue(np.isnan(tracker.angle).all())
+
+    def test_presets_set_track_sources(self):
+        for name, preset in PROFILE_PRESETS.items():
+            if name == "Custom":
+                continue
+            self.assertIn("track_sources", preset)
+        settings = DEFAULT_SETTINGS.copy()
+        apply_profile_preset(settings, "Tarkov / tactical")
+        self.assertEqual(settings["track_sources"], 3)
+        apply_profile_preset(settings, "Arena Breakout")
+        self.assertEqual(settings["track_sources"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench"))
+
+from bench_pipeline import find_regressions, run_case
+
+
+class BenchPipelineTests(unittest.TestCase):
+    def test_run_case_reports_latency_and_throughput(self):
+        result = run_case("footsteps", 512, seconds=0.5)
+        self.assertEqual(result["blocks"], 46)
+        self.assertGreater(result["blocks_per_second"], 0)
+        self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertAlmostEqual(result["budget_ms"], 512 / 48000 * 1000)
+
+    def test_regression_only_beyond_margin(self):
+        baseline = {"silence/512": {"p50_ms": 0.1}, "gunshots/512": {"p50_ms": 0.2}}
+        results = {
+            "silence/512": {"p50_ms": 0.12},
+            "gunshots/512": {"p50_ms": 0.3},
+            "pink_noise/512": {"p50_ms": 5.0},
+        }
+        regressions = find_regressions(results, baseline, margin=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("gunshots/512"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import sys
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from audio_capture import CaptureStream, SyntheticBackend
+from capture_supervisor import CaptureSupervisor, find_audio_source
+from radar_engine import RadarEngine
+
+SOURCES = [
+    {"label": "OUTPUT LOOPBACK | Speakers", "name": "Speakers", "kind": "loopback"},
+    {"label": "MIC INPUT       | Speakers", "name": "Speakers", "kind": "microphone"},
+    {"label": "OUTPUT LOOPBACK | USB Headset", "name": "USB Headset", "kind": "loopback"},
+]
+
+
+class FlakyDevice:
+    # Устройство отдает blocks_per_session блоков и «отключается»; следующие missing открытий его нет в системе.
+    def __init__(self, blocks_per_session=5, missing=2):
+        self.blocks_per_session = blocks_per_session
+        self.missing = missing
+        self.sessions = 0
+        self.counter = 0
+
+    def resolve(self):
+        if self.sessions and self.missing:
+            self.missing -= 1
+            raise LookupError("Audio device not found: USB Headset")
+        return SOURCES[2]
+
+    def open_stream(self, source):
+        self.sessions += 1
+
+        def generate(out, index):
+            if index >= self.blocks_per_session:
+                raise OSError("device unplugged")
+            out.fill(self.counter)
+            self.counter += 1
+
+        return CaptureStream(SyntheticBackend(generate, block_size=64))
+
+
+class FindAudioSourceTests(unittest.TestCase):
+    def test_matches_name_and_kind(self):
+        self.assertIs(find_audio_source({"name": "Speakers", "kind": "microphone"}, SOURCES), SOURCES[1])
+        self.assertIs(find_audio_source({"name": "usb headset", "kind": "loopback"}, SOURCES), SOURCES[2])
+
+    def test_missing_device_raises_and_files_pass_through(self):
+        with self.assertRaises(LookupError):
+            find_audio_source({"name": "USB Headset", "kind": "microphone"}, SOURCES)
+        replay = {"name": "recordings/take.wav", "kind": "file"}
+        self.assertIs(find_audio_source(replay, []), replay)
+        self.assertIsNone(find_audio_source(None, []))
+
+
+class CaptureSupervisorTests(unittest.TestCase):
+    def test_reconnects_with_backoff_and_measures_recovery(self):
+        device = FlakyDevice()
+        statuses = []
+        supervisor = CaptureSupervisor(
+            device.open_stream, device.resolve, start_delay=0.001, max_delay=0.004,
+            on_status=lambda status, message: statuses.append((status, round(supervisor.delay, 3))),
+        )
+        values = []
+        for data in supervisor.blocks():
+            values.append(int(data[0, 0]))
+            if len(values) == 12:
+                supervisor.stop()
+
+        # Блоки идут без пропусков через два переподключения.
+        self.assertEqual(values, list(range(12)))
+        self.assertEqual(statuses[0], ("RUNNING", 0.001))
+        # Пауза растет 1 -> 2 -> 4 мс, пока устройства нет, и сбрасывается после восстановления.
+        self.assertEqual([delay for status, delay in statuses if status == "RECONNECTING"][:3], [0.001, 0.002, 0.004])
+        stats = supervisor.stats()
+        self.assertEqual(stats["status"], "RUNNING")
+        self.assertEqual(stats["disconnects"], 2)
+        self.assertEqual(stats["recoveries"], 2)
+        self.assertGreater(stats["last_recovery_s"], 0.0)
+        self.assertGreaterEqual(stats["max_recovery_s"], stats["last_recovery_s"])
+
+    def test_silent_device_is_treated_as_lost(self):
+        opened = []
+
+        def open_stream(source):
+            opened.append(source)
+            if len(opened) == 1:
+                return CaptureStream(SyntheticBackend(lambda out, index: threading.Event().wait(0.3), block_size=64))
+            return CaptureStream(SyntheticBackend(lambda out, index: out.fill(1.0), block_size=64))
+
+        supervisor = CaptureSupervisor(open_stream, lambda: None, start_delay=0.001, stall_timeout=0.05)
+        for data in supervisor.blocks():
+            self.assertEqual(float(data[0, 0]), 1.0)
+            supervisor.stop()
+        self.assertEqual(len(opened), 2)
+        self.assertIn("No audio", supervisor.stats()["last_error"])
+
+    def test_consumer_error_restarts_session(self):
+        opened = []
+
+        def open_stream(source):
+            opened.append(source)
+            return CaptureStream(SyntheticBackend(lambda out, index: out.fill(len(opened)), block_size=64))
+
+        statuses = []
+        supervisor = CaptureSupervisor(open_stream, lambda: None, start_delay=0.001,
+                                       on_status=lambda status, message: statuses.append(status))
+        sessions = []
+        for data in supervisor.blocks():
+            sessions.append(int(data[0, 0]))
+            if len(sessions) == 1:
+                # Ошибка анализа блока уходит супервизору, а не обрывает цикл.
+                supervisor.fail(ValueError("bad block"))
+            elif len(sessions) == 3:
+                supervisor.stop()
+        self.assertEqual(sessions, [1, 2, 2])
+        self.assertEqual(statuses, ["RUNNING", "ERROR", "RUNNING"])
+        self.assertEqual(supervisor.stats()["last_error"], "bad block")
+        self.assertEqual(supervisor.stats()["recoveries"], 1)
+
+    def test_stop_interrupts_backoff_wait(self):
+        def open_stream(source):
+            raise OSError("no device")
+
+        supervisor = CaptureSupervisor(open_stream, lambda: None, start_delay=30.0)
+        threading.Timer(0.05, supervisor.stop).start()
+        self.assertEqual(list(supervisor.blocks()), [])
+        self.assertEqual(supervisor.stats()["attempts"], 1)
+
+
+class EngineResumeTests(unittest.TestCase):
+    def test_resume_keeps_noise_estimates_warm(self):
+        engine = RadarEngine({"denoise": True})
+        rng = np.random.default_rng(0)
+        for _ in range(250):
+            engine.process((rng.standard_normal((512, 2)) * 0.001).astype(np.float32))
+        floor = engine.noise.stats()["level"]
+        self.assertTrue(engine.noise.level.ready)
+        self.assertTrue(engine.denoiser.ready)
+
+        engine.resume()
+        self.assertTrue(engine.noise.level.ready)
+        self.assertTrue(engine.denoiser.ready)
+        self.assertEqual(engine.noise.stats()["level"], floor)
+        self.assertIsNone(engine.bandpass.zi)
+
+        engine.reset()
+        self.assertFalse(engine.noise.level.ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from focus_tracker import FakeFocusProvider, FocusTracker, NullFocusProvider
+
+WINDOWS = {1: "EscapeFromTarkov", 2: "Discord", 3: "Razgrom Overlay", 4: ""}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_tracker(active=1, interval=0.25):
+    clock = FakeClock()
+    provider = FakeFocusProvider(WINDOWS, active=active)
+    return FocusTracker("Tarkov", provider=provider, interval=interval, clock=clock), provider, clock
+
+
+class FocusTrackerTests(unittest.TestCase):
+    def test_polls_on_timer_not_per_block(self):
+        tracker, provider, clock = make_tracker()
+        for _ in range(100):
+            self.assertTrue(tracker.check())
+            clock.now += 512 / 48000
+        # ~1.07 с блоков при интервале 0.25 с.
+        self.assertEqual(tracker.refreshes, 5)
+        # Заголовок прочитан один раз, дальше окно игры узнается по handle.
+        self.assertEqual(provider.title_reads, 1)
+        self.assertEqual(tracker.target_handle, 1)
+
+    def test_focus_loss_and_return_flag_changes_once(self):
+        tracker, provider, clock = make_tracker()
+        self.assertTrue(tracker.check())
+        provider.active = 2
+        self.assertTrue(tracker.check())
+        self.assertFalse(tracker.changed)
+
+        clock.now += 0.3
+        self.assertFalse(tracker.check())
+        self.assertTrue(tracker.changed)
+        clock.now += 0.1
+        self.assertFalse(tracker.check())
+        self.assertFalse(tracker.changed)
+
+        provider.active = 1
+        clock.now += 0.3
+        self.assertTrue(tracker.check())
+        self.assertTrue(tracker.changed)
+        self.assertEqual(tracker.stats()["focus_changes"], 2)
+
+    def test_own_and_untitled_windows_keep_focus(self):
+        for active in (3, 4):
+            tracker, _provider, _clock = make_tracker(active=active)
+            self.assertTrue(tracker.check())
+
+    def test_title_read_only_when_foreground_handle_changes(self):
+        tracker, provider, clock = make_tracker(active=2)
+        for _ in range(10):
+            self.assertFalse(tracker.check())
+            clock.now += 0.3
+        self.assertEqual(provider.title_reads, 1)
+        provider.active = 3
+        clock.now += 0.3
+        self.assertTrue(tracker.check())
+        self.assertEqual(provider.title_reads, 2)
+
+    def test_no_target_or_no_window_api_means_always_focused(self):
+        provider = FakeFocusProvider(WINDOWS, active=2)
+        tracker = FocusTracker("", provider=provider)
+        self.assertTrue(tracker.check())
+        self.assertEqual(tracker.refreshes, 0)
+        self.assertTrue(FocusTracker("Tarkov", provider=NullFocusProvider()).check())
+
+    def test_provider_errors_do_not_drop_focus(self):
+        class BrokenProvider:
+            def foreground(self):
+                raise OSError("no desktop")
+
+        self.assertTrue(FocusTracker("Tarkov", provider=BrokenProvider()).check())
+
+
+if __name__ == "__main__":
+    unittest.main()
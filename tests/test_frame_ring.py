@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from app_config import BLOCK_SIZE, MIN_IDLE_FPS, SAMPLE_RATE
+from frame_ring import FrameRing
+from radar_engine import empty_frame
+
+
+def frame_with(value, event="SOUND"):
+    frame = empty_frame(event)
+    frame["sectors"] = [value] * 16
+    frame["peak"] = value
+    frame["level"] = value
+    frame["angle"] = 90.0
+    return frame
+
+
+class FrameRingTests(unittest.TestCase):
+    def test_slowest_idle_frame_does_not_overrun(self):
+        # Блоки за один кадр GUI при idle_fps на минимуме: транзиент в самом начале тишины доходит до GUI.
+        ring = FrameRing()
+        blocks = int(np.ceil(SAMPLE_RATE / BLOCK_SIZE / MIN_IDLE_FPS))
+        ring.publish(frame_with(0.8, "STEP"))
+        for _ in range(blocks - 1):
+            ring.publish(empty_frame())
+        sectors = np.zeros(16)
+        frame = ring.consume(sectors)
+        self.assertEqual(frame["event"], "IDLE")
+        self.assertEqual(float(sectors.max()), 0.8)
+        self.assertEqual(ring.stats()["dropped"], 0)
+
+    def test_sound_sets_wake_until_consumed(self):
+        ring = FrameRing()
+        ring.publish(empty_frame())
+        self.assertFalse(ring.wake_pending())
+        ring.publish(frame_with(0.5, "STEP"))
+        ring.publish(empty_frame())
+        self.assertTrue(ring.wake_pending())
+        ring.consume(np.zeros(16))
+        self.assertFalse(ring.wake_pending())
+
+    def test_empty_ring_returns_none(self):
+        ring = FrameRing()
+        self.assertIsNone(ring.consume(np.zeros(16)))
+
+    def test_latest_scalars_and_max_merged_sectors(self):
+        ring = FrameRing()
+        first = frame_with(0.9, "IMPACT")
+        second = frame_with(0.2, "SOUND")
+        second["sectors"] = [0.0] * 16
+        second["sectors"][4] = 0.2
+        second["noise_floor"] = 0.04
+        ring.publish(first)
+        ring.publish(second)
+
+        sectors = np.zeros(16)
+        latest = ring.consume(sectors)
+        self.assertEqual(latest["event"], "SOUND")
+        self.assertEqual(latest["peak"], 0.2)
+        self.assertEqual(latest["angle"], 90.0)
+        self.assertEqual(latest["noise_floor"], 0.04)
+        self.assertEqual(sectors.tolist(), [0.9] * 16)
+        self.assertEqual(ring.stats()["coalesced"], 1)
+        self.assertIsNone(ring.consume(sectors))
+
+    def test_overrun_counts_dropped_frames(self):
+        ring = FrameRing(capacity=4)
+        for index in range(10):
+            ring.publish(frame_with(index / 10))
+        latest = ring.consume(np.zeros(16))
+        self.assertAlmostEqual(latest["peak"], 0.9)
+        self.assertEqual(ring.stats(), {"published": 10, "dropped": 6, "coalesced": 3})
+
+    def test_slot_being_written_is_skipped(self):
+        ring = FrameRing()
+        ring.publish(frame_with(0.5))
+        ring.slot_seq[0] = -1
+        self.assertIsNone(ring.consume(np.zeros(16)))
+        self.assertEqual(ring.dropped, 1)
+
+    def test_concurrent_reader_never_sees_torn_frames(self):
+        ring = FrameRing(capacity=4)
+        done = threading.Event()
+
+        def producer():
+            for index in range(20000):
+                ring.publish(frame_with(float(index)))
+            done.set()
+
+        thread = threading.Thread(target=producer)
+        thread.start()
+        last_seq = -1
+        while not done.is_set() or ring.read_seq < ring.write_seq:
+            sectors = np.zeros(16)
+            latest = ring.consume(sectors)
+            if latest is None:
+                continue
+            self.assertEqual(len(set(sectors.tolist())), 1)
+            self.assertGreater(latest["seq"], last_seq)
+            last_seq = latest["seq"]
+        thread.join()
+        self.assertEqual(last_seq, 19999)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from frame_scheduler import FrameScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_frame(scheduler, clock, active, render_time=0.0, wake_at=None):
+    # Кадр и проверки wait() до следующего кадра, как в RadarOverlay.tick; возвращает паузу до кадра в мс.
+    scheduler.begin_frame()
+    clock.now += render_time
+    delay = scheduler.end_frame(active)
+    waited = 0
+    while delay:
+        clock.now += delay / 1000.0
+        waited += delay
+        delay = scheduler.wait(wake_at is not None and waited >= wake_at)
+    return waited
+
+
+class FrameSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = FrameScheduler(active_fps=50, idle_fps=5, idle_after=0.5, clock=self.clock)
+
+    def test_idle_overlay_uses_low_rate(self):
+        delays = [run_frame(self.scheduler, self.clock, active=False) for _ in range(5)]
+        self.assertEqual(delays, [200] * 5)
+        self.assertTrue(self.scheduler.stats()["idle"])
+
+    def test_activity_switches_to_high_rate(self):
+        run_frame(self.scheduler, self.clock, active=False)
+        self.assertEqual(run_frame(self.scheduler, self.clock, active=True), 20)
+        self.assertFalse(self.scheduler.is_idle)
+
+    def test_stays_fast_until_idle_timeout(self):
+        run_frame(self.scheduler, self.clock, active=True)
+        delays = [run_frame(self.scheduler, self.clock, active=False) for _ in range(30)]
+        self.assertEqual(delays[0], 20)
+        self.assertEqual(delays[-1], 200)
+
+    def test_render_time_is_compensated(self):
+        delays = [run_frame(self.scheduler, self.clock, active=True, render_time=0.006) for _ in range(50)]
+        self.assertEqual(delays[-1], 14)
+        self.assertAlmostEqual(self.scheduler.stats()["fps"], 50.0, delta=0.5)
+        self.assertAlmostEqual(self.scheduler.stats()["frame_time_ms"], 6.0, delta=0.01)
+
+    def test_falling_far_behind_restarts_schedule(self):
+        run_frame(self.scheduler, self.clock, active=True)
+        delay = run_frame(self.scheduler, self.clock, active=True, render_time=0.1)
+        self.assertEqual(delay, 20)
+
+    def test_sound_wakes_idle_overlay_within_one_active_frame(self):
+        for _ in range(3):
+            run_frame(self.scheduler, self.clock, active=False)
+        # Звук пришел через 5 мс после редкого кадра: следующий кадр не ждет 200 мс.
+        delay = run_frame(self.scheduler, self.clock, active=False, wake_at=5)
+        self.assertLessEqual(delay, 20)
+        self.assertEqual(self.scheduler.stats()["wakeups"], 1)
+        self.assertEqual(run_frame(self.scheduler, self.clock, active=True), 20)
+        self.assertFalse(self.scheduler.is_idle)
+
+    def test_wake_does_not_shorten_active_frames(self):
+        run_frame(self.scheduler, self.clock, active=True)
+        self.assertEqual(run_frame(self.scheduler, self.clock, active=True, wake_at=0), 20)
+        self.assertEqual(self.scheduler.stats()["wakeups"], 0)
+
+    def test_idle_rate_never_exceeds_active_rate(self):
+        scheduler = FrameScheduler(active_fps=20, idle_fps=60, clock=self.clock)
+        self.assertEqual(scheduler.idle_interval, scheduler.active_interval)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from app_config import DEFAULT_SETTINGS, MOVE_KEYS, apply_profile_preset, apply_saved_settings, parse_move_keys
+from input_state import KeyboardModuleBackend, MovementState, StubInputBackend, virtual_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_state(**kwargs):
+    clock = FakeClock()
+    backend = StubInputBackend()
+    return MovementState(backend, clock=clock, **kwargs), backend, clock
+
+
+class MovementStateTests(unittest.TestCase):
+    def step(self, state, clock, seconds, polls):
+        for _ in range(polls):
+            clock.now += seconds / polls
+            state.poll()
+
+    def test_press_is_debounced_and_since_marks_first_press(self):
+        state, backend, clock = make_state(press_debounce=0.02)
+        backend.held = True
+        state.poll()
+        self.assertFalse(state.moving)
+        self.step(state, clock, 0.03, 3)
+        moving, since = state.snapshot()
+        self.assertTrue(moving)
+        self.assertEqual(since, 100.0)
+
+    def test_short_tap_is_ignored(self):
+        state, backend, clock = make_state(press_debounce=0.05)
+        backend.held = True
+        self.step(state, clock, 0.02, 2)
+        backend.held = False
+        self.step(state, clock, 0.1, 10)
+        self.assertFalse(state.moving)
+
+    def test_release_holds_moving_until_debounce(self):
+        state, backend, clock = make_state(press_debounce=0.0, release_debounce=0.25)
+        backend.held = True
+        state.poll()
+        self.assertTrue(state.moving)
+        backend.held = False
+        self.step(state, clock, 0.2, 20)
+        self.assertTrue(state.moving)
+        # Короткая пауза между нажатиями не сбрасывает движение.
+        backend.held = True
+        state.poll()
+        backend.held = False
+        self.step(state, clock, 0.2, 20)
+        self.assertTrue(state.moving)
+        self.step(state, clock, 0.1, 10)
+        moving, since = state.snapshot()
+        self.assertFalse(moving)
+        self.assertLess(since, clock.now)
+
+    def test_backend_errors_count_as_not_pressed(self):
+        class BrokenBackend:
+            def pressed(self):
+                raise OSError("no input access")
+
+        state = MovementState(BrokenBackend())
+        state.poll()
+        self.assertFalse(state.moving)
+        self.assertEqual(state.stats()["errors"], 1)
+
+    def test_thread_publishes_state(self):
+        backend = StubInputBackend(held=True)
+        state = MovementState(backend, interval=0.001, press_debounce=0.0).start()
+        try:
+            deadline = time.monotonic() + 2.0
+            while not state.moving and time.monotonic() < deadline:
+                time.sleep(0.005)
+            self.assertTrue(state.moving)
+        finally:
+            state.stop()
+        self.assertIsNone(state.thread)
+
+
+class BackendTests(unittest.TestCase):
+    def test_keyboard_module_backend_uses_configured_keys(self):
+        class FakeKeyboard:
+            held = {"space"}
+
+            def is_pressed(self, key):
+                return key in self.held
+
+        self.assertTrue(KeyboardModuleBackend(["w", "space"], keyboard_module=FakeKeyboard()).pressed())
+        self.assertFalse(KeyboardModuleBackend(["w", "a"], keyboard_module=FakeKeyboard()).pressed())
+
+    def test_virtual_key_codes(self):
+        self.assertEqual(virtual_key("w"), 0x57)
+        self.assertEqual(virtual_key("D"), 0x44)
+        self.assertEqual(virtual_key("space"), 0x20)
+        self.assertIsNone(virtual_key("mouse4"))
+
+
+class MoveKeysSettingTests(unittest.TestCase):
+    def test_parse_move_keys(self):
+        self.assertEqual(parse_move_keys("W, a s d space"), ["w", "a", "s", "d", "space"])
+        self.assertEqual(parse_move_keys([]), [])
+        self.assertEqual(parse_move_keys(42), list(MOVE_KEYS))
+
+    def test_profile_and_saved_config(self):
+        settings = DEFAULT_SETTINGS.copy()
+        self.assertEqual(settings["move_keys"], list(MOVE_KEYS))
+        apply_profile_preset(settings, "Arena Breakout")
+        self.assertIn("ctrl", settings["move_keys"])
+        apply_saved_settings(settings, {"move_keys": "up down left right"})
+        self.assertEqual(settings["move_keys"], ["up", "down", "left", "right"])
+
+
+if __name__ == "__main__":
+    unittest.main()
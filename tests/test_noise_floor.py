@@ -0,0 +1,117 @@
+import os
+import sys
+import tracemalloc
+import unittest
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from app_config import DEFAULT_SETTINGS, apply_saved_settings, build_saved_config
+from noise_floor import MINIMUM_BIAS, MinimumStatistics, NoiseFloorTracker
+from radar_engine import RadarEngine
+
+
+def band_noise(frames, low, high, gain, seed):
+    rng = np.random.default_rng(seed)
+    sos = signal.butter(4, [low, high], btype="band", fs=48000, output="sos")
+    return signal.sosfilt(sos, rng.standard_normal(frames)) * gain
+
+
+def run_engine(settings, data):
+    engine = RadarEngine(settings)
+    return [engine.process(data[start:start + 512]) for start in range(0, len(data) - 512 + 1, 512)]
+
+
+class MinimumStatisticsTests(unittest.TestCase):
+    def test_follows_ambience_up_and_down(self):
+        tracker = MinimumStatistics(window_blocks=80, subwindows=8)
+        for _ in range(200):
+            tracker.update(0.1)
+        self.assertAlmostEqual(float(tracker.floor[0]), 0.1 * MINIMUM_BIAS, places=6)
+        for _ in range(200):
+            tracker.update(0.3)
+        self.assertAlmostEqual(float(tracker.floor[0]), 0.3 * MINIMUM_BIAS, places=6)
+        # Вниз оценка падает сразу, не дожидаясь конца окна.
+        for _ in range(10):
+            tracker.update(0.05)
+        self.assertLess(float(tracker.floor[0]), 0.1)
+
+    def test_short_bursts_do_not_lift_the_floor(self):
+        tracker = MinimumStatistics(window_blocks=80, subwindows=8)
+        for index in range(400):
+            tracker.update(0.9 if index % 25 < 3 else 0.1)
+        self.assertAlmostEqual(float(tracker.floor[0]), 0.1 * MINIMUM_BIAS, delta=0.002)
+
+    def test_ready_only_after_full_window(self):
+        tracker = MinimumStatistics(window_blocks=80, subwindows=8)
+        for _ in range(79):
+            tracker.update(0.2)
+        self.assertFalse(tracker.ready)
+        tracker.update(0.2)
+        self.assertTrue(tracker.ready)
+
+    def test_update_has_fixed_cost(self):
+        tracker = NoiseFloorTracker(("low", "step", "crack"))
+        energies = np.array([1.0, 2.0, 3.0])
+        for _ in range(300):
+            tracker.update_level(0.2)
+            tracker.update_bands(energies)
+        peaks = []
+        tracemalloc.start()
+        for _ in range(200):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            tracker.update_level(0.2)
+            tracker.update_bands(energies)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+        # Только временные скаляры numpy, без буферов, растущих с окном.
+        self.assertLess(sorted(peaks)[len(peaks) // 2], 2048)
+        self.assertEqual(tracker.level.minima.shape, (8, 1))
+
+
+class EngineNoiseFloorTests(unittest.TestCase):
+    def setUp(self):
+        frames = 48000 * 4
+        ambience = band_noise(frames, 300, 3000, 0.0004, seed=3)
+        self.ambience = np.stack([ambience, ambience * 0.5], axis=1).astype(np.float32)
+        self.with_step = self.ambience.copy()
+        self.with_step[frames - 4096:frames - 4096 + 2400, 0] += band_noise(2400, 500, 1500, 0.004, seed=5)
+
+    def test_steady_ambience_is_gated_after_warmup(self):
+        adaptive = run_engine({"adaptive_noise_floor": True}, self.ambience)
+        fixed = run_engine({"adaptive_noise_floor": False}, self.ambience)
+        self.assertEqual(adaptive[-1]["event"], "IDLE")
+        self.assertEqual(max(adaptive[-1]["sectors"]), 0.0)
+        self.assertGreater(adaptive[-1]["noise_floor"], adaptive[-1]["level"])
+        self.assertEqual(fixed[-1]["noise_floor"], DEFAULT_SETTINGS["noise_floor"])
+        self.assertGreater(max(fixed[-1]["sectors"]), 0.0)
+        # До заполнения окна порог остается ручным.
+        self.assertEqual(adaptive[10]["noise_floor"], DEFAULT_SETTINGS["noise_floor"])
+
+    def test_step_over_ambience_still_detected(self):
+        frames = run_engine({"adaptive_noise_floor": True}, self.with_step)
+        events = [frame["event"] for frame in frames[-9:]]
+        self.assertIn("STEP", events)
+        self.assertGreater(max(max(frame["sectors"]) for frame in frames[-9:]), 0.5)
+        self.assertEqual(events[-1], "IDLE")
+
+    def test_constant_hum_is_removed_from_its_band(self):
+        frames = 48000 * 3
+        hum = 0.05 * np.sin(2 * np.pi * 140.625 * np.arange(frames) / 48000)
+        data = np.stack([hum, hum], axis=1) + self.with_step[-frames:]
+        adaptive = run_engine({"adaptive_noise_floor": True}, data)
+        fixed = run_engine({"adaptive_noise_floor": False}, data)
+        self.assertLess(adaptive[-1]["bands"]["low"], 0.1 * fixed[-1]["bands"]["low"])
+
+    def test_setting_round_trip(self):
+        settings = DEFAULT_SETTINGS.copy()
+        apply_saved_settings(settings, {"adaptive_noise_floor": False})
+        self.assertFalse(settings["adaptive_noise_floor"])
+        self.assertFalse(build_saved_config(settings, "", None)["adaptive_noise_floor"])
+
+
+if __name__ == "__main__":
+    unittest.main()
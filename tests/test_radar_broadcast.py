@@ -0,0 +1,133 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Overlay"))
+sys.path.insert(0, os.path.join(ROOT, "web"))
+
+from audio_direction import NUM_SECTORS
+from radar_broadcast import DELTA, KEYFRAME, RadarBroadcaster, decode_frame, quantize_sectors
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RadarBroadcastTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sent = []
+        self.broadcaster = RadarBroadcaster(
+            lambda client, payload: self.sent.append((client, payload)),
+            num_sectors=8, max_rate=20.0, keyframe_interval=2.0, clock=self.clock
+        )
+        self.broadcaster.add_client("phone")
+
+    def publish(self, sectors, **kwargs):
+        self.broadcaster.publish(sectors, timestamp=1.0, **kwargs)
+        self.clock.now += 0.05
+
+    def test_quantize_clips_to_bytes(self):
+        self.assertEqual(quantize_sectors([-1.0, 0.0, 0.5, 1.0, 3.0]).tolist(), [0, 0, 128, 255, 255])
+
+    def test_first_frame_is_keyframe_then_silence_sends_nothing(self):
+        for _ in range(10):
+            self.publish([0.0] * 8)
+        self.assertEqual(len(self.sent), 1)
+        state = bytearray(8)
+        self.assertEqual(decode_frame(self.sent[0][1], state)["kind"], KEYFRAME)
+
+    def test_delta_carries_only_changed_sectors(self):
+        self.publish([0.0] * 8)
+        self.publish([0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0], event="STEP", is_loud=True, confidence=0.5)
+        state = bytearray(8)
+        decode_frame(self.sent[0][1], state)
+        frame = decode_frame(self.sent[1][1], state)
+        self.assertEqual(frame["kind"], DELTA)
+        self.assertEqual(frame["event"], "STEP")
+        self.assertTrue(frame["is_loud"])
+        self.assertEqual(list(state), [0, 0, 255, 0, 0, 0, 0, 0])
+        self.assertLess(len(self.sent[1][1]), len(self.sent[0][1]))
+
+    def test_periodic_keyframe(self):
+        for _ in range(90):
+            self.publish([0.0] * 8)
+        kinds = [decode_frame(payload, bytearray(8))["kind"] for _, payload in self.sent]
+        self.assertEqual(kinds, [KEYFRAME, KEYFRAME, KEYFRAME])
+
+    def test_rate_cap_per_client(self):
+        for index in range(20):
+            self.broadcaster.publish([index / 20] * 8, timestamp=1.0)
+            self.clock.now += 0.01
+        self.assertEqual(len(self.sent), 4)
+
+    def test_client_catches_up_after_rate_limited_frames(self):
+        state = bytearray(8)
+        for index in range(20):
+            self.broadcaster.publish([index / 19] * 8, timestamp=1.0)
+            self.clock.now += 0.01
+        self.clock.now += 0.1
+        self.broadcaster.publish([1.0] * 8, timestamp=1.0)
+        for _, payload in self.sent:
+            decode_frame(payload, state)
+        self.assertEqual(list(state), [255] * 8)
+
+    def test_rate_limited_transient_reaches_client(self):
+        # Настоящий темп: блоки по 512 сэмплов (~94 в секунду) при ограничении 30 кадров в секунду.
+        broadcaster = RadarBroadcaster(
+            lambda client, payload: self.sent.append((client, payload)), num_sectors=8, max_rate=30.0, clock=self.clock
+        )
+        broadcaster.add_client("tablet")
+        self.sent.clear()
+        for index in range(10):
+            spike = index == 1
+            sectors = [0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0] if spike else [0.0] * 8
+            broadcaster.publish(sectors, event="STEP" if spike else "IDLE", is_loud=spike, timestamp=1.0)
+            self.clock.now += 512 / 48000
+        state = bytearray(8)
+        frames = []
+        for _, payload in self.sent:
+            frames.append((decode_frame(payload, state), list(state)))
+        self.assertLess(len(frames), 10)
+        frame, sectors = frames[1]
+        self.assertEqual(sectors, [0, 0, 255, 0, 0, 0, 0, 0])
+        self.assertEqual(frame["event"], "STEP")
+        self.assertTrue(frame["is_loud"])
+        # После отправки накопленное сбрасывается: следующая отправка снова темная.
+        self.assertEqual(frames[2][1], [0] * 8)
+
+    def test_stats_and_client_removal(self):
+        self.broadcaster.add_client("tablet")
+        for _ in range(25):
+            self.publish([0.5] * 8)
+        stats = self.broadcaster.stats()
+        self.assertEqual(stats["clients"], 2)
+        self.assertEqual(stats["frames_sent"], 2)
+        self.assertGreater(stats["bytes_per_second"], 0)
+
+        self.broadcaster.remove_client("tablet")
+        self.assertEqual(self.broadcaster.stats()["clients"], 1)
+
+    def test_default_sectors_and_mask_limit(self):
+        sent = []
+        broadcaster = RadarBroadcaster(lambda client, payload: sent.append(payload), clock=self.clock)
+        broadcaster.add_client(1)
+        # Изменение в последнем, 16-м секторе проходит через маску дельты.
+        for level in (1.0, 0.0, 1.0):
+            broadcaster.publish([0.0] * (NUM_SECTORS - 1) + [level])
+            self.clock.now += 0.1
+        state = bytearray(NUM_SECTORS)
+        kinds = [decode_frame(payload, state)["kind"] for payload in sent]
+        self.assertEqual(kinds, [KEYFRAME, DELTA, DELTA])
+        self.assertEqual(state[-1], 255)
+        with self.assertRaises(ValueError):
+            RadarBroadcaster(lambda client, payload: None, num_sectors=17)
+
+
+if __name__ == "__main__":
+    unittest.main()
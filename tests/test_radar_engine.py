@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from audio_direction import angle_to_sector
+from radar_engine import RadarEngine
+
+
+def tone_block(left_gain, right_gain, freq=900, block_size=512, sample_rate=48000, offset=0):
+    t = (np.arange(block_size) + offset) / sample_rate
+    tone = 0.1 * np.sin(2 * np.pi * freq * t)
+    return np.stack([tone * left_gain, tone * right_gain], axis=1).astype(np.float32)
+
+
+def run_blocks(engine, left_gain, right_gain, count=8):
+    frame = None
+    for i in range(count):
+        frame = engine.process(tone_block(left_gain, right_gain, offset=i * 512))
+    return frame
+
+
+class RadarEngineTests(unittest.TestCase):
+    def test_silence_is_idle(self):
+        engine = RadarEngine()
+        frame = engine.process(np.zeros((512, 2), dtype=np.float32))
+        self.assertEqual(frame["event"], "IDLE")
+        self.assertEqual(max(frame["sectors"]), 0.0)
+        self.assertIsNone(frame["angle"])
+
+    def test_right_channel_maps_to_right_sector(self):
+        frame = run_blocks(RadarEngine(), 0.0, 1.0)
+        self.assertEqual(angle_to_sector(frame["angle"]), 4)
+        self.assertEqual(frame["sectors"].index(max(frame["sectors"])), 4)
+        self.assertGreater(frame["peak"], 0.5)
+
+    def test_left_channel_maps_to_left_sector(self):
+        frame = run_blocks(RadarEngine(), 1.0, 0.0)
+        self.assertEqual(angle_to_sector(frame["angle"]), 12)
+
+    def test_swap_channels_setting_is_read_live(self):
+        settings = {"swap_channels": True}
+        frame = run_blocks(RadarEngine(settings), 0.0, 1.0)
+        self.assertEqual(angle_to_sector(frame["angle"]), 12)
+
+    def test_engines_do_not_share_state(self):
+        left = RadarEngine()
+        right = RadarEngine()
+        run_blocks(left, 1.0, 0.0)
+        frame = run_blocks(right, 0.0, 1.0)
+        self.assertEqual(angle_to_sector(frame["angle"]), 4)
+
+    def test_tracker_mode_respects_noise_gate(self):
+        # Два тихих источника ниже ручного порога: с трекером радар так же темный, как без него.
+        for track_sources in (1, 3):
+            engine = RadarEngine({"track_sources": track_sources, "noise_floor": 0.3, "adaptive_noise_floor": False})
+            for i in range(20):
+                block = tone_block(4e-4, 0.0, freq=700, offset=i * 512) + tone_block(0.0, 4e-4, freq=1300, offset=i * 512)
+                frame = engine.process(block)
+            self.assertGreater(frame["level"], 0.05)
+            self.assertLess(frame["level"], 0.3)
+            self.assertEqual(len(frame["tracks"]), 0)
+            self.assertEqual(max(frame["sectors"]), 0.0)
+
+    def test_reset_clears_direction(self):
+        engine = RadarEngine()
+        run_blocks(engine, 1.0, 0.0)
+        engine.reset()
+        self.assertIsNone(engine.smoothed_angle)
+        self.assertEqual(engine.previous_level, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Overlay"))
+sys.path.insert(0, os.path.join(ROOT, "web"))
+
+from radar_pipeline import LatestFrameQueue, PipelineStats, merge_frames
+
+
+def frame(sectors, captured_at=0.0, event="SOUND"):
+    return {"sectors": sectors, "event": event, "captured_at": captured_at}
+
+
+class LatestFrameQueueTests(unittest.TestCase):
+    def test_put_never_blocks_and_counts_dropped(self):
+        queue = LatestFrameQueue(maxsize=3)
+        for index in range(10):
+            queue.put(frame([index], captured_at=index))
+        frames = queue.drain()
+        self.assertEqual([item["captured_at"] for item in frames], [7, 8, 9])
+        self.assertEqual(queue.dropped, 7)
+        self.assertEqual(queue.coalesced, 2)
+
+    def test_drain_times_out_when_empty(self):
+        self.assertEqual(LatestFrameQueue().drain(timeout=0.01), [])
+
+    def test_drain_wakes_on_put(self):
+        queue = LatestFrameQueue()
+        timer = threading.Timer(0.05, lambda: queue.put(frame([1.0])))
+        timer.start()
+        frames = queue.drain(timeout=2.0)
+        timer.join()
+        self.assertEqual(len(frames), 1)
+
+    def test_merge_keeps_transient_peaks(self):
+        merged = merge_frames([
+            frame([0.0, 0.9], captured_at=1.0, event="STEP"),
+            frame([0.2, 0.0], captured_at=2.0, event="IDLE"),
+        ])
+        self.assertEqual(merged["sectors"], [0.2, 0.9])
+        # Шаг из середины пачки не затирается последним IDLE.
+        self.assertEqual(merged["event"], "STEP")
+        self.assertEqual(merged["captured_at"], 1.0)
+
+
+class PipelineStatsTests(unittest.TestCase):
+    def test_slow_blocks_and_latency(self):
+        now = [10.0]
+        stats = PipelineStats(clock=lambda: now[0])
+        stats.record_capture(0.005, 0.01)
+        stats.record_capture(0.02, 0.01)
+        stats.record_emit(9.99)
+        snapshot = stats.snapshot(LatestFrameQueue())
+        self.assertEqual(snapshot["captured"], 2)
+        self.assertEqual(snapshot["slow_blocks"], 1)
+        self.assertAlmostEqual(snapshot["latency_max_ms"], 10.0, places=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
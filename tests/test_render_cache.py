@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from render_cache import CanvasStateCache
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.calls = []
+
+    def itemconfigure(self, item, **options):
+        self.calls.append(("itemconfigure", item, options))
+
+    def coords(self, item, *coords):
+        self.calls.append(("coords", item, coords))
+
+
+class CanvasStateCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.canvas = FakeCanvas()
+        self.cache = CanvasStateCache(self.canvas)
+
+    def test_repeated_fill_is_sent_once(self):
+        for _ in range(3):
+            self.cache.itemconfigure(1, fill="#ff9900")
+        self.assertEqual(len(self.canvas.calls), 1)
+        self.assertEqual(self.cache.skipped_calls, 2)
+
+    def test_only_changed_options_are_sent(self):
+        self.cache.itemconfigure(2, text="IDLE", fill="#fff")
+        self.cache.itemconfigure(2, text="SOUND", fill="#fff")
+        self.assertEqual(self.canvas.calls[-1], ("itemconfigure", 2, {"text": "SOUND"}))
+
+    def test_remembered_state_skips_first_call(self):
+        self.cache.remember(3, fill="#000001")
+        self.cache.itemconfigure(3, fill="#000001")
+        self.assertEqual(self.canvas.calls, [])
+
+    def test_coords_are_tracked(self):
+        self.cache.coords(4, 0, 0, 10, 4)
+        self.cache.coords(4, 0, 0, 10, 4)
+        self.cache.coords(4, 0, 0, 12, 4)
+        self.assertEqual(len(self.canvas.calls), 2)
+
+    def test_frame_counter_and_clear(self):
+        self.cache.begin_frame()
+        self.cache.itemconfigure(1, fill="a")
+        self.cache.itemconfigure(2, fill="b")
+        self.cache.itemconfigure(1, fill="a")
+        self.cache.end_frame()
+        self.assertEqual(self.cache.stats()["tk_calls_last_frame"], 2)
+
+        self.cache.clear()
+        self.cache.begin_frame()
+        self.cache.itemconfigure(1, fill="a")
+        self.cache.end_frame()
+        self.assertEqual(self.cache.calls_last_frame, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
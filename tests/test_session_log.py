@@ -0,0 +1,170 @@
+import os
+import queue
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Overlay"))
+
+from app_config import DEFAULT_SETTINGS, apply_saved_settings, build_saved_config
+from audio_replay import replay_audio_file
+from radar_engine import RadarEngine, empty_frame
+from session_log import SessionLog, SessionLogSource, SessionRecorder, session_log_path
+
+BLOCK_SECONDS = 512 / 48000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def tone_blocks(count, left_gain, right_gain):
+    t = np.arange(count * 512) / 48000
+    tone = 0.3 * np.sin(2 * np.pi * 900 * t)
+    return np.stack([tone * left_gain, tone * right_gain], axis=1).astype(np.float32).reshape(count, 512, 2)
+
+
+def record_session(path, blocks, audio_format="int16", **kwargs):
+    clock = FakeClock()
+    engine = RadarEngine()
+    frames = []
+    with SessionRecorder(path, audio_format=audio_format, clock=clock, **kwargs) as recorder:
+        for block in blocks:
+            frame = engine.process(block)
+            recorder.write(block, frame)
+            frames.append(frame)
+            clock.now += BLOCK_SECONDS
+    return recorder, frames
+
+
+class SessionLogTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "session.rzlog")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_round_trip_audio_and_results(self):
+        blocks = tone_blocks(150, 0.0, 1.0)
+        recorder, frames = record_session(self.path, blocks)
+        self.assertEqual(recorder.stats()["dropped"], 0)
+        with SessionLog(self.path) as log:
+            self.assertEqual(log.blocks, 150)
+            self.assertEqual(len(log.index), 3)
+            self.assertAlmostEqual(log.duration, 150 * BLOCK_SECONDS)
+            for number, (record, audio) in enumerate(log.records()):
+                np.testing.assert_allclose(audio / 32768.0, blocks[number], atol=1.0 / 32768)
+            frame = log.frame(record)
+            self.assertEqual(frame["event"], frames[-1]["event"])
+            self.assertAlmostEqual(frame["angle"], frames[-1]["angle"], places=3)
+            np.testing.assert_allclose(frame["sectors"], frames[-1]["sectors"], atol=1e-6)
+            self.assertEqual(log.timeline()[-1]["sector"], 4)
+
+    def test_float32_audio_is_stored_exactly(self):
+        blocks = tone_blocks(10, 1.0, 0.5)
+        record_session(self.path, blocks, audio_format="float32")
+        with SessionLog(self.path) as log:
+            audio = np.stack([audio for _record, audio in log.records()])
+        np.testing.assert_array_equal(audio, blocks)
+
+    def test_seek_by_time_uses_index(self):
+        record_session(self.path, tone_blocks(200, 1.0, 1.0))
+        with SessionLog(self.path) as log:
+            number, position = log.locate(1.0)
+            self.assertEqual(number * 64 + position, int(1.0 / BLOCK_SECONDS))
+            record, _audio = next(log.records(1.0))
+            self.assertLessEqual(record["time"], 1.0)
+            self.assertGreater(record["time"] + BLOCK_SECONDS, 1.0)
+            self.assertEqual(len(log.timeline(0.5, 1.0)), 48)
+
+    def test_missing_index_and_torn_tail_are_recovered(self):
+        record_session(self.path, tone_blocks(130, 1.0, 1.0))
+        os.remove(self.path + ".idx")
+        with open(self.path, "ab") as f:
+            # Запись оборвалась посреди следующего чанка.
+            f.write(b"\0" * 1000)
+        with SessionLog(self.path) as log:
+            self.assertEqual(log.blocks, 130)
+            self.assertEqual(list(log.index["count"]), [64, 64, 2])
+            self.assertEqual(log.locate(1.0), (1, 29))
+
+    def test_full_queue_drops_blocks_instead_of_waiting(self):
+        recorder = SessionRecorder(self.path, chunk_blocks=4, queue_chunks=2).start()
+        # Писатель «завис на диске»: чанки не возвращаются в свободные.
+        stalled, recorder.full = recorder.full, queue.Queue()
+        frame = empty_frame()
+        block = np.zeros((512, 2), dtype=np.float32)
+        written = [recorder.write(block, frame) for _ in range(12)]
+        self.assertEqual(written, [True] * 8 + [False] * 4)
+        self.assertEqual(recorder.stats()["dropped"], 4)
+        while not recorder.full.empty():
+            stalled.put(recorder.full.get())
+        recorder.full = stalled
+        recorder.close()
+        with SessionLog(self.path) as log:
+            self.assertEqual(log.blocks, 8)
+
+    def test_other_channel_layout_is_counted_separately(self):
+        with mock.patch("session_log.log_message") as log, SessionRecorder(self.path, channels=6) as recorder:
+            self.assertFalse(recorder.write(np.zeros((512, 2), dtype=np.float32), empty_frame()))
+            self.assertFalse(recorder.write(np.zeros((512, 2), dtype=np.float32), empty_frame()))
+            self.assertTrue(recorder.write(np.zeros((512, 6), dtype=np.float32), empty_frame()))
+        log.assert_called_once()
+        stats = recorder.stats()
+        self.assertEqual(stats["mismatched"], 2)
+        self.assertEqual(stats["dropped"], 0)
+        with SessionLog(self.path) as log:
+            self.assertEqual((log.channels, log.blocks), (6, 1))
+
+    def test_new_segment_path_does_not_overwrite(self):
+        first = session_log_path(self.folder.name)
+        open(first, "wb").close()
+        second = session_log_path(self.folder.name)
+        self.assertNotEqual(first, second)
+        self.assertTrue(second.endswith(".rzlog"))
+
+    def test_write_does_not_allocate_blocks(self):
+        frame = empty_frame()
+        block = np.ones((512, 2), dtype=np.float32) * 0.1
+        with SessionRecorder(self.path, queue_chunks=8) as recorder:
+            peaks = []
+            tracemalloc.start()
+            try:
+                for _ in range(200):
+                    before = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                    recorder.write(block, frame)
+                    peaks.append(tracemalloc.get_traced_memory()[1] - before)
+            finally:
+                tracemalloc.stop()
+        self.assertLess(sorted(peaks)[len(peaks) // 2], 2048)
+
+    def test_replay_from_timestamp(self):
+        blocks = np.concatenate([tone_blocks(100, 1.0, 0.0), tone_blocks(100, 0.0, 1.0)])
+        record_session(self.path, blocks)
+        self.assertEqual(SessionLogSource(self.path).channels, 2)
+        result = replay_audio_file(self.path, start=100 * BLOCK_SECONDS + 0.001)
+        self.assertEqual(result["blocks"], 100)
+        self.assertAlmostEqual(result["timeline"][0]["time"], 100 * BLOCK_SECONDS, places=3)
+        self.assertEqual(result["timeline"][-1]["sector"], 4)
+
+    def test_setting_is_validated_and_saved(self):
+        settings = DEFAULT_SETTINGS.copy()
+        self.assertEqual(settings["session_log"], "off")
+        apply_saved_settings(settings, {"session_log": "float32"})
+        self.assertEqual(build_saved_config(settings, "", None)["session_log"], "float32")
+        apply_saved_settings(settings, {"session_log": "mp3"})
+        self.assertEqual(settings["session_log"], "off")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Overlay"))
+sys.path.insert(0, os.path.join(ROOT, "web"))
+
+from audio_direction import NUM_SECTORS
+from radar_broadcast import RadarBroadcaster, decode_frame, quantize_sectors
+from radar_engine import RadarEngine
+from radar_pipeline import LatestFrameQueue, PipelineStats, broadcast_frames, engine_frame
+
+
+def parity_blocks(count=60, block_size=512, sample_rate=48000):
+    # Тишина, шаги слева, выстрел справа и шум - чтобы сработали разные события и направления.
+    rng = np.random.default_rng(7)
+    blocks = []
+    for index in range(count):
+        t = (np.arange(block_size) + index * block_size) / sample_rate
+        block = np.zeros((block_size, 2), dtype=np.float32)
+        if 10 <= index < 25 and index % 5 < 2:
+            tone = 0.2 * np.sin(2 * np.pi * 700 * t) * np.exp(-np.arange(block_size) / 2000)
+            block[:, 0] = tone
+            block[:, 1] = tone * 0.2
+        elif 30 <= index < 33:
+            burst = rng.standard_normal(block_size) * 0.6
+            block[:, 0] = burst * 0.3
+            block[:, 1] = burst
+        elif index >= 40:
+            block += rng.standard_normal((block_size, 2)).astype(np.float32) * 0.01
+        blocks.append(block)
+    return blocks
+
+
+class WebParityTests(unittest.TestCase):
+    def test_web_frames_match_overlay_engine(self):
+        # Путь веб-сервера без потоков и настоящего времени: кадры кладутся в LatestFrameQueue,
+        # каждые три блока (~32 мс) сливаются (merge_frames) и уходят через RadarBroadcaster
+        # с ограничением 30 кадров/с по поддельным часам.
+        now = [0.0]
+        clock = lambda: now[0]
+        overlay = RadarEngine()
+        web = RadarEngine()
+        frame_queue = LatestFrameQueue(maxsize=4)
+        stats = PipelineStats(clock=clock)
+        sent = []
+        broadcaster = RadarBroadcaster(lambda client, payload: sent.append(payload), num_sectors=NUM_SECTORS, clock=clock)
+        broadcaster.add_client(1)
+
+        expected = []
+        block_duration = 512 / 48000
+        for index, block in enumerate(parity_blocks()):
+            frame = overlay.process(block)
+            web_frame = engine_frame(web, block, captured_at=now[0])
+            expected.append(frame)
+            frame_queue.put(web_frame)
+            now[0] += block_duration
+            if index % 3 == 2:
+                broadcast_frames(frame_queue.drain(), broadcaster, stats)
+        # Последний кадр еще раз после интервала ограничения: клиент должен прийти ровно к нему.
+        now[0] += 0.05
+        frame_queue.put(web_frame)
+        broadcast_frames(frame_queue.drain(), broadcaster, stats)
+
+        received = bytearray(NUM_SECTORS)
+        states = []
+        events = set()
+        for payload in sent:
+            events.add(decode_frame(payload, received)["event"])
+            states.append(np.frombuffer(bytes(received), dtype=np.uint8).copy())
+        states = np.array(states)
+        quantized = np.array([quantize_sectors(frame["sectors"]) for frame in expected])
+
+        self.assertLess(len(sent), len(expected))
+        np.testing.assert_array_equal(states[-1], quantized[-1])
+        self.assertEqual(decode_frame(sent[-1], bytearray(NUM_SECTORS))["event"], expected[-1]["event"])
+        # Ни один транзиент не потерялся по дороге: максимум по каждому сектору у клиента тот же, что в оверлее.
+        np.testing.assert_array_equal(states.max(axis=0), quantized.max(axis=0))
+        transient_events = {frame["event"] for frame in expected} - {"IDLE", "SOUND"}
+        self.assertTrue(transient_events)
+        self.assertLessEqual(transient_events, events)
+
+
+if __name__ == "__main__":
+    unittest.main()
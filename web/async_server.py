@@ -0,0 +1,125 @@
+import asyncio
+import itertools
+import time
+
+from aiohttp import WSMsgType, web
+
+from audio_direction import NUM_SECTORS
+from radar_broadcast import RadarBroadcaster
+from radar_pipeline import broadcast_frames
+
+CLIENT_QUEUE_SIZE = 8
+
+
+class CpuMeter:
+    # Доля процессорного времени процесса между двумя вызовами sample().
+    def __init__(self):
+        self.last_wall = time.perf_counter()
+        self.last_cpu = time.process_time()
+        self.percent = 0.0
+
+    def sample(self):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if wall - self.last_wall > 0:
+            self.percent = (cpu - self.last_cpu) / (wall - self.last_wall) * 100.0
+        self.last_wall = wall
+        self.last_cpu = cpu
+        return round(self.percent, 1)
+
+
+class AsyncRadarServer:
+    # Все клиенты обслуживаются одним циклом asyncio: поток на клиента не нужен.
+    # У каждого клиента своя короткая очередь отправки; если клиент не успевает читать,
+    # очередь сбрасывается и ему уходит ключевой кадр, а остальные клиенты не ждут.
+    def __init__(self, html_page, frame_queue, pipeline_stats, num_sectors=NUM_SECTORS, max_rate=30.0):
+        self.html = html_page.replace("{{ transport }}", "ws")
+        self.frame_queue = frame_queue
+        self.pipeline_stats = pipeline_stats
+        self.broadcaster = RadarBroadcaster(self.enqueue, num_sectors=num_sectors, max_rate=max_rate)
+        self.outboxes = {}
+        self.client_ids = itertools.count(1)
+        self.overflows = 0
+        self.cpu = CpuMeter()
+        self.pump_task = None
+        self.running = False
+
+        self.app = web.Application()
+        self.app.router.add_get("/", self.handle_index)
+        self.app.router.add_get("/ws", self.handle_ws)
+        self.app.router.add_get("/stats", self.handle_stats)
+        self.app.on_startup.append(self.start_pump)
+        self.app.on_cleanup.append(self.stop_pump)
+
+    def enqueue(self, client_id, payload):
+        outbox = self.outboxes.get(client_id)
+        if outbox is None:
+            raise KeyError(client_id)
+        try:
+            outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Старые дельты без предыдущих кадров бесполезны: выбрасываем все и начинаем с ключевого кадра.
+            while not outbox.empty():
+                outbox.get_nowait()
+            self.overflows += 1
+            self.broadcaster.request_keyframe(client_id)
+
+    async def handle_index(self, request):
+        return web.Response(text=self.html, content_type="text/html")
+
+    async def handle_stats(self, request):
+        network = self.broadcaster.stats()
+        network["client_overflows"] = self.overflows
+        return web.json_response({
+            "network": network,
+            "pipeline": self.pipeline_stats.snapshot(self.frame_queue),
+            "server": {"cpu_percent": self.cpu.sample()},
+        })
+
+    async def handle_ws(self, request):
+        ws = web.WebSocketResponse(heartbeat=20.0)
+        await ws.prepare(request)
+        client_id = next(self.client_ids)
+        outbox = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.outboxes[client_id] = outbox
+        self.broadcaster.add_client(client_id)
+        sender = asyncio.ensure_future(self.send_loop(ws, outbox))
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self.broadcaster.remove_client(client_id)
+            self.outboxes.pop(client_id, None)
+            sender.cancel()
+        return ws
+
+    async def send_loop(self, ws, outbox):
+        try:
+            while True:
+                payload = await outbox.get()
+                await ws.send_bytes(payload)
+        except (ConnectionResetError, RuntimeError):
+            pass
+
+    async def start_pump(self, app):
+        self.running = True
+        self.pump_task = asyncio.ensure_future(self.pump())
+
+    async def stop_pump(self, app):
+        self.running = False
+        if self.pump_task is not None:
+            await self.pump_task
+
+    async def pump(self):
+        # Очередь кадров блокирующая (ее пишет поток захвата), поэтому ждем ее в пуле потоков.
+        loop = asyncio.get_running_loop()
+        while self.running:
+            frames = await loop.run_in_executor(None, self.frame_queue.drain, 0.2)
+            if frames:
+                broadcast_frames(frames, self.broadcaster, self.pipeline_stats)
+
+
+def run_async_server(html_page, frame_queue, pipeline_stats, host="0.0.0.0", port=5555, num_sectors=NUM_SECTORS, max_rate=30.0):
+    server = AsyncRadarServer(html_page, frame_queue, pipeline_stats, num_sectors, max_rate)
+    web.run_app(server.app, host=host, port=port, print=None)
@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from aiohttp import ClientSession, WSMsgType
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Overlay"))
+from async_server import AsyncRadarServer
+from audio_direction import NUM_SECTORS
+from radar_broadcast import decode_frame
+from radar_pipeline import LatestFrameQueue, PipelineStats
+
+# Нагрузочный тест рассылки: N зрителей по WebSocket, задержка от захвата кадра до приема
+# (по времени в заголовке кадра) и загрузка процессора клиентом и сервером.
+
+
+def synthetic_producer(frame_queue, stop, rate=94.0, num_sectors=NUM_SECTORS):
+    # Подменяет захват звука: вращающийся источник с частотой блоков реального времени.
+    interval = 1.0 / rate
+    step = 0
+    next_time = time.perf_counter()
+    while not stop.is_set():
+        angle = (step * 0.05) % (2 * math.pi)
+        sectors = np.maximum(np.cos(np.arange(num_sectors) * 2 * math.pi / num_sectors - angle), 0.0)
+        frame_queue.put({
+            "sectors": sectors.tolist(),
+            "event": "STEP" if step % 20 == 0 else "SOUND",
+            "is_moving": False,
+            "is_loud": False,
+            "timestamp": time.time(),
+            "captured_at": time.perf_counter(),
+        })
+        step += 1
+        next_time += interval
+        time.sleep(max(0.0, next_time - time.perf_counter()))
+
+
+async def viewer(session, url, duration, latencies, counts):
+    sectors = bytearray(NUM_SECTORS)
+    frames = 0
+    async with session.ws_connect(url) as ws:
+        deadline = time.perf_counter() + duration
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                message = await ws.receive(timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if message.type != WSMsgType.BINARY:
+                break
+            frame = decode_frame(message.data, sectors)
+            latencies.append(time.time() - frame["timestamp"])
+            frames += 1
+    counts.append(frames)
+
+
+async def run_load(base_url, clients, duration):
+    latencies = []
+    counts = []
+    ws_url = base_url.replace("http://", "ws://").rstrip("/") + "/ws"
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    async with ClientSession() as session:
+        await asyncio.gather(*[viewer(session, ws_url, duration, latencies, counts) for _ in range(clients)])
+        async with session.get(base_url.rstrip("/") + "/stats") as response:
+            server_stats = await response.json()
+    wall = time.perf_counter() - wall_start
+    return latencies, counts, (time.process_time() - cpu_start) / wall * 100.0, server_stats
+
+
+async def run_local(clients, duration, port):
+    from aiohttp import web
+
+    frame_queue = LatestFrameQueue(maxsize=4)
+    server = AsyncRadarServer("<html>{{ transport }}</html>", frame_queue, PipelineStats(), num_sectors=NUM_SECTORS)
+    runner = web.AppRunner(server.app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    stop = threading.Event()
+    producer = threading.Thread(target=synthetic_producer, args=(frame_queue, stop, 94.0, NUM_SECTORS), daemon=True)
+    producer.start()
+    try:
+        server.cpu.sample()
+        return await run_load(f"http://127.0.0.1:{port}", clients, duration)
+    finally:
+        stop.set()
+        await runner.cleanup()
+
+
+def summarize(latencies, counts, client_cpu, server_stats, clients, duration):
+    values = np.array(latencies) * 1000.0 if latencies else np.zeros(1)
+    return {
+        "clients": clients,
+        "duration": duration,
+        "frames_received": int(sum(counts)),
+        "frames_per_client_per_second": round(sum(counts) / max(clients, 1) / duration, 1),
+        "latency_p50_ms": round(float(np.percentile(values, 50)), 2),
+        "latency_p99_ms": round(float(np.percentile(values, 99)), 2),
+        "latency_max_ms": round(float(values.max()), 2),
+        "client_cpu_percent": round(client_cpu, 1),
+        "server": server_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the asyncio web radar server")
+    parser.add_argument("--url", help="адрес уже запущенного сервера, например http://127.0.0.1:5555")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=0, help="порт локального сервера с синтетическим сигналом")
+    args = parser.parse_args()
+
+    if args.url:
+        result = asyncio.run(run_load(args.url, args.clients, args.seconds))
+    else:
+        result = asyncio.run(run_local(args.clients, args.seconds, args.port))
+    print(json.dumps(summarize(*result, args.clients, args.seconds), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
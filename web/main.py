@@ -1,8 +1,8 @@
+import argparse
 import time
 import threading
 import logging
 import socket
-import math
 import os
 import sys
 
@@ -17,26 +17,35 @@ except (ValueError, Exception):
     np.fromstring = fromstring_patch
 
 import soundcard as sc
-from scipy import signal
-from flask import Flask, render_template_string
+from flask import Flask, jsonify, render_template_string, request
 from flask_socketio import SocketIO
-import keyboard 
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Overlay"))
+from app_config import BLOCK_SIZE, DEFAULT_SETTINGS, SAMPLE_RATE, apply_saved_settings, load_config
+from audio_direction import NUM_SECTORS
+from audio_capture import CaptureStream, RecorderBackend
+from audio_surround import capture_channels
+from capture_supervisor import CaptureSupervisor
+from input_state import KeyboardModuleBackend, MovementState, StubInputBackend
+from radar_engine import RadarEngine
+from radar_broadcast import RadarBroadcaster
+from radar_pipeline import LatestFrameQueue, PipelineStats, broadcast_frames, engine_frame
 
 # --- НАСТРОЙКИ ---
-SAMPLE_RATE = 48000
-BLOCK_SIZE = 1024
-FREQ_LOW = 50
-FREQ_HIGH = 450
-SENSITIVITY = 350.0
-SUPPRESSION_MOVE = 0.85
-SUPPRESSION_IDLE = 0.6
-REAR_FREQ_THRESHOLD = 1500 # Порог "глухости" для звуков сзади
+# Анализ общий с оверлеем (RadarEngine): те же блоки, полоса, 16 секторов и профиль из config.json.
+BLOCK_DURATION = BLOCK_SIZE / SAMPLE_RATE
+settings = DEFAULT_SETTINGS.copy()
+apply_saved_settings(settings, load_config())
 
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+broadcaster = RadarBroadcaster(lambda sid, payload: socketio.emit('radar', payload, to=sid), num_sectors=NUM_SECTORS)
+# Захват и рассылка связаны только этой очередью: медленный клиент не задерживает recorder.record.
+frame_queue = LatestFrameQueue(maxsize=4)
+pipeline_stats = PipelineStats()
 
 # --- HTML (Тот же Sonic Pro Design) ---
 HTML_PAGE = """
@@ -63,17 +72,35 @@ HTML_PAGE = """
     </style>
     <script src="https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.0.1/socket.io.js"></script>
     <script>
-        var socket = io({transports: ['websocket'], upgrade: false});
-        var sectorLevels = [0,0,0,0,0,0,0,0];
+        var TRANSPORT = "{{ transport }}";
+        var NUM_SECTORS = 16;
+        var sectorLevels = new Array(NUM_SECTORS).fill(0);
+        var EVENTS = ["IDLE", "SOUND", "STEP", "IMPACT", "SHARP", "LOW", "AUDIO ERROR"];
+        var received = new Uint8Array(16);
         var DECAY = 0.05;
 
+        // Бинарный кадр: 14 байт заголовка, затем ключевой кадр (число + уровни) или дельта (маска + уровни).
+        function applyFrame(buffer) {
+            var view = new DataView(buffer);
+            var kind = view.getUint8(0); var flags = view.getUint8(1); var offset = 14;
+            if (kind === 1) {
+                var count = view.getUint8(offset); offset += 1;
+                for (var i = 0; i < count; i++) received[i] = view.getUint8(offset + i);
+            } else {
+                var mask = view.getUint16(offset, true); offset += 2;
+                for (var i = 0; i < 16; i++) { if (mask & (1 << i)) { received[i] = view.getUint8(offset); offset += 1; } }
+            }
+            var code = view.getUint8(12);
+            return { is_moving: (flags & 1) !== 0, is_loud: (flags & 2) !== 0, event: EVENTS[code] || "SOUND", confidence: view.getUint8(13) / 255 };
+        }
+
         function generateSegments() {
             var svg = document.getElementById("radar-svg");
-            var numSectors = 8; var numBlocks = 5; var innerRadius = 40; var outerRadius = 170; var blockDepth = (outerRadius - innerRadius) / numBlocks;
+            var numSectors = NUM_SECTORS; var numBlocks = 5; var innerRadius = 40; var outerRadius = 170; var blockDepth = (outerRadius - innerRadius) / numBlocks;
             for (var s = 0; s < numSectors; s++) {
                 for (var b = 0; b < numBlocks; b++) {
                     var rIn = innerRadius + (b * blockDepth) + 2; var rOut = rIn + blockDepth - 4;
-                    var startAngle = (s * 45) - 20; var endAngle = (s * 45) + 20;
+                    var width = 360 / numSectors; var startAngle = (s * width) - width / 2 + 1.5; var endAngle = (s * width) + width / 2 - 1.5;
                     var startRad = startAngle * (Math.PI / 180); var endRad = endAngle * (Math.PI / 180);
                     var x1 = 180 + rIn * Math.cos(startRad); var y1 = 180 + rIn * Math.sin(startRad);
                     var x2 = 180 + rOut * Math.cos(startRad); var y2 = 180 + rOut * Math.sin(startRad);
@@ -86,17 +113,30 @@ HTML_PAGE = """
                 }
             }
         }
-        socket.on('update_pro', function(data) {
-            var input = data.sectors;
+        function onRadar(buffer) {
+            var data = applyFrame(buffer);
             var status = document.getElementById("status-text");
             var center = document.getElementById("center-hub");
-            for(var i=0; i<8; i++) { if (input[i] > sectorLevels[i]) sectorLevels[i] = input[i]; }
             if (data.is_moving) { status.innerText = "MOVING [SUPPRESSED]"; status.style.color = "#664400"; center.style.borderColor = "#664400"; }
-            else if (data.is_human) { status.innerText = "⚠️ HOSTILE ⚠️"; status.style.color = "#ff3300"; center.style.borderColor = "#ff3300"; center.innerText = "!"; }
+            else if (data.event === "STEP" || data.event === "SHARP" || data.event === "IMPACT") { status.innerText = "⚠️ " + data.event + " ⚠️"; status.style.color = "#ff3300"; center.style.borderColor = "#ff3300"; center.innerText = "!"; }
             else { status.innerText = "SONIC RADAR PRO"; status.style.color = "#ff9900"; center.style.borderColor = "#ff9900"; center.innerText = ""; }
-        });
+        }
+        // asyncio-сервер отдает те же бинарные кадры через обычный WebSocket, Flask - через socket.io.
+        function connect() {
+            if (TRANSPORT === "ws") {
+                var ws = new WebSocket((location.protocol === "https:" ? "wss://" : "ws://") + location.host + "/ws");
+                ws.binaryType = "arraybuffer";
+                ws.onmessage = function(event) { onRadar(event.data); };
+                ws.onclose = function() { setTimeout(connect, 1000); };
+            } else {
+                var socket = io({transports: ['websocket'], upgrade: false});
+                socket.on('radar', onRadar);
+            }
+        }
         function render() {
-            for (var s = 0; s < 8; s++) {
+            for (var s = 0; s < NUM_SECTORS; s++) {
+                // Сервер шлет уровни только при изменении, поэтому последнее значение держится до следующего кадра.
+                if (received[s] / 255 > sectorLevels[s]) sectorLevels[s] = received[s] / 255;
                 if (sectorLevels[s] > 0) sectorLevels[s] -= DECAY; if (sectorLevels[s] < 0) sectorLevels[s] = 0;
                 var level = sectorLevels[s]; var activeBlocks = Math.ceil(level * 5);
                 for (var b = 0; b < 5; b++) {
@@ -106,7 +146,7 @@ HTML_PAGE = """
                 }
             } requestAnimationFrame(render);
         }
-        window.onload = function() { generateSegments(); render(); };
+        window.onload = function() { generateSegments(); connect(); render(); };
     </script>
 </head>
 <body>
@@ -122,7 +162,19 @@ HTML_PAGE = """
 
 @app.route('/')
 def index():
-    return render_template_string(HTML_PAGE)
+    return render_template_string(HTML_PAGE, transport="socketio")
+
+@app.route('/stats')
+def stats():
+    return jsonify({"network": broadcaster.stats(), "pipeline": pipeline_stats.snapshot(frame_queue)})
+
+@socketio.on('connect')
+def on_connect():
+    broadcaster.add_client(request.sid)
+
+@socketio.on('disconnect')
+def on_disconnect():
+    broadcaster.remove_client(request.sid)
 
 selected_mic = None
 
@@ -149,97 +201,63 @@ def select_audio_device():
 
 def audio_engine():
     global selected_mic
-    b, a = signal.butter(4, [FREQ_LOW, FREQ_HIGH], btype='band', fs=SAMPLE_RATE)
-    last_step = 0
-    intervals = []
-
-    while True:
-        try:
-            if selected_mic is None:
-                time.sleep(1)
-                continue
-
-            with selected_mic.recorder(samplerate=SAMPLE_RATE, channels=2, blocksize=BLOCK_SIZE) as recorder:
-                while True:
-                    data = recorder.record(numframes=BLOCK_SIZE)
-                    
-                    is_moving = False
-                    try:
-                        if keyboard.is_pressed('w') or keyboard.is_pressed('a') or keyboard.is_pressed('s') or keyboard.is_pressed('d'):
-                            is_moving = True
-                    except: pass
-
-                    filtered = signal.lfilter(b, a, data, axis=0)
-                    raw_l = filtered[:, 0]
-                    raw_r = filtered[:, 1]
-                    
-                    suppression = SUPPRESSION_MOVE if is_moving else SUPPRESSION_IDLE
-                    side_l = np.maximum(raw_l - (raw_r * suppression), 0)
-                    side_r = np.maximum(raw_r - (raw_l * suppression), 0)
-                    
-                    vol_l = np.sqrt(np.mean(side_l**2)) * SENSITIVITY
-                    vol_r = np.sqrt(np.mean(side_r**2)) * SENSITIVITY
-                    
-                    if is_moving:
-                        vol_l *= 0.5
-                        vol_r *= 0.5
+    engine = RadarEngine(settings)
+    try:
+        backend = KeyboardModuleBackend(settings["move_keys"])
+    except Exception:
+        backend = StubInputBackend()
+    movement = MovementState(backend).start()
 
-                    total = vol_l + vol_r
-                    sectors = [0.0] * 8
-                    
-                    # Анализ частот (Сзади = Глухой звук)
-                    is_back = False
-                    if total > 0.05:
-                        freqs = np.fft.rfft(data[:, 0] + data[:, 1])
-                        magnitudes = np.abs(freqs)
-                        total_sum = np.sum(magnitudes)
-                        if total_sum > 0:
-                            weighted_sum = np.sum(np.arange(len(magnitudes)) * magnitudes)
-                            centroid = (weighted_sum / total_sum) * (SAMPLE_RATE / BLOCK_SIZE)
-                            if centroid < REAR_FREQ_THRESHOLD:
-                                is_back = True
+    while selected_mic is None:
+        time.sleep(1)
 
-                    if total > 0.05:
-                        balance = (vol_r - vol_l) / (total + 0.0001)
-                        val = min(total, 1.0)
-                        
-                        # Распределение с учетом "Сзади"
-                        if balance > 0.6: sectors[3 if is_back else 2] = val
-                        elif balance > 0.2: sectors[4 if is_back else 1] = val
-                        elif balance < -0.6: sectors[5 if is_back else 6] = val
-                        elif balance < -0.2: sectors[4 if is_back else 7] = val
-                        else:
-                            if not is_moving: sectors[4 if is_back else 0] = val
+    def resolve_mic():
+        # После отключения устройство ищется заново по имени, выбранному при запуске.
+        return sc.get_microphone(id=str(selected_mic.name), include_loopback=True)
 
-                    # Детектор Врага
-                    is_human = False
-                    now = time.time()
-                    if total > 0.25 and (now - last_step) > 0.2:
-                        dt = now - last_step
-                        last_step = now
-                        if dt < 1.0:
-                            intervals.append(dt)
-                            if len(intervals) > 5: intervals.pop(0)
-                            if len(intervals) >= 3 and np.var(intervals) > 0.04:
-                                is_human = True
+    def open_stream(mic):
+        channels = capture_channels(mic, settings["channel_layout"])
+        stream = CaptureStream(RecorderBackend(mic, channels=channels, block_size=BLOCK_SIZE, sample_rate=SAMPLE_RATE))
+        pipeline_stats.capture = stream
+        return stream
 
-                    socketio.emit('update_pro', {
-                        'sectors': sectors,
-                        'is_moving': is_moving,
-                        'is_human': is_human
-                    })
-                    socketio.sleep(0.01)
+    def on_status(status, message):
+        if status == "RECONNECTING":
+            print(f">>> AUDIO LOST, retry in {supervisor.delay:.2f} s: {message}")
+        elif status == "ERROR":
+            print(f">>> AUDIO ERROR, restarting capture in {supervisor.delay:.2f} s: {message}")
+        else:
+            engine.resume()
 
+    supervisor = CaptureSupervisor(open_stream, resolve_mic, on_status=on_status)
+    pipeline_stats.supervisor = supervisor
+    for data in supervisor.blocks():
+        started = time.perf_counter()
+        try:
+            frame_queue.put(engine_frame(engine, data, movement.moving, supervisor.stream.last_captured_at))
         except Exception as e:
-            print(f">>> ERROR: {e}")
-            time.sleep(3)
+            engine.reset()
+            supervisor.fail(e)
+            continue
+        pipeline_stats.record_capture(time.perf_counter() - started, BLOCK_DURATION)
+
+def broadcast_loop():
+    while True:
+        frames = frame_queue.drain(timeout=0.5)
+        if frames:
+            broadcast_frames(frames, broadcaster, pipeline_stats)
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sonic Radar web server")
+    parser.add_argument("--server", choices=["flask", "asyncio"], default="flask", help="asyncio - один цикл событий на всех зрителей")
+    parser.add_argument("--port", type=int, default=5555)
+    args = parser.parse_args()
+
     selected_mic = select_audio_device()
     
     hostname = socket.gethostname()
     local_ip = socket.gethostbyname(hostname)
-    port = 5555 
+    port = args.port
     
     print("\n=============================================")
     print("      SONIC RADAR PRO: RAZGROM EDITION       ")
@@ -251,6 +269,13 @@ if __name__ == '__main__':
     t = threading.Thread(target=audio_engine)
     t.daemon = True
     t.start()
+
+    if args.server == "asyncio":
+        from async_server import run_async_server
+        run_async_server(HTML_PAGE, frame_queue, pipeline_stats, port=port, num_sectors=NUM_SECTORS)
+        sys.exit(0)
+
+    socketio.start_background_task(broadcast_loop)
     
     try:
         socketio.run(app, host='0.0.0.0', port=port, allow_unsafe_werkzeug=True)
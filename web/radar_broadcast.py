@@ -0,0 +1,207 @@
+import struct
+import threading
+import time
+
+import numpy as np
+
+from audio_direction import NUM_SECTORS
+
+# Бинарный кадр радара:
+#   заголовок <BBHdBB: тип, флаги, номер, время захвата (epoch), код события, уверенность 0-255
+#   ключевой кадр: <B число секторов + уровни секторов (uint8)
+#   дельта: <H маска измененных секторов + новые уровни только для них
+HEADER = struct.Struct("<BBHdBB")
+KEYFRAME = 1
+DELTA = 2
+FLAG_MOVING = 1
+FLAG_LOUD = 2
+# Маска дельты - 16 бит, больше секторов в дельту не помещается.
+MAX_SECTORS = 16
+EVENT_CODES = ("IDLE", "SOUND", "STEP", "IMPACT", "SHARP", "LOW", "AUDIO ERROR")
+# Какое событие важнее, когда несколько кадров сливаются в один из-за ограничения частоты.
+EVENT_PRIORITY = ("IDLE", "SOUND", "LOW", "STEP", "SHARP", "IMPACT", "AUDIO ERROR")
+EVENT_RANKS = tuple(EVENT_PRIORITY.index(name) for name in EVENT_CODES)
+
+
+def event_rank(event):
+    return EVENT_RANKS[event_code(event)]
+
+
+def event_code(event):
+    try:
+        return EVENT_CODES.index(event)
+    except ValueError:
+        return EVENT_CODES.index("SOUND")
+
+
+def quantize_sectors(levels, out=None):
+    scaled = np.clip(np.asarray(levels, dtype=np.float64), 0.0, 1.0) * 255.0
+    if out is None:
+        out = np.empty(len(scaled), dtype=np.uint8)
+    np.rint(scaled, out=scaled)
+    out[:] = scaled
+    return out
+
+
+def encode_keyframe(seq, timestamp, flags, event, confidence, quantized):
+    header = HEADER.pack(KEYFRAME, flags, seq & 0xFFFF, timestamp, event, confidence)
+    return header + struct.pack("<B", len(quantized)) + quantized.tobytes()
+
+
+def encode_delta(seq, timestamp, flags, event, confidence, quantized, previous):
+    changed = np.flatnonzero(quantized != previous)
+    mask = 0
+    for index in changed:
+        mask |= 1 << int(index)
+    header = HEADER.pack(DELTA, flags, seq & 0xFFFF, timestamp, event, confidence)
+    return header + struct.pack("<H", mask) + quantized[changed].tobytes()
+
+
+def decode_frame(payload, sectors):
+    # sectors - состояние клиента (bytearray/список), обновляется на месте.
+    kind, flags, seq, timestamp, event, confidence = HEADER.unpack_from(payload, 0)
+    offset = HEADER.size
+    if kind == KEYFRAME:
+        count = payload[offset]
+        sectors[:] = payload[offset + 1:offset + 1 + count]
+    else:
+        mask = struct.unpack_from("<H", payload, offset)[0]
+        offset += 2
+        for index in range(MAX_SECTORS):
+            if mask & (1 << index):
+                sectors[index] = payload[offset]
+                offset += 1
+    return {
+        "kind": kind,
+        "seq": seq,
+        "timestamp": timestamp,
+        "event": EVENT_CODES[event] if event < len(EVENT_CODES) else "SOUND",
+        "confidence": confidence / 255.0,
+        "is_moving": bool(flags & FLAG_MOVING),
+        "is_loud": bool(flags & FLAG_LOUD),
+    }
+
+
+class ClientState:
+    def __init__(self, num_sectors):
+        self.sectors = np.zeros(num_sectors, dtype=np.uint8)
+        self.header = None
+        self.last_sent = None
+        self.last_keyframe = None
+        # Кадры, пришедшие между отправками: максимум по секторам, самое важное событие, флаги по ИЛИ.
+        self.pending = np.zeros(num_sectors, dtype=np.uint8)
+        self.pending_header = None
+
+    def hold(self, quantized, header):
+        if self.pending_header is None:
+            np.copyto(self.pending, quantized)
+            self.pending_header = header
+            return
+        np.maximum(self.pending, quantized, out=self.pending)
+        flags, event, confidence = self.pending_header
+        if EVENT_RANKS[header[1]] > EVENT_RANKS[event]:
+            event = header[1]
+        self.pending_header = (flags | header[0], event, max(confidence, header[2]))
+
+    def release(self, quantized, header):
+        # Текущий кадр вместе со всем, что копилось, пока клиент был ограничен по частоте.
+        if self.pending_header is None:
+            return quantized, header
+        self.hold(quantized, header)
+        header, self.pending_header = self.pending_header, None
+        return self.pending, header
+
+
+class RadarBroadcaster:
+    # Каждому клиенту отправляется только разница с тем, что он уже получил,
+    # не чаще max_rate кадров в секунду, плюс ключевой кадр раз в keyframe_interval.
+    # Кадры между отправками не теряются, а сливаются в следующую отправку.
+    def __init__(self, send, num_sectors=NUM_SECTORS, max_rate=30.0, keyframe_interval=2.0, clock=time.monotonic):
+        if num_sectors > MAX_SECTORS:
+            raise ValueError(f"Delta frames carry at most {MAX_SECTORS} sectors, got {num_sectors}")
+        self.send = send
+        self.num_sectors = num_sectors
+        self.min_interval = 1.0 / max_rate
+        self.keyframe_interval = keyframe_interval
+        self.clock = clock
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.quantized = np.zeros(num_sectors, dtype=np.uint8)
+        self.seq = 0
+        self.bytes_sent = 0
+        self.frames_sent = 0
+        self.window_start = clock()
+        self.window_bytes = 0
+        self.window_frames = 0
+        self.bytes_per_second = 0.0
+        self.frames_per_second = 0.0
+
+    def add_client(self, client_id):
+        with self.lock:
+            self.clients[client_id] = ClientState(self.num_sectors)
+
+    def remove_client(self, client_id):
+        with self.lock:
+            self.clients.pop(client_id, None)
+
+    def request_keyframe(self, client_id):
+        # Клиент пропустил кадры (например, переполнилась его очередь) - следующим пойдет ключевой кадр.
+        client = self.clients.get(client_id)
+        if client is not None:
+            client.last_keyframe = None
+
+    def publish(self, sectors, event="IDLE", confidence=0.0, is_moving=False, is_loud=False, timestamp=None):
+        now = self.clock()
+        timestamp = time.time() if timestamp is None else timestamp
+        quantized = quantize_sectors(sectors, self.quantized)
+        flags = (FLAG_MOVING if is_moving else 0) | (FLAG_LOUD if is_loud else 0)
+        code = event_code(event)
+        confidence_byte = int(round(min(max(confidence, 0.0), 1.0) * 255))
+        header = (flags, code, confidence_byte)
+        self.seq += 1
+
+        with self.lock:
+            clients = list(self.clients.items())
+
+        for client_id, client in clients:
+            if client.last_sent is not None and now - client.last_sent < self.min_interval:
+                client.hold(quantized, header)
+                continue
+            sectors, client_header = client.release(quantized, header)
+            client_flags, client_code, client_confidence = client_header
+            if client.last_keyframe is None or now - client.last_keyframe >= self.keyframe_interval:
+                payload = encode_keyframe(self.seq, timestamp, client_flags, client_code, client_confidence, sectors)
+                client.last_keyframe = now
+            elif client_header != client.header or not np.array_equal(sectors, client.sectors):
+                payload = encode_delta(self.seq, timestamp, client_flags, client_code, client_confidence, sectors, client.sectors)
+            else:
+                continue
+            try:
+                self.send(client_id, payload)
+            except Exception:
+                self.remove_client(client_id)
+                continue
+            client.sectors[:] = sectors
+            client.header = client_header
+            client.last_sent = now
+            self.bytes_sent += len(payload)
+            self.frames_sent += 1
+            self.window_bytes += len(payload)
+            self.window_frames += 1
+
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            self.bytes_per_second = self.window_bytes / elapsed
+            self.frames_per_second = self.window_frames / elapsed
+            self.window_start = now
+            self.window_bytes = 0
+            self.window_frames = 0
+
+    def stats(self):
+        return {
+            "clients": len(self.clients),
+            "bytes_sent": self.bytes_sent,
+            "frames_sent": self.frames_sent,
+            "bytes_per_second": round(self.bytes_per_second, 1),
+            "frames_per_second": round(self.frames_per_second, 1),
+        }
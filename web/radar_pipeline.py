@@ -0,0 +1,118 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+from radar_broadcast import event_rank
+
+
+class LatestFrameQueue:
+    # Ограниченная очередь между захватом и рассылкой. put() никогда не ждет:
+    # при переполнении вытесняется самый старый кадр, а читатель забирает все накопленное разом.
+    def __init__(self, maxsize=4):
+        self.items = collections.deque(maxlen=maxsize)
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.coalesced = 0
+
+    def put(self, frame):
+        with self.condition:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(frame)
+            self.condition.notify()
+
+    def drain(self, timeout=None):
+        with self.condition:
+            if not self.items:
+                self.condition.wait(timeout)
+            frames = list(self.items)
+            self.items.clear()
+        if len(frames) > 1:
+            self.coalesced += len(frames) - 1
+        return frames
+
+
+def engine_frame(engine, data, is_moving=False, captured_at=None):
+    # Веб-сервер использует тот же RadarEngine, что и оверлей; здесь только отбираются поля для рассылки.
+    frame = engine.process(data, is_moving=is_moving)
+    return {
+        "sectors": frame["sectors"],
+        "event": frame["event"],
+        "confidence": frame["confidence"],
+        "is_moving": frame["is_moving"],
+        "is_loud": frame["is_loud"],
+        "timestamp": time.time(),
+        "captured_at": time.perf_counter() if captured_at is None else captured_at,
+    }
+
+
+def merge_frames(frames):
+    # Секторы сливаются по максимуму, событие - самое важное из накопленных, чтобы короткий звук не потерялся;
+    # остальное берется из последнего кадра.
+    latest = dict(frames[-1])
+    if len(frames) > 1:
+        latest["sectors"] = np.max([frame["sectors"] for frame in frames], axis=0).tolist()
+        latest["event"] = max((frame["event"] for frame in frames), key=event_rank)
+        latest["confidence"] = max(frame.get("confidence", 0.0) for frame in frames)
+        latest["is_loud"] = any(frame.get("is_loud", False) for frame in frames)
+        latest["captured_at"] = frames[0]["captured_at"]
+    return latest
+
+
+def broadcast_frames(frames, broadcaster, stats):
+    # Общий шаг рассылки для Flask- и asyncio-сервера: слить накопленное и отправить клиентам.
+    frame = merge_frames(frames)
+    try:
+        broadcaster.publish(
+            frame["sectors"],
+            event=frame["event"],
+            confidence=frame.get("confidence", 0.0),
+            is_moving=frame["is_moving"],
+            is_loud=frame["is_loud"],
+            timestamp=frame["timestamp"],
+        )
+    except Exception as e:
+        print(f">>> BROADCAST ERROR: {e}")
+    stats.record_emit(frame["captured_at"])
+    return frame
+
+
+class PipelineStats:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.captured = 0
+        self.slow_blocks = 0
+        self.emitted = 0
+        self.latency_avg = 0.0
+        self.latency_max = 0.0
+        # CaptureStream и CaptureSupervisor аудиопотока, если захват идет через них.
+        self.capture = None
+        self.supervisor = None
+
+    def record_capture(self, busy_time, block_duration):
+        # Блок обрабатывался дольше своей длительности. Настоящие переполнения захвата считает
+        # CaptureStream (capture.overruns): кольцо блоков сглаживает отдельные медленные блоки.
+        self.captured += 1
+        if busy_time > block_duration:
+            self.slow_blocks += 1
+
+    def record_emit(self, captured_at):
+        latency = self.clock() - captured_at
+        self.emitted += 1
+        self.latency_avg = latency if self.emitted == 1 else self.latency_avg * 0.95 + latency * 0.05
+        self.latency_max = max(self.latency_max, latency)
+
+    def snapshot(self, queue):
+        return {
+            "captured": self.captured,
+            "slow_blocks": self.slow_blocks,
+            "dropped_frames": queue.dropped,
+            "coalesced_frames": queue.coalesced,
+            "emitted": self.emitted,
+            "latency_avg_ms": round(self.latency_avg * 1000, 2),
+            "latency_max_ms": round(self.latency_max * 1000, 2),
+            "capture": self.capture.stats() if self.capture is not None else None,
+            "device_recovery": self.supervisor.stats() if self.supervisor is not None else None,
+        }